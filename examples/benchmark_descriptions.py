@@ -0,0 +1,57 @@
+"""
+Size benchmark of the tool list per description profile.
+
+Prints the tokens of the full tool list (names, descriptions and input JSON
+schemas, as sent to the model on every turn) for each description profile.
+Tokens are counted with tiktoken's ``cl100k_base`` encoding when tiktoken is
+installed, and estimated as characters / 4 otherwise.
+
+Usage:
+
+    python examples/benchmark_descriptions.py
+"""
+
+import json
+
+from wise_agent_toolkit.prompts import DESCRIPTION_PROFILES
+from wise_agent_toolkit.tools import tool_description, tools
+
+try:
+  import tiktoken
+except ImportError:  # tiktoken is optional
+  tiktoken = None
+
+
+def tool_list(profile):
+  """Return the tool list as an MCP or function-calling client would send it."""
+  return json.dumps([
+    {
+      "name": tool["method"],
+      "description": tool_description(tool, profile),
+      "inputSchema": tool["args_schema"].model_json_schema() if tool.get("args_schema") else {},
+    }
+    for tool in tools
+  ])
+
+
+def token_counter():
+  """Return a function counting the tokens of a text, and a description of how it counts."""
+  if tiktoken is None:
+    return lambda text: round(len(text) / 4), "tokens (estimated as characters / 4; install tiktoken to count them)"
+  encoding = tiktoken.get_encoding("cl100k_base")
+  return lambda text: len(encoding.encode(text)), "tokens (cl100k_base)"
+
+
+def main():
+  count, unit = token_counter()
+  print(f"{len(tools)} tools, {unit}")
+  baseline = None
+  for profile in DESCRIPTION_PROFILES:
+    descriptions = sum(count(tool_description(tool, profile)) for tool in tools)
+    total = count(tool_list(profile))
+    baseline = baseline or total
+    print(f"{profile:<8} {total:>6} total {descriptions:>6} in descriptions {total / baseline:>5.0%} of full")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,78 @@
+"""
+Memory benchmark of the in-memory forms of a transfer history.
+
+Compares transfers held as ``to_dict()`` dictionaries with ``TransferRecord``s
+(with and without the compressed full object) and with ``TransferColumns``.
+
+Usage:
+
+    python examples/benchmark_records.py [number of transfers]
+"""
+
+import random
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+
+import wise_api_client
+
+from wise_agent_toolkit.analytics import TransferColumns
+from wise_agent_toolkit.records import TransferRecord
+
+STATUSES = ["outgoing_payment_sent", "processing", "cancelled", "funds_refunded"]
+CURRENCIES = ["GBP", "USD", "EUR", "PLN", "SEK", "JPY"]
+
+
+def transfers(count):
+  """Yield synthetic transfers, parsed by the API client like real responses."""
+  rng = random.Random(42)
+  start = datetime(2020, 1, 1)
+  for transfer_id in range(1, count + 1):
+    source_value = round(rng.uniform(10, 10000), 2)
+    yield wise_api_client.ListTransfers200ResponseInner.from_dict({
+      "id": 50000000 + transfer_id,
+      "user": 1,
+      "targetAccount": 100000 + rng.randrange(500),
+      "quoteUuid": f"{rng.getrandbits(128):032x}",
+      "status": rng.choice(STATUSES),
+      "rate": 0.86,
+      "created": (start + timedelta(minutes=rng.randrange(3_000_000))).isoformat(sep=" "),
+      "business": 12345,
+      "details": {"reference": f"invoice {transfer_id}"},
+      "hasActiveIssues": False,
+      "sourceCurrency": "EUR",
+      "sourceValue": source_value,
+      "targetCurrency": rng.choice(CURRENCIES),
+      "targetValue": round(source_value * 0.86, 2),
+      "customerTransactionId": f"{rng.getrandbits(128):032x}",
+    }).to_dict()
+
+
+def measure(count, build):
+  """Return the bytes still allocated after building the in-memory form of ``count`` transfers."""
+  tracemalloc.start()
+  held = build(transfers(count))
+  size = tracemalloc.get_traced_memory()[0]
+  tracemalloc.stop()
+  del held
+  return size
+
+
+def main():
+  count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+  forms = [
+    ("to_dict() dictionaries", list),
+    ("TransferRecord", lambda source: [TransferRecord(t) for t in source]),
+    ("TransferRecord (keep_body=False)", lambda source: [TransferRecord(t, keep_body=False) for t in source]),
+    ("TransferColumns", TransferColumns),
+  ]
+  print(f"{count} transfers")
+  baseline = None
+  for name, build in forms:
+    size = measure(count, build)
+    baseline = baseline or size
+    print(f"{name:<34} {size / 2 ** 20:>7.1f} MB {size / count:>6.0f} B/transfer {size / baseline:>5.0%} of the dictionaries")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,233 @@
+"""
+A fake Wise API for the tests that exercise ``WiseAPI`` over HTTP.
+
+``FakeWise`` is a local HTTP server answering the endpoints the toolkit uses
+(profiles, transfers, activities and quotes) from in-memory state.
+``FakeWiseTestCase`` runs one per test class and resets it before every test.
+"""
+
+import http.server
+import json
+import re
+import threading
+import unittest
+import urllib.parse
+from datetime import datetime
+
+from wise_agent_toolkit.api import WiseAPI
+from wise_agent_toolkit.configuration import Context
+
+PROFILE_ID = 7
+
+
+def transfer(transfer_id, created="2025-01-05 10:00:00", status="processing", source_value=100.0,
+             target_currency="GBP", account=100, reference="invoice"):
+  return {
+    "id": transfer_id,
+    "user": 1,
+    "targetAccount": account,
+    "status": status,
+    "rate": 0.9,
+    "created": created,
+    "details": {"reference": reference},
+    "sourceCurrency": "EUR",
+    "sourceValue": source_value,
+    "targetCurrency": target_currency,
+    "targetValue": round(source_value * 0.9, 2),
+  }
+
+
+def activity(activity_id, created_on, amount="100 EUR", status="COMPLETED"):
+  return {
+    "id": str(activity_id),
+    "type": "TRANSFER",
+    "resource": {"type": "TRANSFER", "id": str(activity_id)},
+    "title": f"<strong>Payment {activity_id}</strong>",
+    "description": "Rent",
+    "primaryAmount": amount,
+    "secondaryAmount": "",
+    "status": status,
+    "createdOn": created_on,
+    "updatedOn": created_on,
+  }
+
+
+class FakeWise(http.server.ThreadingHTTPServer):
+  """A local Wise API.
+
+  Transfers are listed newest first, filtered by ``createdDateStart``/``createdDateEnd`` and paged
+  with ``offset``/``limit``; transfers added with a ``profile_id`` are only
+  listed for that profile. Activities page with a numeric cursor. Every request
+  is recorded in ``requests`` and calls ``on_request`` (e.g. to hold it at a
+  barrier) while it counts as in flight. Requests for ``stalled_paths`` send
+  half a response and hang until the server is closed.
+  """
+
+  daemon_threads = True
+
+  def __init__(self):
+    super().__init__(("127.0.0.1", 0), _Handler)
+    self.lock = threading.Lock()
+    self.released = threading.Event()
+    self.reset()
+
+  @property
+  def host(self) -> str:
+    return f"http://127.0.0.1:{self.server_port}"
+
+  def reset(self) -> None:
+    self.profiles = [{"id": PROFILE_ID, "type": "PERSONAL"}]
+    self.transfers = {}
+    self.owners = {}
+    self.activities = {}
+    self.quote_expiration = None
+    self.quotes_created = 0
+    self.requests = []
+    self.on_request = None
+    self.stalled_paths = set()
+    self.stalled = threading.Event()
+    self.in_flight = 0
+    self.max_in_flight = 0
+
+  def add_transfers(self, transfers, profile_id=None) -> None:
+    for t in transfers:
+      self.transfers[t["id"]] = t
+      if profile_id is not None:
+        self.owners[t["id"]] = profile_id
+
+  def start(self) -> None:
+    threading.Thread(target=self.serve_forever, daemon=True).start()
+
+  def close(self) -> None:
+    self.released.set()
+    self.shutdown()
+    self.server_close()
+
+  def list_transfers(self, query):
+    profile_id = int(query["profile"]) if "profile" in query else None
+    transfers = [t for t in self.transfers.values() if self.owners.get(t["id"], profile_id) == profile_id]
+    transfers.sort(key=lambda t: t["created"], reverse=True)
+    if "createdDateStart" in query:
+      transfers = [t for t in transfers if t["created"][:10] >= query["createdDateStart"][:10]]
+    if "createdDateEnd" in query:
+      transfers = [t for t in transfers if t["created"][:10] <= query["createdDateEnd"][:10]]
+    offset, limit = int(query.get("offset", 0)), int(query.get("limit", 20))
+    return transfers[offset:offset + limit]
+
+  def list_activities(self, profile_id, query):
+    activities = sorted(self.activities.get(profile_id, []), key=lambda a: a["createdOn"], reverse=True)
+    if "since" in query:
+      since = _parse_timestamp(query["since"])
+      activities = [a for a in activities if _parse_timestamp(a["createdOn"]) > since]
+    offset, size = int(query.get("nextCursor", 0)), int(query.get("size", 10))
+    cursor = str(offset + size) if offset + size < len(activities) else None
+    return {"cursor": cursor, "activities": activities[offset:offset + size]}
+
+  def create_quote(self, request):
+    with self.lock:
+      self.quotes_created += 1
+      quote_id = f"quote-{self.quotes_created}"
+    return {
+      "id": quote_id,
+      "sourceCurrency": request["sourceCurrency"],
+      "targetCurrency": request["targetCurrency"],
+      "sourceAmount": request.get("sourceAmount"),
+      "status": "PENDING",
+      "expirationTime": self.quote_expiration.isoformat() if self.quote_expiration else None,
+    }
+
+
+def _parse_timestamp(value):
+  return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+
+  def do_GET(self):
+    self._handle()
+
+  def do_POST(self):
+    self._handle()
+
+  def _handle(self):
+    wise = self.server
+    url = urllib.parse.urlparse(self.path)
+    query = dict(urllib.parse.parse_qsl(url.query))
+    with wise.lock:
+      wise.requests.append((url.path, query))
+      wise.in_flight += 1
+      wise.max_in_flight = max(wise.max_in_flight, wise.in_flight)
+    try:
+      if url.path in wise.stalled_paths:
+        self._stall()
+        return
+      if wise.on_request is not None:
+        wise.on_request(url.path)
+      status, body = self._route(url.path, query)
+    except Exception as e:
+      status, body = 500, {"error": str(e)}
+    finally:
+      with wise.lock:
+        wise.in_flight -= 1
+    self._send_json(status, body)
+
+  def _route(self, path, query):
+    wise = self.server
+    if self.command == "POST" and path.endswith("/quotes"):
+      return 200, wise.create_quote(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+    if path == "/v2/profiles":
+      return 200, wise.profiles
+    if path == "/v1/transfers":
+      return 200, wise.list_transfers(query)
+    match = re.fullmatch(r"/v1/transfers/(\d+)", path)
+    if match:
+      transfer_id = int(match.group(1))
+      if transfer_id not in wise.transfers:
+        return 404, {"errors": [{"code": "NOT_FOUND"}]}
+      return 200, wise.transfers[transfer_id]
+    match = re.fullmatch(r"/v1/profiles/(\d+)/activities", path)
+    if match:
+      return 200, wise.list_activities(int(match.group(1)), query)
+    return 404, {"errors": [{"code": "NOT_FOUND"}]}
+
+  def _stall(self):
+    self.server.stalled.set()
+    self.send_response(200)
+    self.send_header("Content-Type", "application/json")
+    self.send_header("Content-Length", "1000")
+    self.end_headers()
+    self.wfile.write(b"[")
+    self.wfile.flush()
+    self.server.released.wait()
+
+  def _send_json(self, status, body):
+    body = json.dumps(body).encode()
+    self.send_response(status)
+    self.send_header("Content-Type", "application/json")
+    self.send_header("Content-Length", str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def log_message(self, *args):
+    pass
+
+
+class FakeWiseTestCase(unittest.TestCase):
+  """Runs a ``FakeWise`` for the test class, reset before every test."""
+
+  @classmethod
+  def setUpClass(cls):
+    cls.wise = FakeWise()
+    cls.wise.start()
+
+  @classmethod
+  def tearDownClass(cls):
+    cls.wise.close()
+
+  def setUp(self):
+    self.wise.reset()
+
+  def create_wise_api(self, **kwargs) -> WiseAPI:
+    """A ``WiseAPI`` talking to the fake, with profile 7 as its default profile."""
+    kwargs.setdefault("context", Context(profile_id=PROFILE_ID))
+    return WiseAPI(api_key="key", host=self.wise.host, **kwargs)
@@ -0,0 +1,97 @@
+import json
+import unittest
+from datetime import date, datetime
+from unittest import mock
+
+from tests.fake_wise import FakeWiseTestCase, transfer
+from wise_agent_toolkit import analytics
+from wise_agent_toolkit.analytics import TransferColumns, summarize
+from wise_agent_toolkit.schema import AnalyzeTransfers
+
+
+TRANSFERS = [
+  transfer(1, "2025-01-05 10:00:00", "outgoing_payment_sent", 100.0),
+  transfer(2, "2025-01-20 10:00:00", "outgoing_payment_sent", 300.0, account=101),
+  transfer(3, "2025-02-03 10:00:00", "outgoing_payment_sent", 50.0),
+  transfer(4, "2025-02-03 11:00:00", "cancelled", 80.0, target_currency="USD"),
+]
+
+
+class TestSummarize(unittest.TestCase):
+
+  def setUp(self):
+    self.columns = TransferColumns(TRANSFERS)
+
+  def _check_engines(self, test):
+    engines = [None] + ([analytics.np] if analytics.np is not None else [])
+    for np in engines:
+      with self.subTest(engine="python" if np is None else "numpy"), mock.patch.object(analytics, "np", np):
+        test()
+
+  def test_group_by_currency_and_month(self):
+    def test():
+      summary = summarize(self.columns, ["target_currency", "month"], "target")
+      self.assertEqual(["target_currency", "month"], summary["group_by"])
+      self.assertEqual([
+        {"target_currency": "GBP", "month": "2025-01", "count": 2, "sum": 360.0, "average": 180.0},
+        {"target_currency": "GBP", "month": "2025-02", "count": 1, "sum": 45.0, "average": 45.0},
+        {"target_currency": "USD", "month": "2025-02", "count": 1, "sum": 72.0, "average": 72.0},
+      ], summary["rows"])
+    self._check_engines(test)
+
+  def test_summed_currency_is_always_grouped(self):
+    def test():
+      summary = summarize(self.columns, ["status"])
+      self.assertEqual(["source_currency", "status"], summary["group_by"])
+      self.assertEqual([2, 2], [len(summary["rows"]), summary["groups"]])
+      self.assertEqual({"source_currency": "EUR", "status": "outgoing_payment_sent", "count": 3, "sum": 450.0,
+                        "average": 150.0}, summary["rows"][1])
+    self._check_engines(test)
+
+  def test_time_buckets(self):
+    def test():
+      weeks = summarize(self.columns, ["week"])["rows"]
+      self.assertEqual(["2024-12-30", "2025-01-20", "2025-02-03"], [row["week"] for row in weeks])
+      self.assertEqual(["2025"], [row["year"] for row in summarize(self.columns, ["year"])["rows"]])
+      self.assertEqual(3, len(summarize(self.columns, ["day"])["rows"]))
+    self._check_engines(test)
+
+  def test_recipient_and_limit(self):
+    summary = summarize(self.columns, ["recipient"], limit=1)
+    self.assertTrue(summary["truncated"])
+    self.assertEqual(1, len(summary["rows"]))
+
+  def test_invalid_arguments(self):
+    with self.assertRaises(ValueError):
+      summarize(self.columns, ["weekday"])
+    with self.assertRaises(ValueError):
+      summarize(self.columns, ["month"], "fee")
+
+  def test_empty(self):
+    self.assertEqual([], summarize(TransferColumns(), ["month"])["rows"])
+
+
+class TestWiseAPIAnalyzeTransfers(FakeWiseTestCase):
+
+  def test_analyze_transfers_tool(self):
+    self.wise.add_transfers(TRANSFERS)
+    wise_api = self.create_wise_api()
+    summary = json.loads(wise_api.run("analyze_transfers", group_by=["month"]))
+    wise_api.close()
+
+    self.assertEqual(4, summary["transfers"])
+    self.assertEqual([400.0, 130.0], [row["sum"] for row in summary["rows"]])
+
+  def test_date_filters_drop_the_time_of_day(self):
+    self.wise.add_transfers(TRANSFERS)
+    wise_api = self.create_wise_api()
+    summary = json.loads(wise_api.run("analyze_transfers", created_date_start=datetime(2025, 1, 20, 15, 30)))
+    wise_api.close()
+
+    self.assertEqual(3, summary["transfers"])
+    self.assertEqual("2025-01-20", self.wise.requests[-1][1]["createdDateStart"][:10])
+    self.assertEqual(date(2025, 2, 1), AnalyzeTransfers(created_date_start="2025-02-01").created_date_start)
+
+
+if __name__ == "__main__":
+  unittest.main()
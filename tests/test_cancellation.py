@@ -0,0 +1,98 @@
+import http.server
+import threading
+import time
+import unittest
+from unittest import mock
+
+from wise_agent_toolkit import cancellation
+from wise_agent_toolkit.api import WiseAPI
+from wise_agent_toolkit.cancellation import CallCancelledError, CancellationToken, cancellation_scope
+
+
+class _StallingHandler(http.server.BaseHTTPRequestHandler):
+  """Sends the response headers and then stalls in the middle of the body."""
+
+  def do_GET(self):
+    self.send_response(200)
+    self.send_header("Content-Type", "application/json")
+    self.send_header("Content-Length", "1000")
+    self.end_headers()
+    self.wfile.write(b"[")
+    self.wfile.flush()
+    time.sleep(5)
+
+  def log_message(self, *args):
+    pass
+
+
+class _SilentHandler(http.server.BaseHTTPRequestHandler):
+  """Never sends the response headers within the test."""
+
+  def do_GET(self):
+    time.sleep(5)
+
+  def log_message(self, *args):
+    pass
+
+
+class TestCancellation(unittest.TestCase):
+
+  def setUp(self):
+    self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _StallingHandler)
+    self.server.daemon_threads = True
+    threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    host = f"http://127.0.0.1:{self.server.server_address[1]}"
+    self.wise_api = WiseAPI(api_key="test-api-key", host=host, context={"profile_id": "123"})
+
+  def tearDown(self):
+    self.server.shutdown()
+    self.server.server_close()
+
+  def test_cancel_aborts_in_flight_read(self):
+    token = CancellationToken()
+    threading.Timer(0.2, token.cancel).start()
+
+    started = time.monotonic()
+    with self.assertRaises(CallCancelledError):
+      with cancellation_scope(token):
+        self.wise_api.run("list_profiles")
+
+    self.assertLess(time.monotonic() - started, 3)
+
+  def test_cancelled_token_refuses_new_requests(self):
+    token = CancellationToken()
+    token.cancel()
+
+    with self.assertRaises(CallCancelledError):
+      with cancellation_scope(token):
+        self.wise_api.run("list_profiles")
+
+
+class TestRequestTimeout(unittest.TestCase):
+
+  def setUp(self):
+    self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _SilentHandler)
+    self.server.daemon_threads = True
+    threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    host = f"http://127.0.0.1:{self.server.server_address[1]}"
+    self.wise_api = WiseAPI(api_key="test-api-key", host=host, context={"profile_id": "123"})
+
+  def tearDown(self):
+    self.server.shutdown()
+    self.server.server_close()
+
+  def test_cancel_before_headers_ends_at_the_request_timeout(self):
+    token = CancellationToken()
+    threading.Timer(0.1, token.cancel).start()
+
+    started = time.monotonic()
+    with mock.patch.object(cancellation, "REQUEST_TIMEOUT", (1.0, 0.5)):
+      with self.assertRaises(CallCancelledError):
+        with cancellation_scope(token):
+          self.wise_api.run("list_profiles")
+
+    self.assertLess(time.monotonic() - started, 3)
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,182 @@
+import asyncio
+import json
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from tests.fake_wise import FakeWiseTestCase, transfer
+from wise_agent_toolkit.api import batch_keys
+from wise_agent_toolkit.cancellation import current_token
+from wise_agent_toolkit.concurrency import arun_batch, run_async, run_batch
+
+
+class TestRunAsync(unittest.TestCase):
+
+  def setUp(self):
+    self.executor = ThreadPoolExecutor(max_workers=1)
+
+  def tearDown(self):
+    self.executor.shutdown(wait=True)
+
+  def test_reads_get_a_cancellation_token(self):
+    async def main():
+      return await run_async(self.executor, current_token), await run_async(self.executor, current_token, abortable=False)
+
+    read_token, write_token = asyncio.run(main())
+    self.assertIsNotNone(read_token)
+    self.assertIsNone(write_token)
+
+  def test_writes_complete_before_cancellation(self):
+    started, release, done = threading.Event(), threading.Event(), threading.Event()
+
+    def write():
+      started.set()
+      release.wait(5)
+      done.set()
+
+    async def main():
+      task = asyncio.ensure_future(run_async(self.executor, write, abortable=False))
+      await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+      task.cancel()
+      for _ in range(10):
+        await asyncio.sleep(0)
+      # The cancellation waits for the write rather than abandoning it
+      self.assertFalse(task.done())
+      release.set()
+      with self.assertRaises(asyncio.CancelledError):
+        await task
+      return done.is_set()
+
+    self.assertTrue(asyncio.run(main()))
+
+
+class TestBatch(unittest.TestCase):
+
+  def setUp(self):
+    self.executor = ThreadPoolExecutor(max_workers=8)
+    self.lock = threading.Lock()
+    self.in_flight = 0
+    self.max_in_flight = 0
+    self.calls = []
+
+  def tearDown(self):
+    self.executor.shutdown(wait=True)
+
+  def _call(self, value, barrier=None):
+    def call():
+      with self.lock:
+        self.calls.append(value)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+      if barrier is not None:
+        # Only passes once another call is in flight too
+        barrier.wait()
+      with self.lock:
+        self.in_flight -= 1
+      if value < 0:
+        raise ValueError(value)
+      return value * 10
+    return call
+
+  def test_results_in_order_and_duplicates_run_once(self):
+    values = [3, 1, 3, 2, 1]
+    results = run_batch([self._call(v) for v in values], self.executor, keys=values)
+
+    self.assertEqual([30, 10, 30, 20, 10], results)
+    self.assertEqual([1, 2, 3], sorted(self.calls))
+
+  def test_concurrency_cap(self):
+    barrier = threading.Barrier(2, timeout=5)
+    run_batch([self._call(v, barrier) for v in range(6)], self.executor, max_concurrency=2)
+    self.assertEqual(6, len(self.calls))
+    self.assertEqual(2, self.max_in_flight)
+
+  def test_exceptions(self):
+    calls = [self._call(v) for v in [1, -1, 2]]
+    with self.assertRaises(ValueError):
+      run_batch(calls, self.executor)
+
+    results = run_batch(calls, self.executor, return_exceptions=True)
+    self.assertEqual([10, 20], [results[0], results[2]])
+    self.assertIsInstance(results[1], ValueError)
+
+  def test_async(self):
+    barrier = threading.Barrier(2, timeout=5)
+
+    async def call(value):
+      return await run_async(self.executor, self._call(value, barrier))
+
+    values = [2, 2, 1, 3, 4, 5, 6]
+    calls = [lambda v=v: call(v) for v in values]
+    results = asyncio.run(arun_batch(calls, keys=values, max_concurrency=2))
+
+    self.assertEqual([20, 20, 10, 30, 40, 50, 60], results)
+    self.assertEqual(6, len(self.calls))
+    self.assertEqual(2, self.max_in_flight)
+
+  def test_writes_are_not_deduplicated(self):
+    inputs = [{"transfer_id": 1}, {"transfer_id": 1}]
+    self.assertIsNone(batch_keys("cancel_transfer", inputs))
+    self.assertEqual(1, len(set(batch_keys("get_transfer_by_id", inputs))))
+
+
+class TestWiseAPIArun(FakeWiseTestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.wise.add_transfers(transfer(transfer_id) for transfer_id in range(1, 11))
+    self.wise_api = self.create_wise_api(context={"profile_id": "123"})
+
+  def tearDown(self):
+    self.wise_api.close()
+
+  def hold_requests(self, parties):
+    """Hold each request until ``parties`` of them are in flight together."""
+    barrier = threading.Barrier(parties, timeout=5)
+    self.wise.on_request = lambda path: barrier.wait()
+
+  def test_calls_overlap(self):
+    async def main():
+      return await asyncio.gather(*(self.wise_api.arun("get_transfer_by_id", transfer_id=i) for i in range(1, 6)))
+
+    self.hold_requests(5)
+    results = asyncio.run(main())
+
+    self.assertEqual([1, 2, 3, 4, 5], [json.loads(result)["id"] for result in results])
+
+  def test_cancelled_read_frees_its_worker(self):
+    executor = ThreadPoolExecutor(max_workers=1)
+    self.wise.stalled_paths.add("/v2/profiles")
+
+    async def main():
+      task = asyncio.ensure_future(run_async(executor, self.wise_api.run, "list_profiles"))
+      await asyncio.get_running_loop().run_in_executor(None, self.wise.stalled.wait, 5)
+      task.cancel()
+      with self.assertRaises(asyncio.CancelledError):
+        await task
+      # The only worker is free again although the stalled response never ends
+      return await asyncio.wait_for(run_async(executor, self.wise_api.run, "get_transfer_by_id", transfer_id=1), 5)
+
+    self.assertEqual(1, json.loads(asyncio.run(main()))["id"])
+    executor.shutdown(wait=True)
+
+  def test_batch_lookup(self):
+    inputs = [{"transfer_id": transfer_id % 10 + 1} for transfer_id in range(20)]
+
+    self.hold_requests(2)
+    results = self.wise_api.run_batch("get_transfer_by_id", inputs)
+
+    self.assertEqual([i["transfer_id"] for i in inputs], [json.loads(result)["id"] for result in results])
+    self.assertEqual(10, len(self.wise.requests))
+
+    results = asyncio.run(self.wise_api.arun_batch("get_transfer_by_id", inputs[:4], max_concurrency=2))
+    self.assertEqual([1, 2, 3, 4], [json.loads(result)["id"] for result in results])
+
+  def test_usable_after_close(self):
+    asyncio.run(self.wise_api.arun("get_transfer_by_id", transfer_id=1))
+    self.wise_api.close()
+    self.assertEqual(2, json.loads(asyncio.run(self.wise_api.arun("get_transfer_by_id", transfer_id=2)))["id"])
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 
-from wise_agent_toolkit.configuration import is_tool_allowed
+from wise_agent_toolkit.configuration import capabilities, is_tool_allowed, is_tool_available
 
 
 class TestConfigurations(unittest.TestCase):
@@ -54,6 +54,14 @@ class TestConfigurations(unittest.TestCase):
 
     self.assertFalse(is_tool_allowed(tool, configuration))
 
+  def test_available(self):
+    enabled = capabilities(ledger=object(), export_dir="/tmp/exports")
+
+    self.assertEqual(frozenset({"ledger", "export_dir"}), enabled)
+    self.assertTrue(is_tool_available({"actions": {}}, enabled))
+    self.assertTrue(is_tool_available({"requires": "ledger"}, enabled))
+    self.assertFalse(is_tool_available({"requires": "transfer_ledger"}, enabled))
+
 
 if __name__ == "__main__":
   unittest.main()
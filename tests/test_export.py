@@ -0,0 +1,159 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+import tracemalloc
+import unittest
+from datetime import datetime
+
+from tests.fake_wise import FakeWiseTestCase, transfer
+from wise_agent_toolkit import export
+from wise_agent_toolkit.export import export_path, export_records
+
+
+def _transfer(transfer_id):
+  return transfer(
+    transfer_id,
+    f"2025-01-{1 + transfer_id % 28:02d} 10:00:00",
+    "outgoing_payment_sent",
+    100.0 + transfer_id,
+    account=100 + transfer_id % 3,
+    reference=f"invoice {transfer_id}",
+  )
+
+
+def _transfers(count):
+  return (_transfer(transfer_id) for transfer_id in range(count))
+
+
+class TestExportRecords(unittest.TestCase):
+
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  def test_csv(self):
+    path = os.path.join(self.directory, "transfers.csv")
+    result = export_records(_transfers(3), path, "transfers", "csv")
+
+    self.assertEqual({"path": path, "rows": 3, "format": "csv", "bytes": os.path.getsize(path)}, result)
+    with open(path, newline="") as file:
+      rows = list(csv.DictReader(file))
+    self.assertEqual(["0", "1", "2"], [row["id"] for row in rows])
+    self.assertEqual("invoice 1", rows[1]["reference"])
+    self.assertEqual("", rows[1]["quote_uuid"])
+    self.assertEqual([], [name for name in os.listdir(self.directory) if name.endswith(".part")])
+
+  def test_ndjson_keeps_whole_records(self):
+    path = os.path.join(self.directory, "transfers.ndjson")
+    export_records(_transfers(2), path, "transfers", "ndjson")
+
+    with open(path) as file:
+      self.assertEqual([_transfer(0), _transfer(1)], [json.loads(line) for line in file])
+
+  def test_activity_amounts_are_parsed(self):
+    path = os.path.join(self.directory, "activities.csv")
+    activity = {"id": "A1", "type": "TRANSFER", "title": "<strong>Alice</strong>", "primaryAmount": "1,250.50 EUR"}
+    export_records([activity], path, "activities", "csv")
+
+    with open(path, newline="") as file:
+      row = next(csv.DictReader(file))
+    self.assertEqual(("Alice", "1250.5", "EUR"), (row["title"], row["amount"], row["currency"]))
+
+  @unittest.skipIf(export.pa is None, "pyarrow is not installed")
+  def test_parquet(self):
+    path = os.path.join(self.directory, "transfers.parquet")
+    result = export_records(_transfers(25), path, "transfers", "parquet", batch_size=10)
+
+    table = export.pq.read_table(path)
+    self.assertEqual(25, result["rows"])
+    self.assertEqual(3, export.pq.ParquetFile(path).num_row_groups)
+    self.assertEqual(list(range(25)), table.column("id").to_pylist())
+    self.assertEqual("timestamp[us, tz=UTC]", str(table.schema.field("created").type))
+
+  def test_failed_export_leaves_no_file(self):
+    def failing():
+      yield _transfer(0)
+      raise RuntimeError("connection lost")
+
+    path = os.path.join(self.directory, "transfers.csv")
+    with self.assertRaises(RuntimeError):
+      export_records(failing(), path, "transfers", "csv")
+    self.assertEqual([], os.listdir(self.directory))
+
+  def test_memory_does_not_grow_with_history(self):
+    def peak(count):
+      path = os.path.join(self.directory, f"{count}.csv")
+      tracemalloc.start()
+      export_records(_transfers(count), path, "transfers", "csv")
+      peak = tracemalloc.get_traced_memory()[1]
+      tracemalloc.stop()
+      return peak
+
+    small, large = peak(1000), peak(20000)
+    self.assertLess(large, small * 2)
+
+  def test_export_path(self):
+    self.assertEqual(os.path.join("exports", "report.csv"), export_path("transfers", "csv", "exports", "report"))
+    self.assertTrue(export_path("recipients", "ndjson", "exports").endswith(".ndjson"))
+    for filename in ("../report.csv", "/tmp/report.csv", ".hidden"):
+      with self.assertRaises(ValueError):
+        export_path("transfers", "csv", "exports", filename)
+
+  def test_invalid_arguments(self):
+    with self.assertRaises(ValueError):
+      export_records([], os.path.join(self.directory, "x.csv"), "balances", "csv")
+    with self.assertRaises(ValueError):
+      export_records([], os.path.join(self.directory, "x.xlsx"), "transfers", "xlsx")
+
+
+class TestWiseAPIExportRecords(FakeWiseTestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.wise.add_transfers(_transfer(i) for i in range(1, 96))
+    self.directory = tempfile.mkdtemp()
+    self.wise_api = self.create_wise_api(export_dir=self.directory)
+
+  def tearDown(self):
+    self.wise_api.close()
+    shutil.rmtree(self.directory)
+
+  def test_export_records_tool(self):
+    result = json.loads(self.wise_api.run("export_records", kind="transfers", filename="history"))
+
+    self.assertEqual(os.path.join(self.directory, "history.csv"), result["path"])
+    self.assertEqual(95, result["rows"])
+    with open(result["path"], newline="") as file:
+      self.assertEqual(95, sum(1 for _ in csv.DictReader(file)))
+
+  def test_transfers_between_timestamps(self):
+    self.wise.reset()
+    self.wise.add_transfers([
+      transfer(1, "2025-01-05 10:00:00"),
+      transfer(2, "2025-01-05 15:00:00"),
+      transfer(3, "2025-01-20 08:00:00"),
+      transfer(4, "2025-01-20 10:00:00"),
+    ])
+    result = json.loads(self.wise_api.run(
+      "export_records", kind="transfers", since=datetime(2025, 1, 5, 12), until=datetime(2025, 1, 20, 9), filename="window"
+    ))
+
+    with open(result["path"], newline="") as file:
+      self.assertEqual(["3", "2"], [row["id"] for row in csv.DictReader(file)])
+    self.assertEqual(("2025-01-05", "2025-01-21"), (
+      self.wise.requests[-1][1]["createdDateStart"][:10], self.wise.requests[-1][1]["createdDateEnd"][:10]
+    ))
+
+  def test_filters_must_apply_to_kind(self):
+    with self.assertRaises(ValueError):
+      self.wise_api.run("export_records", kind="transfers", currency="EUR")
+    with self.assertRaises(ValueError):
+      self.wise_api.run("export_records", kind="recipients", since="2025-01-01")
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,171 @@
+import json
+import threading
+import unittest
+
+from tests.fake_wise import FakeWiseTestCase, activity, transfer
+from wise_agent_toolkit.cancellation import CallCancelledError, CancellationToken, cancellation_scope
+from wise_agent_toolkit.fanout import fetch_profiles, merge_newest_first
+from wise_agent_toolkit.progress import progress_scope
+
+try:
+  import anyio
+  from mcp.shared.memory import create_connected_server_and_client_session
+
+  from wise_agent_toolkit.mcp.server import WiseMCPServer
+
+  _MCP_AVAILABLE = True
+except ImportError:
+  _MCP_AVAILABLE = False
+
+TRANSFERS = {
+  7: [transfer(71, "2025-01-09 10:00:00"), transfer(72, "2025-01-05 10:00:00"), transfer(73, "2025-01-01 10:00:00")],
+  8: [transfer(81, "2025-01-08 10:00:00"), transfer(82, "2025-01-06 10:00:00")],
+}
+ACTIVITIES = {
+  7: [activity("7-0", "2025-01-09T10:00:00Z"), activity("7-1", "2025-01-03T10:00:00Z"),
+      activity("7-2", "2025-01-01T10:00:00Z")],
+  8: [activity("8-0", "2025-01-07T10:00:00Z")],
+}
+
+
+class TestMergeNewestFirst(unittest.TestCase):
+
+  def test_merge_and_tag(self):
+    merged = merge_newest_first(
+      [(7, [{"created": "2025-01-09"}, {"created": None}]), (8, [{"created": "2025-01-08"}])], "created"
+    )
+    self.assertEqual(
+      [{"created": "2025-01-09", "profileId": 7}, {"created": "2025-01-08", "profileId": 8},
+       {"created": None, "profileId": 7}],
+      merged,
+    )
+
+  def test_fetch_profiles_keeps_order_and_context(self):
+    token = CancellationToken()
+    finished = {profile_id: threading.Event() for profile_id in (1, 2, 3)}
+
+    def fetch(profile_id):
+      from wise_agent_toolkit.cancellation import current_token
+      self.assertIs(token, current_token())
+      # Finish in reverse order: 3, then 2, then 1
+      if profile_id < 3:
+        self.assertTrue(finished[profile_id + 1].wait(5))
+      finished[profile_id].set()
+      return profile_id * 10
+
+    with cancellation_scope(token):
+      self.assertEqual([(1, 10), (2, 20), (3, 30)], fetch_profiles(fetch, [1, 2, "3", 1]))
+
+  def test_fetch_profiles_reports_the_total(self):
+    def fetch(profile_id):
+      from wise_agent_toolkit.progress import report_progress
+      for fetched in (10, 20):
+        report_progress(fetched, message=f"Fetched {fetched}")
+      return profile_id
+
+    reports = []
+    with progress_scope(lambda progress, total, message: reports.append(progress)):
+      fetch_profiles(fetch, [1, 2, 3])
+
+    self.assertEqual(60, reports[-1])
+    self.assertEqual(sorted(reports), reports)
+
+  def test_fetch_profiles_raises_failures(self):
+    def fetch(profile_id):
+      if profile_id == 2:
+        raise CallCancelledError("cancelled")
+      return profile_id
+
+    with self.assertRaises(CallCancelledError):
+      fetch_profiles(fetch, [1, 2, 3])
+
+
+class TestWiseAPIFanOut(FakeWiseTestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.wise.profiles = [{"id": 7, "type": "PERSONAL"}, {"id": 8, "type": "BUSINESS"}]
+    for profile_id in TRANSFERS:
+      self.wise.add_transfers(TRANSFERS[profile_id], profile_id)
+    self.wise.activities = dict(ACTIVITIES)
+    self.wise_api = self.create_wise_api()
+
+  def tearDown(self):
+    self.wise_api.close()
+
+  def hold_transfer_listings(self, parties):
+    """Hold each transfer listing until ``parties`` of them are in flight together."""
+    barrier = threading.Barrier(parties, timeout=5)
+    self.wise.on_request = lambda path: barrier.wait() if path == "/v1/transfers" else None
+
+  def test_list_transfers_of_all_profiles(self):
+    self.hold_transfer_listings(2)
+    transfers = json.loads(self.wise_api.run("list_transfers", profile="all"))
+
+    self.assertEqual([(71, 7), (81, 8), (82, 8), (72, 7), (73, 7)], [(t["id"], t["profileId"]) for t in transfers])
+    self.assertEqual(2, self.wise.max_in_flight)
+
+    # The profiles are looked up once
+    json.loads(self.wise_api.run("list_transfers", profile="all"))
+    self.assertEqual(1, [path for path, _ in self.wise.requests].count("/v2/profiles"))
+
+  def test_list_transfers_of_listed_profiles_concurrently(self):
+    # Both listings must be in flight at once to get past the barrier
+    self.hold_transfer_listings(2)
+    transfers = json.loads(self.wise_api.run("list_transfers", profile=[8, 7], fetch_all=True))
+
+    self.assertEqual([71, 81, 82, 72, 73], [t["id"] for t in transfers])
+
+  def test_single_profile_is_unchanged(self):
+    transfers = json.loads(self.wise_api.run("list_transfers", profile=8))
+    self.assertEqual([81, 82], [t["id"] for t in transfers])
+    self.assertNotIn("profileId", transfers[0])
+
+  def test_list_activities_of_several_profiles(self):
+    result = json.loads(self.wise_api.run("list_activities", profile_id=[7, 8], size=2))
+
+    self.assertEqual(["7-0", "8-0", "7-1"], [a["id"] for a in result["activities"]])
+    self.assertEqual([7, 8, 7], [a["profileId"] for a in result["activities"]])
+    self.assertEqual({"7": "2", "8": None}, result["cursors"])
+
+  def test_cursor_needs_a_single_profile(self):
+    with self.assertRaises(ValueError):
+      self.wise_api.run("list_activities", profile_id="all", next_cursor="next-7")
+    with self.assertRaises(ValueError):
+      self.wise_api.run("list_transfers", profile=[])
+
+
+@unittest.skipUnless(_MCP_AVAILABLE, "MCP is not installed")
+class TestMCPFanOutProgress(FakeWiseTestCase):
+
+  def test_progress_of_every_profile_is_notified(self):
+    self.wise.profiles = [{"id": 7, "type": "PERSONAL"}, {"id": 8, "type": "BUSINESS"}]
+    for profile_id in (7, 8):
+      self.wise.add_transfers(
+        [transfer(profile_id * 100 + i, f"2025-01-{1 + i % 28:02d} 10:00:00") for i in range(45)], profile_id
+      )
+    server = WiseMCPServer(api_key="key", host=self.wise.host, profile_id=7)
+    notifications = []
+
+    async def main():
+      async with create_connected_server_and_client_session(server.server) as client:
+        async def on_progress(progress, total, message):
+          notifications.append(progress)
+
+        return await client.call_tool(
+          "list_transfers", {"profile": "all", "fetch_all": True}, progress_callback=on_progress
+        )
+
+    result = anyio.run(main)
+    server.close()
+
+    self.assertFalse(result.isError)
+    self.assertEqual(90, len(json.loads(result.content[0].text)))
+    # Two pages per profile, added up into one increasing total
+    self.assertEqual(4, len(notifications))
+    self.assertEqual(sorted(notifications), notifications)
+    self.assertEqual(90, notifications[-1])
+
+
+if __name__ == "__main__":
+  unittest.main()
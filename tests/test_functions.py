@@ -4,7 +4,9 @@ from unittest import mock
 from wise_agent_toolkit.functions import create_transfer, create_quote, update_quote, list_recipient_accounts, \
   create_recipient_account, deactivate_recipient_account, list_transfers, list_profiles, get_profile_by_id, \
   get_quote_by_id, \
-  get_recipient_account_by_id, get_account_requirements, list_activities
+  get_recipient_account_by_id, get_account_requirements, list_activities, iter_transfers, iter_activities, \
+  iter_recipient_accounts
+from wise_agent_toolkit.progress import progress_scope
 
 
 class TestWiseFunctions(unittest.TestCase):
@@ -762,5 +764,74 @@ class TestWiseFunctions(unittest.TestCase):
       self.assertEqual(str(cm.exception), "Profile ID must be provided either as a parameter or in context.")
 
 
+  def test_iter_transfers(self):
+    mock_api_client = mock.Mock()
+    mock_transfers_api = mock.Mock()
+    pages = [[{"id": 1}, {"id": 2}], [{"id": 3}, {"id": 4}], [{"id": 5}]]
+
+    with mock.patch("wise_api_client.TransfersApi") as mock_transfers_api_class:
+      mock_transfers_api_class.return_value = mock_transfers_api
+      mock_transfers_api.list_transfers.side_effect = pages
+
+      progress = []
+      with progress_scope(lambda done, total, message: progress.append(done)):
+        result = list(iter_transfers(
+          api_client=mock_api_client,
+          context={"profile_id": "456"},
+          status="processing",
+          limit=2
+        ))
+
+      self.assertEqual([1, 2, 3, 4, 5], [t["id"] for t in result])
+      self.assertEqual([2, 4, 5], progress)
+      self.assertEqual(
+        [0, 2, 4],
+        [c.kwargs["offset"] for c in mock_transfers_api.list_transfers.call_args_list]
+      )
+      for call in mock_transfers_api.list_transfers.call_args_list:
+        self.assertEqual(456, call.kwargs["profile"])
+        self.assertEqual("processing", call.kwargs["status"])
+        self.assertEqual(2, call.kwargs["limit"])
+
+  def test_iter_activities(self):
+    mock_api_client = mock.Mock()
+    mock_activities_api = mock.Mock()
+    responses = [
+      mock.Mock(activities=[{"id": "a1"}, {"id": "a2"}], cursor="cursor-2"),
+      mock.Mock(activities=[{"id": "a3"}], cursor=None),
+    ]
+
+    with mock.patch("wise_api_client.ActivitiesApi") as mock_activities_api_class:
+      mock_activities_api_class.return_value = mock_activities_api
+      mock_activities_api.list_activities.side_effect = responses
+
+      result = list(iter_activities(api_client=mock_api_client, context={"profile_id": "789"}))
+
+      self.assertEqual(["a1", "a2", "a3"], [a["id"] for a in result])
+      self.assertEqual(
+        [None, "cursor-2"],
+        [c.kwargs["next_cursor"] for c in mock_activities_api.list_activities.call_args_list]
+      )
+
+  def test_iter_recipient_accounts(self):
+    mock_api_client = mock.Mock()
+    mock_recipients_api = mock.Mock()
+    responses = [
+      mock.Mock(content=[{"id": 1}, {"id": 2}], seek_position_for_next=2),
+      mock.Mock(content=[{"id": 3}], seek_position_for_next=None),
+    ]
+
+    with mock.patch("wise_api_client.RecipientsApi") as mock_recipients_api_class:
+      mock_recipients_api_class.return_value = mock_recipients_api
+      mock_recipients_api.list_recipient_accounts.side_effect = responses
+
+      result = list(iter_recipient_accounts(api_client=mock_api_client, context={"profile_id": "123"}, size=2))
+
+      self.assertEqual([1, 2, 3], [r["id"] for r in result])
+      self.assertEqual(
+        [None, 2],
+        [c.kwargs["seek_position"] for c in mock_recipients_api.list_recipient_accounts.call_args_list]
+      )
+
 if __name__ == "__main__":
   unittest.main()
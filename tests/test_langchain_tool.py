@@ -0,0 +1,71 @@
+import asyncio
+import json
+import threading
+import unittest
+
+from tests.fake_wise import FakeWiseTestCase, transfer
+from wise_agent_toolkit.schema import GetTransferById
+
+try:
+  import langchain  # noqa: F401
+
+  from wise_agent_toolkit.langchain.tool import WiseTool
+
+  _LANGCHAIN_AVAILABLE = True
+except ImportError:
+  _LANGCHAIN_AVAILABLE = False
+
+
+@unittest.skipUnless(_LANGCHAIN_AVAILABLE, "LangChain is not installed")
+class TestWiseTool(FakeWiseTestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.wise.add_transfers(transfer(transfer_id) for transfer_id in range(1, 7))
+    self.wise_api = self.create_wise_api()
+    self.tool = WiseTool(self.wise_api, "get_transfer_by_id", args_schema=GetTransferById)
+
+  def tearDown(self):
+    self.wise_api.close()
+
+  def transfer_requests(self):
+    return [path for path, _ in self.wise.requests if path.startswith("/v1/transfers/")]
+
+  def test_ainvoke(self):
+    result = asyncio.run(self.tool.ainvoke({"transfer_id": 1}))
+    self.assertEqual(1, json.loads(result)["id"])
+
+  def test_batch_runs_identical_reads_once(self):
+    results = self.tool.batch([{"transfer_id": 2}, {"transfer_id": 1}, {"transfer_id": 2}])
+
+    self.assertEqual([2, 1, 2], [json.loads(result)["id"] for result in results])
+    self.assertEqual(["/v1/transfers/1", "/v1/transfers/2"], sorted(self.transfer_requests()))
+
+  def test_abatch_runs_identical_reads_once(self):
+    results = asyncio.run(self.tool.abatch([{"transfer_id": 3}, {"transfer_id": 3}, {"transfer_id": 1}]))
+
+    self.assertEqual([3, 3, 1], [json.loads(result)["id"] for result in results])
+    self.assertEqual(["/v1/transfers/1", "/v1/transfers/3"], sorted(self.transfer_requests()))
+
+  def test_max_concurrency_caps_calls_in_flight(self):
+    # Requests pass in pairs, so a cap of 2 never deadlocks and anything above it shows in max_in_flight
+    barrier = threading.Barrier(2, timeout=5)
+    self.wise.on_request = lambda path: barrier.wait()
+
+    inputs = [{"transfer_id": transfer_id} for transfer_id in range(1, 7)]
+    results = self.tool.batch(inputs, {"max_concurrency": 2})
+    async_results = asyncio.run(self.tool.abatch(inputs, {"max_concurrency": 2}))
+
+    self.assertEqual([1, 2, 3, 4, 5, 6], [json.loads(result)["id"] for result in results])
+    self.assertEqual(results, async_results)
+    self.assertEqual(2, self.wise.max_in_flight)
+
+  def test_batch_returns_exceptions_in_place(self):
+    results = self.tool.batch([{"transfer_id": 1}, {"transfer_id": 404}], return_exceptions=True)
+
+    self.assertEqual(1, json.loads(results[0])["id"])
+    self.assertIsInstance(results[1], Exception)
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,124 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from tests.fake_wise import FakeWiseTestCase, activity
+from wise_agent_toolkit.ledger import ActivityLedger, format_timestamp, parse_amount
+
+
+class TestParsing(unittest.TestCase):
+
+  def test_parse_amount(self):
+    self.assertEqual((1000.5, "EUR"), parse_amount("<positive>+ 1,000.50 EUR</positive>"))
+    self.assertEqual((100.0, "USD"), parse_amount("100 USD"))
+    self.assertEqual((None, None), parse_amount(""))
+
+  def test_format_timestamp_normalizes_to_utc(self):
+    self.assertEqual("2025-01-01T09:00:00.000000Z", format_timestamp("2025-01-01T10:00:00+01:00"))
+    self.assertEqual("2025-01-01T10:00:00.000000Z", format_timestamp(datetime(2025, 1, 1, 10)))
+
+
+class TestActivityLedger(unittest.TestCase):
+
+  def setUp(self):
+    self.directory = tempfile.TemporaryDirectory()
+    self.ledger = ActivityLedger(os.path.join(self.directory.name, "store.db"))
+    self.activities = [
+      activity(1, "2025-01-05T10:00:00Z", "1,500 EUR"),
+      activity(2, "2025-01-20T10:00:00Z", "200 EUR"),
+      activity(3, "2025-02-03T10:00:00Z", "<positive>+ 2,000 GBP</positive>"),
+    ]
+
+  def tearDown(self):
+    self.ledger.close()
+    self.directory.cleanup()
+
+  def test_sync_locks_do_not_wait_for_the_connection_lock(self):
+    got = threading.Event()
+    with self.ledger._lock:
+      threading.Thread(target=lambda: (self.ledger._sync_lock("ns", 1), got.set()), daemon=True).start()
+      self.assertTrue(got.wait(5))
+
+  def test_sync_advances_high_water_mark(self):
+    result = self.ledger.sync("ns", 1, lambda since: iter(self.activities))
+
+    self.assertEqual(3, result["fetched"])
+    self.assertEqual("2025-02-03T10:00:00.000000Z", self.ledger.high_water_mark("ns", 1))
+    self.assertIsNone(self.ledger.high_water_mark("other", 1))
+
+  def test_sync_starts_from_high_water_mark_with_overlap(self):
+    self.ledger.sync("ns", 1, lambda since: iter(self.activities))
+    requested = []
+    self.ledger.sync("ns", 1, lambda since: requested.append(since) or iter(()))
+
+    self.assertEqual([datetime(2025, 1, 31, 10, tzinfo=timezone.utc)], requested)
+
+  def test_query_filters(self):
+    self.ledger.sync("ns", 1, lambda since: iter(self.activities))
+
+    january = self.ledger.query(
+      "ns", 1, since=datetime(2025, 1, 1), until=datetime(2025, 2, 1), currency="eur", min_amount=1000
+    )
+    self.assertEqual(["1"], [a["id"] for a in january])
+    self.assertEqual(["3", "2", "1"], [a["id"] for a in self.ledger.query("ns", 1)])
+    self.assertEqual(["2"], [a["id"] for a in self.ledger.query("ns", 1, max_amount=500)])
+    self.assertEqual(["1"], [a["id"] for a in self.ledger.query("ns", 1, text="Payment 1")])
+    self.assertEqual([], self.ledger.query("other", 1))
+
+  def test_resync_updates_status(self):
+    self.ledger.sync("ns", 1, lambda since: iter([activity(1, "2025-01-05T10:00:00Z", "10 EUR", "IN_PROGRESS")]))
+    self.ledger.sync("ns", 1, lambda since: iter([activity(1, "2025-01-05T10:00:00Z", "10 EUR", "COMPLETED")]))
+
+    self.assertEqual(1, len(self.ledger))
+    self.assertEqual("COMPLETED", self.ledger.query("ns", 1)[0]["status"])
+
+
+class TestWiseAPILedger(FakeWiseTestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.directory = tempfile.TemporaryDirectory()
+    self.ledger = ActivityLedger(os.path.join(self.directory.name, "store.db"))
+    now = datetime.now(timezone.utc)
+    self.wise.activities[7] = [
+      activity(i, (now - timedelta(days=30 - i)).isoformat(), f"{i * 100} EUR") for i in range(1, 26)
+    ]
+    self.wise_api = self.create_wise_api(ledger=self.ledger)
+
+  def tearDown(self):
+    self.wise_api.close()
+    self.ledger.close()
+    self.directory.cleanup()
+
+  def test_query_syncs_incrementally(self):
+    result = json.loads(self.wise_api.run("query_activity_ledger", currency="EUR", min_amount=2000))
+
+    self.assertEqual(25, result["sync"]["fetched"])
+    self.assertEqual(["25", "24", "23", "22", "21", "20"], [a["id"] for a in result["activities"]])
+    self.assertNotIn("since", self.wise.requests[0][1])
+
+    self.wise.requests.clear()
+    result = json.loads(self.wise_api.run("query_activity_ledger", min_amount=2000))
+
+    self.assertIn("since", self.wise.requests[0][1])
+    self.assertLess(result["sync"]["fetched"], 25)
+    self.assertEqual(6, result["count"])
+
+  def test_query_without_sync_makes_no_requests(self):
+    result = json.loads(self.wise_api.run("query_activity_ledger", sync=False))
+
+    self.assertEqual(0, result["count"])
+    self.assertEqual([], self.wise.requests)
+
+  def test_requires_ledger(self):
+    wise_api = self.create_wise_api()
+    with self.assertRaises(ValueError):
+      wise_api.run("query_activity_ledger")
+    wise_api.close()
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,129 @@
+import json
+import unittest
+
+try:
+  import anyio
+
+  from wise_agent_toolkit.mcp.admission import AdmissionController, OverloadedError, parse_tool_limits
+
+  _ANYIO_AVAILABLE = True
+except ImportError:
+  _ANYIO_AVAILABLE = False
+
+
+@unittest.skipUnless(_ANYIO_AVAILABLE, "anyio is not installed")
+class TestAdmissionController(unittest.TestCase):
+
+  def test_rejects_when_queue_is_full(self):
+    controller = AdmissionController(max_in_flight=4, max_reads=1, max_writes=1, max_queue=0)
+
+    async def main():
+      async with controller.admit("list_transfers", write=False):
+        with self.assertRaises(OverloadedError) as ctx:
+          async with controller.admit("list_transfers", write=False):
+            pass
+      return ctx.exception
+
+    error = anyio.run(main)
+    self.assertEqual("read", error.scope)
+    self.assertGreaterEqual(error.retry_after, 1.0)
+    self.assertEqual("overloaded", json.loads(str(error))["error"])
+    self.assertEqual(1, controller.stats()["rejected"])
+
+  def test_rejects_after_queue_timeout(self):
+    controller = AdmissionController(max_in_flight=4, max_reads=1, max_writes=1, queue_timeout=0.05)
+
+    async def main():
+      async with controller.admit("list_transfers", write=False):
+        with self.assertRaises(OverloadedError) as ctx:
+          async with controller.admit("get_transfer", write=False):
+            pass
+      return ctx.exception
+
+    error = anyio.run(main)
+    self.assertIn("Timed out", error.message)
+    self.assertEqual(0, controller.stats()["waiting"])
+
+  def test_reads_do_not_consume_write_budget(self):
+    controller = AdmissionController(max_in_flight=4, max_reads=1, max_writes=1, max_queue=0)
+
+    async def main():
+      async with controller.admit("list_transfers", write=False):
+        async with controller.admit("create_transfer", write=True):
+          return controller.stats()["in_flight"]
+
+    self.assertEqual(2, anyio.run(main))
+
+  def test_tool_limit(self):
+    controller = AdmissionController(tool_limits={"list_activities": 1}, max_queue=0)
+
+    async def main():
+      async with controller.admit("list_activities", write=False):
+        async with controller.admit("list_transfers", write=False):
+          pass
+        with self.assertRaises(OverloadedError) as ctx:
+          async with controller.admit("list_activities", write=False):
+            pass
+      return ctx.exception
+
+    self.assertEqual("tool:list_activities", anyio.run(main).scope)
+
+  def test_waiter_is_admitted_when_slot_frees(self):
+    controller = AdmissionController(max_in_flight=1, queue_timeout=5.0)
+    order = []
+
+    async def call(name, delay):
+      async with controller.admit(name, write=False):
+        order.append(name)
+        await anyio.sleep(delay)
+
+    async def main():
+      async with anyio.create_task_group() as tg:
+        tg.start_soon(call, "first", 0.05)
+        await anyio.sleep(0.01)
+        tg.start_soon(call, "second", 0)
+
+    anyio.run(main)
+    self.assertEqual(["first", "second"], order)
+    self.assertEqual(0, controller.stats()["in_flight"])
+    self.assertEqual(2, controller.stats()["admitted"])
+
+  def test_draining_rejects_new_calls(self):
+    controller = AdmissionController()
+    controller.start_draining()
+
+    async def main():
+      with self.assertRaises(OverloadedError) as ctx:
+        async with controller.admit("create_transfer", write=True):
+          pass
+      return ctx.exception
+
+    self.assertEqual("drain", anyio.run(main).scope)
+
+  def test_wait_idle_waits_for_in_flight_calls(self):
+    controller = AdmissionController()
+
+    async def call():
+      async with controller.admit("create_transfer", write=True):
+        await anyio.sleep(0.1)
+
+    async def main():
+      async with anyio.create_task_group() as tg:
+        tg.start_soon(call)
+        await anyio.sleep(0.01)
+        controller.start_draining()
+        self.assertFalse(await controller.wait_idle(0.01))
+        self.assertTrue(await controller.wait_idle(5.0))
+
+    anyio.run(main)
+    self.assertEqual(1, controller.stats()["admitted"])
+
+  def test_parse_tool_limits(self):
+    self.assertEqual({"list_transfers": 2}, parse_tool_limits(["list_transfers=2"]))
+    self.assertEqual({}, parse_tool_limits(None))
+    with self.assertRaises(ValueError):
+      parse_tool_limits(["list_transfers"])
+
+
+if __name__ == "__main__":
+  unittest.main()
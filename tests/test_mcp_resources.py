@@ -0,0 +1,88 @@
+import json
+import unittest
+
+try:
+  import mcp  # noqa: F401
+
+  from wise_agent_toolkit.mcp.resources import PROFILES_URI, ResourceCache, recipients_uri
+
+  _MCP_AVAILABLE = True
+except ImportError:
+  _MCP_AVAILABLE = False
+
+
+class FakeWiseAPI:
+
+  def __init__(self, profile_id=None):
+    self.context = {"profile_id": profile_id}
+    self.calls = []
+    self.recipients = [{"id": 10}]
+
+  def run(self, method, **kwargs):
+    self.calls.append((method, kwargs))
+    if method == "list_profiles":
+      return json.dumps([{"id": 1}, {"id": 2}])
+    return json.dumps({"content": self.recipients, "size": len(self.recipients)})
+
+
+class FakeSession:
+  pass
+
+
+@unittest.skipUnless(_MCP_AVAILABLE, "MCP is not installed")
+class TestResourceCache(unittest.TestCase):
+
+  def setUp(self):
+    self.now = 0.0
+    self.wise_api = FakeWiseAPI(profile_id=3)
+    self.cache = ResourceCache(self.wise_api, ttl=60.0, clock=lambda: self.now)
+
+  def test_read_is_served_from_snapshot_until_expiry(self):
+    self.cache.read(PROFILES_URI)
+    self.cache.read(PROFILES_URI)
+    self.assertEqual(1, len(self.wise_api.calls))
+
+    self.now = 61.0
+    self.cache.read(PROFILES_URI)
+    self.assertEqual(2, len(self.wise_api.calls))
+
+  def test_recipients_are_fetched_in_full(self):
+    self.cache.read(recipients_uri(1))
+
+    self.assertEqual(("list_recipient_accounts", {"profile_id": 1, "fetch_all": True}), self.wise_api.calls[0])
+
+  def test_resources_include_known_profiles(self):
+    self.assertEqual([PROFILES_URI, recipients_uri(3)], [uri for uri, _, _ in self.cache.resources()])
+
+    self.cache.read(PROFILES_URI)
+    uris = [uri for uri, _, _ in self.cache.resources()]
+    self.assertEqual([PROFILES_URI, recipients_uri(3), recipients_uri(1), recipients_uri(2)], uris)
+
+  def test_refresh_reports_changes(self):
+    self.cache.read(recipients_uri(1))
+    self.assertFalse(self.cache.refresh(recipients_uri(1)))
+
+    self.wise_api.recipients = []
+    self.assertTrue(self.cache.refresh(recipients_uri(1)))
+
+  def test_write_tool_invalidates_recipients(self):
+    session = FakeSession()
+    self.cache.read(PROFILES_URI)
+    self.cache.read(recipients_uri(1))
+    self.cache.subscribe(recipients_uri(2), session)
+
+    self.assertEqual([], self.cache.invalidate("create_transfer"))
+    self.assertEqual(
+      [recipients_uri(1), recipients_uri(2)],
+      self.cache.invalidate("deactivate_recipient_account"),
+    )
+    self.assertEqual([PROFILES_URI], self.cache.cached_uris())
+    self.assertEqual([session], self.cache.subscribers(recipients_uri(2)))
+
+  def test_unknown_resource(self):
+    with self.assertRaises(ValueError):
+      self.cache.read("wise://transfers")
+
+
+if __name__ == "__main__":
+  unittest.main()
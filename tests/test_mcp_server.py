@@ -0,0 +1,151 @@
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from wise_agent_toolkit.api import WiseAPI
+from wise_agent_toolkit.cancellation import CallCancelledError, current_token
+from wise_agent_toolkit.webhooks import InvalidEventError
+
+try:
+  import anyio
+
+  from wise_agent_toolkit.mcp.server import WiseMCPServer
+
+  _MCP_AVAILABLE = True
+except ImportError:
+  _MCP_AVAILABLE = False
+
+# Nothing listens on the discard port, so every request fails immediately
+UNREACHABLE_HOST = "http://127.0.0.1:9"
+
+
+@unittest.skipUnless(_MCP_AVAILABLE, "MCP is not installed")
+class TestWarmUp(unittest.TestCase):
+
+  def test_warm_up_failures_do_not_propagate(self):
+    server = WiseMCPServer(api_key="test-key", host=UNREACHABLE_HOST, profile_id=1, warm_up=True)
+
+    with self.assertLogs("wise_agent_toolkit.mcp.server", level="WARNING") as logs:
+      anyio.run(server.warm_up)
+
+    self.assertTrue(any("Warm-up step profiles failed" in line for line in logs.output))
+    self.assertTrue(any("Warm-up step recipients failed" in line for line in logs.output))
+    self.assertIsNotNone(server._mcp_tools)
+
+  def test_multi_tenant_warm_up_builds_schemas(self):
+    server = WiseMCPServer(api_key=None, host=UNREACHABLE_HOST, multi_tenant=True, warm_up=True)
+
+    with self.assertLogs("wise_agent_toolkit.mcp.server", level="WARNING"):
+      anyio.run(server.warm_up)
+
+    self.assertEqual(len(server.mcp_tools()), len(server._mcp_tools))
+
+
+@unittest.skipUnless(_MCP_AVAILABLE, "MCP is not installed")
+class TestOfferedTools(unittest.TestCase):
+
+  def test_tools_needing_missing_features_are_not_listed(self):
+    server = WiseMCPServer(api_key="test-key", host=UNREACHABLE_HOST, profile_id=1)
+    names = {tool.name for tool in server.mcp_tools()}
+
+    self.assertIn("list_transfers", names)
+    self.assertTrue(names.isdisjoint({"sync_transfers", "query_activity_ledger", "export_records"}))
+    self.assertEqual(names, set(server.tool_name_and_tool))
+
+  def test_configured_features_enable_their_tools(self):
+    with tempfile.TemporaryDirectory() as directory:
+      server = WiseMCPServer(api_key="test-key", host=UNREACHABLE_HOST, profile_id=1, export_dir=directory)
+      self.assertIn("export_records", {tool.name for tool in server.mcp_tools()})
+      self.assertIn("export_records", server.tool_name_and_tool)
+
+      tenants = WiseMCPServer(api_key=None, host=UNREACHABLE_HOST, multi_tenant=True)
+      self.assertNotIn("export_records", {tool.name for tool in tenants.mcp_tools()})
+      self.assertNotIn("export_records", tenants.tenants.get("key").tool_name_and_tool)
+
+
+@unittest.skipUnless(_MCP_AVAILABLE, "MCP is not installed")
+class TestWebhookBroadcast(unittest.TestCase):
+
+  def setUp(self):
+    self.server = WiseMCPServer(api_key=None, host=UNREACHABLE_HOST, multi_tenant=True, live_updates=True)
+    self.tenants = [self.server.tenants.get(key, 7).wise_api for key in ("key-a", "key-b")]
+    self.event = {
+      "event_type": "transfers#state-change",
+      "data": {"resource": {"id": 111}, "current_state": "outgoing_payment_sent"},
+    }
+
+  def test_every_tenant_gets_the_event_when_one_fails(self):
+    handled = []
+
+    def handle(wise_api, event):
+      if wise_api is self.tenants[0]:
+        raise RuntimeError("database is locked")
+      handled.append(wise_api)
+
+    with mock.patch.object(WiseAPI, "handle_webhook_event", autospec=True, side_effect=handle):
+      with self.assertLogs("wise_agent_toolkit.mcp.server", level="WARNING"), self.assertRaises(RuntimeError):
+        self.server.handle_webhook_event(self.event)
+    self.assertEqual([self.tenants[1]], handled)
+
+  def test_invalid_events_are_raised(self):
+    with self.assertRaises(InvalidEventError):
+      self.server.handle_webhook_event({"event_type": "transfers#state-change", "data": {"resource": {}}})
+    self.assertEqual(2, len(self.server.handle_webhook_event(self.event)))
+
+
+class _BlockedTool:
+  """A read that, like a socket read, only returns some time after being aborted."""
+
+  name = "blocked"
+
+  def __init__(self):
+    self.started = threading.Event()
+    self.returned = threading.Event()
+    self.release = threading.Event()
+
+  def execute(self, arguments):
+    token = current_token()
+    self.started.set()
+    self.release.wait(5)
+    self.returned.set()
+    token.raise_if_cancelled()
+    return "done"
+
+
+@unittest.skipUnless(_MCP_AVAILABLE, "MCP is not installed")
+class TestCancelledRead(unittest.TestCase):
+
+  def test_keeps_its_thread_slot_until_the_worker_returns(self):
+    server = WiseMCPServer(api_key="test-key", host=UNREACHABLE_HOST, profile_id=1)
+    server._progress_sender = lambda: (lambda progress, total, message: None)
+    limiter = server.admission.thread_limiter
+    tool = _BlockedTool()
+    observed = {}
+
+    async def main():
+      scope = anyio.CancelScope()
+
+      async def call():
+        with scope:
+          await server._run_read(tool, {})
+
+      async with anyio.create_task_group() as task_group:
+        task_group.start_soon(call)
+        await anyio.to_thread.run_sync(tool.started.wait)
+        scope.cancel()
+        for _ in range(10):
+          await anyio.sleep(0)
+        # The cancelled call is still running: its slot must still be taken
+        observed["borrowed"] = limiter.borrowed_tokens
+        tool.release.set()
+
+    anyio.run(main)
+
+    self.assertEqual(1, observed["borrowed"])
+    self.assertTrue(tool.returned.is_set())
+    self.assertEqual(0, limiter.borrowed_tokens)
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+from unittest import mock
+
+import urllib3
+
+try:
+  import mcp  # noqa: F401
+
+  from wise_agent_toolkit.mcp.tenants import TenantRegistry, credentials_from_headers
+
+  _MCP_AVAILABLE = True
+except ImportError:
+  _MCP_AVAILABLE = False
+
+
+@unittest.skipUnless(_MCP_AVAILABLE, "MCP is not installed")
+class TestTenantRegistry(unittest.TestCase):
+
+  def setUp(self):
+    self.now = 0.0
+    self.registry = TenantRegistry(
+      host="https://api.sandbox.transferwise.tech",
+      max_tenants=2,
+      idle_timeout=60.0,
+      clock=lambda: self.now,
+    )
+
+  def test_same_credentials_reuse_tenant(self):
+    first = self.registry.get("key-a", 1)
+    second = self.registry.get("key-a", 1)
+
+    self.assertIs(first, second)
+    self.assertEqual(1, len(self.registry))
+
+  def test_tenants_share_transport_per_host(self):
+    tenant_a = self.registry.get("key-a", 1)
+    tenant_b = self.registry.get("key-b", 2)
+
+    self.assertIsNot(tenant_a.wise_api, tenant_b.wise_api)
+    self.assertIs(tenant_a.wise_api.rest_client, tenant_b.wise_api.rest_client)
+    self.assertEqual("2", str(tenant_b.wise_api._context.get("profile_id")))
+
+  def test_least_recently_used_tenant_is_evicted(self):
+    tenant_a = self.registry.get("key-a")
+    self.registry.get("key-b")
+    self.registry.get("key-a")
+    self.registry.get("key-c")
+
+    self.assertEqual(2, len(self.registry))
+    self.assertIs(tenant_a, self.registry.get("key-a"))
+    self.assertEqual(2, len(self.registry))
+
+  def test_idle_tenants_are_evicted(self):
+    tenant_a = self.registry.get("key-a")
+    self.now = 61.0
+
+    self.assertEqual(1, self.registry.evict_idle())
+    self.assertEqual(0, len(self.registry))
+    self.assertIsNot(tenant_a, self.registry.get("key-a"))
+
+  def test_evicted_tenants_are_closed(self):
+    tenant_a = self.registry.get("key-a")
+    self.registry.get("key-b")
+    executor = tenant_a.wise_api.executor
+    tenant_a.resources._snapshots["wise://profiles"] = ("[]", 0.0)
+
+    with mock.patch.object(urllib3.PoolManager, "clear", autospec=True) as clear:
+      self.registry.get("key-c")
+      self.now = 61.0
+      self.assertEqual(2, self.registry.evict_idle())
+
+    clear.assert_not_called()
+    self.assertTrue(executor._shutdown)
+    self.assertEqual([], tenant_a.resources.cached_uris())
+    with self.assertRaises(RuntimeError):
+      tenant_a.wise_api.transfer_watcher.wait(1, timeout=1)
+
+  def test_api_key_is_required(self):
+    with self.assertRaises(ValueError):
+      self.registry.get("", 1)
+
+  def test_credentials_from_headers(self):
+    headers = {"authorization": "Bearer secret", "x-wise-profile-id": "42"}
+
+    self.assertEqual(("secret", 42), credentials_from_headers(headers))
+    self.assertEqual(("default", 7), credentials_from_headers({}, "default", 7))
+
+    with self.assertRaises(ValueError):
+      credentials_from_headers({"x-wise-profile-id": "abc"})
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+from wise_agent_toolkit.prompts import CREATE_QUOTE_PROMPT, CREATE_RECIPIENT_ACCOUNT_PROMPT, describe_tool
+from wise_agent_toolkit.schema import CreateQuote, CreateRecipientAccount
+from wise_agent_toolkit.tools import tool_description, tools
+
+try:
+  from wise_agent_toolkit.mcp.server import WiseMCPServer
+
+  _MCP_AVAILABLE = True
+except ImportError:
+  _MCP_AVAILABLE = False
+
+
+class TestDescriptionProfiles(unittest.TestCase):
+
+  def test_full_is_the_prompt(self):
+    self.assertIs(CREATE_QUOTE_PROMPT, describe_tool(CREATE_QUOTE_PROMPT, CreateQuote, "full"))
+    self.assertIs(tools[0]["description"], tool_description(tools[0]))
+
+  def test_compact_leaves_arguments_to_the_schema(self):
+    compact = describe_tool(CREATE_QUOTE_PROMPT, CreateQuote, "compact")
+
+    self.assertEqual(
+      "This tool will create a quote for currency conversion in Wise.\n\n"
+      "Note: Provide either source_amount or target_amount, not both.\n\n"
+      "Returns: The created quote object from Wise.",
+      compact,
+    )
+
+  def test_compact_keeps_arguments_missing_from_the_schema(self):
+    compact = describe_tool(CREATE_RECIPIENT_ACCOUNT_PROMPT, CreateRecipientAccount, "compact")
+
+    self.assertIn("- **kwargs: Dynamic fields based on account requirements.", compact)
+    self.assertIn("  - details (dict):", compact)
+    self.assertNotIn("account_holder_name", compact)
+
+  def test_minimal_is_the_first_sentence(self):
+    self.assertEqual(
+      "Create a quote for currency conversion in Wise.", describe_tool(CREATE_QUOTE_PROMPT, CreateQuote, "minimal")
+    )
+    search = next(tool for tool in tools if tool["method"] == "search_recipients")
+    self.assertTrue(tool_description(search, "minimal").endswith('e.g. to find "Anna\'s EUR account".'))
+
+  def test_profiles_shrink_every_description(self):
+    for tool in tools:
+      full, compact, minimal = (len(tool_description(tool, profile)) for profile in ("full", "compact", "minimal"))
+      self.assertLessEqual(compact, full, tool["method"])
+      self.assertLessEqual(minimal, compact, tool["method"])
+
+  def test_unknown_profile(self):
+    with self.assertRaises(ValueError):
+      tool_description(tools[0], "tiny")
+
+  @unittest.skipUnless(_MCP_AVAILABLE, "MCP is not installed")
+  def test_mcp_tools_use_the_configured_profile(self):
+    server = WiseMCPServer(api_key="test-key", profile_id=1, description_profile="minimal")
+    descriptions = {tool.name: tool.description for tool in server.mcp_tools()}
+
+    self.assertEqual("Create a transfer between accounts in Wise.", descriptions["create_transfer"])
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from tests.fake_wise import FakeWiseTestCase
+from wise_agent_toolkit.quotes import QuoteCache
+
+NOW = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+class TestQuoteCache(unittest.TestCase):
+
+  def setUp(self):
+    self.now = NOW
+    self.cache = QuoteCache(margin=60.0, max_quotes=2, clock=lambda: self.now)
+
+  def _quote(self, quote_id, minutes=30, status="PENDING"):
+    return {"id": quote_id, "status": status, "expirationTime": NOW + timedelta(minutes=minutes)}
+
+  def test_reused_until_margin_before_expiry(self):
+    self.cache.put(("k",), self._quote("q1"), "q1")
+
+    self.assertEqual("q1", self.cache.get(("k",)))
+    self.now = NOW + timedelta(minutes=29)
+    self.assertIsNone(self.cache.get(("k",)))
+
+  def test_discard(self):
+    self.cache.put(("k",), self._quote("q1"), "q1")
+    self.cache.discard("q1")
+    self.assertIsNone(self.cache.get(("k",)))
+
+  def test_only_pending_quotes_with_expiry_are_kept(self):
+    self.cache.put(("a",), self._quote("q1", status="ACCEPTED"), "q1")
+    self.cache.put(("b",), {"id": "q2", "status": "PENDING"}, "q2")
+    self.assertEqual(0, len(self.cache))
+
+  def test_bounded(self):
+    self.cache.put(("a",), self._quote("q1", minutes=10), "q1")
+    self.cache.put(("b",), self._quote("q2", minutes=20), "q2")
+    self.cache.put(("c",), self._quote("q3", minutes=30), "q3")
+
+    self.assertEqual(2, len(self.cache))
+    self.assertIsNone(self.cache.get(("a",)))
+
+
+class TestWiseAPIQuoteReuse(FakeWiseTestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.wise.quote_expiration = NOW + timedelta(minutes=30)
+    self.now = NOW
+    self.wise_api = self.create_wise_api(quote_cache=QuoteCache(clock=lambda: self.now))
+
+  def tearDown(self):
+    self.wise_api.close()
+
+  def test_identical_quote_is_reused(self):
+    first = self.wise_api.run("create_quote", source_currency="EUR", target_currency="GBP", source_amount=100)
+    second = self.wise_api.run("create_quote", source_currency="eur", target_currency="GBP", source_amount=100.0)
+
+    self.assertEqual(first, second)
+    self.assertEqual(1, self.wise.quotes_created)
+
+    self.wise_api.run("create_quote", source_currency="EUR", target_currency="GBP", source_amount=200)
+    self.wise_api.run("create_quote", source_currency="EUR", target_currency="GBP", target_amount=100)
+    self.assertEqual(3, self.wise.quotes_created)
+
+  def test_expiring_quote_is_not_reused(self):
+    self.wise_api.run("create_quote", source_currency="EUR", target_currency="GBP", source_amount=100)
+    self.now = NOW + timedelta(minutes=29, seconds=30)
+    self.wise_api.run("create_quote", source_currency="EUR", target_currency="GBP", source_amount=100)
+
+    self.assertEqual(2, self.wise.quotes_created)
+
+  def test_without_cache_every_call_creates_a_quote(self):
+    wise_api = self.create_wise_api()
+    for _ in range(2):
+      wise_api.run("create_quote", source_currency="EUR", target_currency="GBP", source_amount=100)
+    wise_api.close()
+
+    self.assertEqual(2, self.wise.quotes_created)
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+
+from wise_agent_toolkit.recipients import RecipientIndex
+
+
+def _recipient(recipient_id, full_name, currency, iban=None, account_summary=None, profile_id=1):
+  recipient = {
+    "id": recipient_id,
+    "profileId": profile_id,
+    "name": {"fullName": full_name},
+    "currency": currency,
+    "active": True,
+    "accountSummary": account_summary,
+  }
+  if iban is not None:
+    recipient["displayFields"] = [{"key": "IBAN", "label": "IBAN", "value": iban}]
+  return recipient
+
+
+class TestRecipientIndex(unittest.TestCase):
+
+  def setUp(self):
+    self.now = 0.0
+    self.fetches = []
+    self.recipients = [
+      _recipient(1, "Anna Schmidt", "EUR", iban="DE89 3704 0044 0532 0130 00"),
+      _recipient(2, "Anna Schmidt", "GBP", account_summary="(ending 5678)"),
+      _recipient(3, "Zoë O'Brien", "EUR", iban="IE29AIBK93115212345699"),
+      _recipient(4, "Hannah Smith", "USD", account_summary="(ending 1234)"),
+    ]
+    self.index = RecipientIndex(self._fetch, ttl=60.0, clock=lambda: self.now)
+
+  def _fetch(self, profile_id):
+    self.fetches.append(profile_id)
+    return list(self.recipients)
+
+  def _ids(self, matches):
+    return [match["id"] for match in matches]
+
+  def test_fuzzy_name_search(self):
+    matches = self.index.search(1, query="ana schmit")
+
+    self.assertEqual([1, 2], self._ids(matches)[:2])
+    self.assertIn("score", matches[0])
+    self.assertEqual([3], self._ids(self.index.search(1, query="zoe obrien")))
+    self.assertEqual([], self.index.search(1, query="Kowalski"))
+
+  def test_exact_filters(self):
+    self.assertEqual([1], self._ids(self.index.search(1, query="anna", currency="eur")))
+    self.assertEqual([1], self._ids(self.index.search(1, iban="DE89370400440532013000")))
+    self.assertEqual([2], self._ids(self.index.search(1, account_ending="5678")))
+    self.assertEqual([3], self._ids(self.index.search(1, account_ending="345699")))
+
+  def test_limit(self):
+    self.assertEqual(1, len(self.index.search(1, query="anna", limit=1)))
+
+  def test_fetches_once_until_expired(self):
+    self.index.search(1, query="anna")
+    self.index.search(1, currency="EUR")
+    self.assertEqual([1], self.fetches)
+
+    self.now = 61.0
+    self.index.search(1, query="anna")
+    self.assertEqual([1, 1], self.fetches)
+
+  def test_create_and_deactivate_update_index(self):
+    self.index.search(1)
+
+    self.index.add(_recipient(5, "Anneliese Schmitz", "CHF"))
+    self.assertEqual([5], self._ids(self.index.search(1, currency="CHF")))
+
+    self.index.remove(1, profile_id=1)
+    self.assertEqual([3], self._ids(self.index.search(1, currency="EUR")))
+    self.assertEqual([1], self.fetches)
+
+  def test_add_ignores_profiles_not_yet_indexed(self):
+    self.index.add(_recipient(5, "Anneliese Schmitz", "CHF", profile_id=2))
+    self.index.search(2)
+    self.assertEqual([2], self.fetches)
+
+
+if __name__ == "__main__":
+  unittest.main()
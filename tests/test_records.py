@@ -0,0 +1,87 @@
+import math
+import tracemalloc
+import unittest
+from datetime import datetime, timezone
+
+import wise_api_client
+
+from wise_agent_toolkit.analytics import TransferColumns, summarize
+from wise_agent_toolkit.records import TransferRecord
+
+
+def _transfer(transfer_id, status="outgoing_payment_sent", target_currency="GBP"):
+  return wise_api_client.ListTransfers200ResponseInner.from_dict({
+    "id": transfer_id,
+    "user": 1,
+    "targetAccount": 100,
+    "quoteUuid": "c8b9a0e2-5f1d-4a0e-9c3c-1a2b3c4d5e6f",
+    "status": status,
+    "rate": 0.9,
+    "created": "2025-01-05 10:00:00",
+    "details": {"reference": f"invoice {transfer_id}"},
+    "sourceCurrency": "EUR",
+    "sourceValue": 100.0,
+    "targetCurrency": target_currency,
+    "targetValue": 90.0,
+  }).to_dict()
+
+
+class TestTransferRecord(unittest.TestCase):
+
+  def test_hot_fields(self):
+    record = TransferRecord(_transfer(1))
+
+    self.assertEqual((1, "outgoing_payment_sent", 100), (record.id, record.status, record.target_account))
+    self.assertEqual(("EUR", 100.0, "GBP", 90.0),
+                     (record.source_currency, record.source_value, record.target_currency, record.target_value))
+    self.assertEqual(datetime(2025, 1, 5, 10, tzinfo=timezone.utc), record.created_at)
+    self.assertFalse(hasattr(record, "__dict__"))
+
+  def test_lazy_expansion(self):
+    transfer = _transfer(1)
+    record = TransferRecord(transfer)
+
+    self.assertEqual("invoice 1", record.to_dict()["details"]["reference"])
+    self.assertEqual(transfer, record.to_model().to_dict())
+
+  def test_without_body(self):
+    record = TransferRecord(_transfer(1), keep_body=False)
+    with self.assertRaises(ValueError):
+      record.to_dict()
+
+  def test_missing_fields(self):
+    record = TransferRecord({"id": 1})
+    self.assertTrue(math.isnan(record.source_value))
+    self.assertIsNone(record.created_at)
+
+  def test_strings_are_shared(self):
+    first, second = TransferRecord(_transfer(1)), TransferRecord(_transfer(2))
+    self.assertIs(first.status, second.status)
+    self.assertIs(first.target_currency, second.target_currency)
+
+  def test_smaller_than_dictionaries(self):
+    def allocated(build):
+      tracemalloc.start()
+      held = build([_transfer(i) for i in range(1, 501)])
+      size = tracemalloc.get_traced_memory()[0]
+      tracemalloc.stop()
+      del held
+      return size
+
+    dictionaries = allocated(list)
+    records = allocated(lambda transfers: [TransferRecord(t, keep_body=False) for t in transfers])
+    self.assertLess(records, dictionaries / 3)
+
+
+class TestAnalyticsFromRecords(unittest.TestCase):
+
+  def test_records_and_dictionaries_summarize_alike(self):
+    transfers = [_transfer(1), _transfer(2, "cancelled"), _transfer(3, target_currency="USD")]
+    from_records = summarize(TransferColumns(TransferRecord(t) for t in transfers), ["status", "target_currency"])
+    from_dictionaries = summarize(TransferColumns(transfers), ["status", "target_currency"])
+
+    self.assertEqual(from_dictionaries["rows"], from_records["rows"])
+
+
+if __name__ == "__main__":
+  unittest.main()
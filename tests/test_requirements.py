@@ -0,0 +1,179 @@
+import http.server
+import json
+import threading
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from wise_agent_toolkit.api import WiseAPI
+from wise_agent_toolkit.configuration import Context
+from wise_agent_toolkit.requirements import AccountRequirementsCache, CompiledRequirements, quote_route
+from wise_agent_toolkit.validation import InvalidArgumentsError
+
+REQUIREMENTS = [
+  {
+    "type": "sort_code",
+    "title": "Local bank account",
+    "fields": [
+      {"name": "Legal type", "group": [{
+        "key": "legalType", "name": "Legal type", "type": "select", "required": True,
+        "valuesAllowed": [{"key": "PRIVATE", "name": "Person"}, {"key": "BUSINESS", "name": "Business"}],
+      }]},
+      {"name": "Sort code", "group": [{
+        "key": "sortCode", "name": "UK sort code", "type": "text", "required": True,
+        "validationRegexp": "^[0-9]{6}$",
+      }]},
+      {"name": "Account number", "group": [{
+        "key": "accountNumber", "name": "Account number", "type": "text", "required": True,
+        "validationRegexp": "^[0-9]{8}$",
+      }]},
+      {"name": "City", "group": [{"key": "address.city", "name": "City", "type": "text", "required": False}]},
+    ],
+  },
+]
+
+
+def _payload(**details):
+  return {"accountHolderName": "Ann", "currency": "GBP", "type": "sort_code", "details": details}
+
+
+class _QuotesHandler(http.server.BaseHTTPRequestHandler):
+  requirement_requests = 0
+  posts = 0
+
+  def do_GET(self):
+    if self.path.startswith("/v1/quotes/"):
+      _QuotesHandler.requirement_requests += 1
+      self._send(REQUIREMENTS)
+    else:
+      quote_id = self.path.rsplit("/", 1)[1]
+      expiration = (datetime.now(timezone.utc) + timedelta(minutes=30)).isoformat()
+      self._send({
+        "id": quote_id,
+        "sourceCurrency": "EUR",
+        "targetCurrency": "GBP",
+        "sourceAmount": 250.0 if quote_id != "large" else 25000.0,
+        "expirationTime": expiration,
+      })
+
+  def do_POST(self):
+    _QuotesHandler.posts += 1
+    self._send({"id": 1, "currency": "GBP", "active": True})
+
+  def _send(self, body):
+    data = json.dumps(body).encode()
+    self.send_response(200)
+    self.send_header("Content-Type", "application/json")
+    self.send_header("Content-Length", str(len(data)))
+    self.end_headers()
+    self.wfile.write(data)
+
+  def log_message(self, *args):
+    pass
+
+
+class TestCompiledRequirements(unittest.TestCase):
+
+  def test_valid_payload(self):
+    compiled = CompiledRequirements(REQUIREMENTS)
+    self.assertEqual([], compiled.errors(_payload(legalType="PRIVATE", sortCode="231470", accountNumber="28821822")))
+
+  def test_reports_every_invalid_field(self):
+    errors = CompiledRequirements(REQUIREMENTS).errors(_payload(legalType="ROBOT", sortCode="23-14-70"))
+
+    self.assertEqual(3, len(errors))
+    self.assertTrue(errors[0].startswith("legalType (Legal type): must be one of BUSINESS, PRIVATE"))
+    self.assertIn("sortCode", errors[1])
+    self.assertIn("accountNumber (Account number): is required", errors[2])
+
+  def test_unknown_type_is_not_checked(self):
+    self.assertEqual([], CompiledRequirements(REQUIREMENTS).errors({"type": "iban", "details": {}}))
+
+
+class TestAccountRequirementsCache(unittest.TestCase):
+
+  def test_route_bands_amounts(self):
+    quote = {"sourceCurrency": "eur", "targetCurrency": "GBP", "sourceAmount": 250.0}
+    self.assertEqual(("EUR", "GBP", "source:2", False), quote_route(quote))
+    self.assertEqual(quote_route(quote), quote_route({**quote, "sourceAmount": 999.0}))
+    self.assertNotEqual(quote_route(quote), quote_route({**quote, "sourceAmount": 1000.0}))
+    self.assertIsNone(quote_route({"sourceAmount": 1}))
+
+  def test_expiry(self):
+    now = [0.0]
+    cache = AccountRequirementsCache(ttl=10.0, clock=lambda: now[0])
+    cache.remember_quote({"id": "q1", "sourceCurrency": "EUR", "targetCurrency": "GBP", "sourceAmount": 250.0})
+    route = cache.route("q1")
+    cache.put(route, json.dumps(REQUIREMENTS))
+
+    self.assertIsNotNone(cache.get(route))
+    now[0] = 11.0
+    self.assertIsNone(cache.get(route))
+    cache.validate(_payload())  # expired forms no longer validate
+
+  def test_rejected_only_if_every_form_rejects(self):
+    cache = AccountRequirementsCache()
+    relaxed = json.loads(json.dumps(REQUIREMENTS))
+    relaxed[0]["fields"][2]["group"][0]["required"] = False
+    cache.put(("EUR", "GBP", "source:2", False), json.dumps(REQUIREMENTS))
+    cache.put(("USD", "GBP", "source:2", False), json.dumps(relaxed))
+
+    cache.validate(_payload(legalType="PRIVATE", sortCode="231470"))
+    with self.assertRaises(InvalidArgumentsError):
+      cache.validate(_payload(legalType="PRIVATE", sortCode="1"))
+
+
+class TestWiseAPIRequirements(unittest.TestCase):
+
+  @classmethod
+  def setUpClass(cls):
+    cls.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _QuotesHandler)
+    threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+  @classmethod
+  def tearDownClass(cls):
+    cls.server.shutdown()
+    cls.server.server_close()
+
+  def setUp(self):
+    _QuotesHandler.requirement_requests = 0
+    _QuotesHandler.posts = 0
+    self.wise_api = WiseAPI(
+      api_key="key", host=f"http://127.0.0.1:{self.server.server_port}", context=Context(profile_id=7)
+    )
+
+  def tearDown(self):
+    self.wise_api.close()
+
+  def test_requirements_shared_by_quotes_on_same_route(self):
+    for quote_id in ("q1", "q2", "large"):
+      self.wise_api.run("get_quote_by_id", quote_id=quote_id)
+
+    first = self.wise_api.run("get_account_requirements", quote_id="q1")
+    self.assertEqual(first, self.wise_api.run("get_account_requirements", quote_id="q2"))
+    self.assertEqual(1, _QuotesHandler.requirement_requests)
+
+    self.wise_api.run("get_account_requirements", quote_id="large")
+    self.wise_api.run("get_account_requirements", quote_id="unknown")
+    self.assertEqual(3, _QuotesHandler.requirement_requests)
+
+  def test_invalid_recipient_rejected_before_post(self):
+    self.wise_api.run("get_quote_by_id", quote_id="q1")
+    self.wise_api.run("get_account_requirements", quote_id="q1")
+
+    with self.assertRaises(InvalidArgumentsError) as raised:
+      self.wise_api.run(
+        "create_recipient_account", account_holder_name="Ann", currency="GBP", type="sort_code",
+        details={"legalType": "PRIVATE", "sortCode": "12", "accountNumber": "28821822"},
+      )
+    self.assertIn("sortCode", str(raised.exception))
+    self.assertEqual(0, _QuotesHandler.posts)
+
+    self.wise_api.run(
+      "create_recipient_account", account_holder_name="Ann", currency="GBP", type="sort_code",
+      details={"legalType": "PRIVATE", "sortCode": "231470", "accountNumber": "28821822"},
+    )
+    self.assertEqual(1, _QuotesHandler.posts)
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+
+from wise_agent_toolkit.retrieval import ToolIndex, tokenize
+from wise_agent_toolkit.tools import select_tools, tools
+
+try:
+  import anyio
+  from mcp.shared.memory import create_connected_server_and_client_session
+  from mcp.types import ClientRequest, ListToolsRequest, ListToolsResult, PaginatedRequestParams
+
+  from wise_agent_toolkit.mcp.server import TOOL_QUERY_META, TOP_K_META, WiseMCPServer
+
+  _MCP_AVAILABLE = True
+except ImportError:
+  _MCP_AVAILABLE = False
+
+
+class TestToolIndex(unittest.TestCase):
+
+  @classmethod
+  def setUpClass(cls):
+    cls.index = ToolIndex(tools)
+
+  def top(self, query, k=5):
+    return [tool["method"] for tool, _ in self.index.search(query, k)]
+
+  def test_tokenize(self):
+    self.assertEqual(["create", "transfer", "100", "eur", "anna"], tokenize("Send 100 EUR to Anna's"))
+    self.assertEqual(["recipient", "activity"], tokenize("the payees' activities"))
+
+  def test_ranking(self):
+    self.assertEqual("search_recipients", self.top("find Anna's EUR account")[0])
+    self.assertEqual("cancel_transfer", self.top("cancel transfer 123")[0])
+    self.assertEqual("list_transfers", self.top("Show all my recent transfers")[0])
+    self.assertEqual("export_records", self.top("export my payments to csv")[0])
+    self.assertIn("create_transfer", self.top("Send 100 EUR to Anna"))
+
+  def test_select(self):
+    selected = self.index.select("cancel transfer 123", k=3)
+    self.assertEqual(3, len(selected))
+    # In the order of the tool list, not by score
+    self.assertEqual([tool for tool in tools if tool in selected], selected)
+
+  def test_no_match_selects_every_tool(self):
+    self.assertEqual([], self.index.search("hello"))
+    self.assertEqual(tools, self.index.select("hello"))
+
+  def test_select_tools(self):
+    self.assertEqual(self.index.select("cancel transfer 123", k=3), select_tools("cancel transfer 123", k=3))
+    candidates = [tool for tool in tools if tool["method"] != "cancel_transfer"]
+    self.assertNotIn("cancel_transfer", [tool["method"] for tool in select_tools("cancel transfer", 3, candidates)])
+
+
+@unittest.skipUnless(_MCP_AVAILABLE, "MCP is not installed")
+class TestListTools(unittest.TestCase):
+
+  def list_tools(self, server, meta=None):
+    async def main():
+      async with create_connected_server_and_client_session(server.server) as client:
+        params = PaginatedRequestParams(_meta=meta) if meta else None
+        request = ClientRequest(ListToolsRequest(method="tools/list", params=params))
+        return await client.send_request(request, ListToolsResult)
+
+    return [tool.name for tool in anyio.run(main).tools]
+
+  def test_filters_by_query(self):
+    server = WiseMCPServer(api_key="test-key", profile_id=1)
+
+    self.assertEqual(len(server.mcp_tools()), len(self.list_tools(server)))
+    names = self.list_tools(server, {TOOL_QUERY_META: "cancel transfer 123", TOP_K_META: 2})
+    self.assertEqual(2, len(names))
+    self.assertIn("cancel_transfer", names)
+
+  def test_cache_refresh_lists_every_tool(self):
+    server = WiseMCPServer(api_key="test-key", profile_id=1)
+    anyio.run(server.server.request_handlers[ListToolsRequest], None)
+
+    self.assertEqual(len(server.mcp_tools()), len(server.server._tool_cache))
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,185 @@
+import http.server
+import json
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from wise_agent_toolkit.api import WiseAPI
+from wise_agent_toolkit.store import ObjectStore, is_immutable_quote, is_immutable_transfer
+
+
+def _write_objects(path, worker):
+  store = ObjectStore(path)
+  for i in range(50):
+    store.put("ns", "transfer", f"{worker}-{i}", "{}")
+
+
+class _TransferHandler(http.server.BaseHTTPRequestHandler):
+  requests = 0
+
+  def do_GET(self):
+    _TransferHandler.requests += 1
+    transfer_id = int(self.path.rsplit("/", 1)[1])
+    status = "outgoing_payment_sent" if transfer_id == 1 else "processing"
+    body = json.dumps({
+      "id": transfer_id,
+      "user": 1,
+      "targetAccount": 100,
+      "status": status,
+      "rate": 1.1,
+      "created": "2025-01-01T10:00:00Z",
+      "details": {"reference": "rent"},
+      "sourceCurrency": "EUR",
+      "sourceValue": 100.0,
+      "targetCurrency": "GBP",
+      "targetValue": 90.0,
+      "customerTransactionId": "c1",
+    }).encode()
+    self.send_response(200)
+    self.send_header("Content-Type", "application/json")
+    self.send_header("Content-Length", str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def log_message(self, *args):
+    pass
+
+
+class TestObjectStore(unittest.TestCase):
+
+  def setUp(self):
+    self.directory = tempfile.TemporaryDirectory()
+    self.path = os.path.join(self.directory.name, "store.db")
+    self.store = ObjectStore(self.path, max_bytes=1000)
+
+  def tearDown(self):
+    self.store.close()
+    self.directory.cleanup()
+
+  def test_put_and_get(self):
+    self.store.put("ns", "transfer", "1", '{"id": 1}')
+
+    self.assertEqual('{"id": 1}', self.store.get("ns", "transfer", "1"))
+    self.assertIsNone(self.store.get("ns", "quote", "1"))
+    self.assertIsNone(self.store.get("other", "transfer", "1"))
+
+  def test_survives_reopening(self):
+    self.store.put("ns", "transfer", "1", '{"id": 1}')
+
+    reopened = ObjectStore(self.path)
+    self.assertEqual('{"id": 1}', reopened.get("ns", "transfer", "1"))
+    reopened.close()
+
+  def test_evicts_least_recently_used_objects(self):
+    for i in range(10):
+      self.store.put("ns", "transfer", str(i), "x" * 200)
+
+    self.assertLessEqual(self.store.size(), 1000)
+    self.assertIsNone(self.store.get("ns", "transfer", "0"))
+    self.assertIsNotNone(self.store.get("ns", "transfer", "9"))
+
+  def test_size_is_kept_without_scanning(self):
+    self.store.put("ns", "transfer", "1", "x" * 100)
+    self.store.put("ns", "transfer", "1", "x" * 300)
+    self.store.put("ns", "transfer", "2", "x" * 200)
+    self.assertEqual(500, self.store.size())
+
+    statements = []
+    self.store._connection().set_trace_callback(statements.append)
+    self.store.put("ns", "transfer", "3", "x" * 200)
+    self.assertFalse([s for s in statements if "total(size)" in s or "sum(size)" in s])
+    self.assertEqual(700, self.store.size())
+
+    for i in range(4, 10):
+      self.store.put("ns", "transfer", str(i), "x" * 200)
+    size = self.store._connection().execute("SELECT sum(size) FROM objects").fetchone()[0]
+    self.assertEqual(size, self.store.size())
+    self.assertLessEqual(size, 1000)
+
+  def test_size_of_a_store_created_without_the_total(self):
+    self.store.put("ns", "transfer", "1", "x" * 100)
+    self.store._connection().execute("DROP TABLE objects_meta")
+    self.store.close()
+
+    reopened = ObjectStore(self.path)
+    self.assertEqual(100, reopened.size())
+    reopened.close()
+
+  def test_concurrent_writers(self):
+    store = ObjectStore(self.path, max_bytes=1024 * 1024)
+    processes = [multiprocessing.Process(target=_write_objects, args=(self.path, worker)) for worker in range(4)]
+    for process in processes:
+      process.start()
+    for process in processes:
+      process.join()
+
+    self.assertEqual([0, 0, 0, 0], [process.exitcode for process in processes])
+    self.assertEqual(200, len(store))
+    store.close()
+
+  def test_close_closes_the_connections_of_every_thread(self):
+    connections = []
+    worker = threading.Thread(target=lambda: connections.append(self.store._connection()))
+    worker.start()
+    worker.join()
+
+    self.store.close()
+
+    with self.assertRaises(sqlite3.ProgrammingError):
+      connections[0].execute("SELECT 1")
+    # The store opens a new connection when it is used again
+    self.store.put("ns", "transfer", "1", "{}")
+    self.assertEqual("{}", self.store.get("ns", "transfer", "1"))
+
+  def test_immutability(self):
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    self.assertTrue(is_immutable_transfer({"status": "cancelled"}))
+    self.assertFalse(is_immutable_transfer({"status": "processing"}))
+    self.assertTrue(is_immutable_quote({"status": "EXPIRED"}))
+    self.assertTrue(is_immutable_quote({"status": "PENDING", "expirationTime": now - timedelta(minutes=1)}, now))
+    self.assertTrue(is_immutable_quote({"status": "PENDING", "expirationTime": "2024-12-31T23:00:00Z"}, now))
+    self.assertFalse(is_immutable_quote({"status": "PENDING", "expirationTime": now + timedelta(minutes=1)}, now))
+
+
+class TestWiseAPIStore(unittest.TestCase):
+
+  def setUp(self):
+    self.directory = tempfile.TemporaryDirectory()
+    self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _TransferHandler)
+    self.server.daemon_threads = True
+    threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    self.host = f"http://127.0.0.1:{self.server.server_address[1]}"
+    self.store = ObjectStore(os.path.join(self.directory.name, "store.db"))
+    _TransferHandler.requests = 0
+
+  def tearDown(self):
+    self.server.shutdown()
+    self.server.server_close()
+    self.store.close()
+    self.directory.cleanup()
+
+  def test_terminal_transfers_are_served_from_store(self):
+    wise_api = WiseAPI(api_key="test-api-key", host=self.host, context={}, store=self.store)
+
+    first = wise_api.run("get_transfer_by_id", transfer_id=1)
+    second = wise_api.run("get_transfer_by_id", transfer_id=1)
+    wise_api.run("get_transfer_by_id", transfer_id=2)
+    wise_api.run("get_transfer_by_id", transfer_id=2)
+
+    self.assertEqual(first, second)
+    self.assertEqual(3, _TransferHandler.requests)
+
+  def test_store_is_namespaced_by_api_key(self):
+    WiseAPI(api_key="key-a", host=self.host, context={}, store=self.store).run("get_transfer_by_id", transfer_id=1)
+    WiseAPI(api_key="key-b", host=self.host, context={}, store=self.store).run("get_transfer_by_id", transfer_id=1)
+
+    self.assertEqual(2, _TransferHandler.requests)
+
+
+if __name__ == "__main__":
+  unittest.main()
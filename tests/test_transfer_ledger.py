@@ -0,0 +1,138 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from datetime import date
+
+from tests.fake_wise import FakeWiseTestCase, transfer
+from wise_agent_toolkit.transfer_ledger import TransferLedger
+
+
+class TestTransferLedger(unittest.TestCase):
+
+  def setUp(self):
+    self.directory = tempfile.TemporaryDirectory()
+    self.ledger = TransferLedger(os.path.join(self.directory.name, "store.db"), max_rechecks=10)
+    self.transfers = {
+      1: transfer(1, "2025-01-05 10:00:00", "outgoing_payment_sent"),
+      2: transfer(2, "2025-01-20 10:00:00", "processing"),
+    }
+    self.since = []
+    self.rechecked = []
+
+  def tearDown(self):
+    self.ledger.close()
+    self.directory.cleanup()
+
+  def test_sync_locks_do_not_wait_for_the_connection_lock(self):
+    got = threading.Event()
+    with self.ledger._lock:
+      threading.Thread(target=lambda: (self.ledger._sync_lock("ns", 1), got.set()), daemon=True).start()
+      self.assertTrue(got.wait(5))
+
+  def _sync(self, limit=100):
+    def fetch(since):
+      self.since.append(since)
+      return [t for t in self.transfers.values() if since is None or t["created"][:10] >= since.isoformat()]
+
+    def fetch_transfer(transfer_id):
+      self.rechecked.append(transfer_id)
+      return self.transfers[transfer_id]
+
+    return self.ledger.sync("ns", 7, fetch, fetch_transfer, limit=limit)
+
+  def test_first_sync_reports_everytransfer(self):
+    result = self._sync()
+
+    self.assertIsNone(self.since[0])
+    self.assertEqual((2, 0), (result["created"], result["updated"]))
+    self.assertEqual([1, 2], [change["id"] for change in result["changes"]])
+    self.assertEqual("2025-01-20T10:00:00.000000Z", result["high_water_mark"])
+    self.assertEqual(1, result["pending"])
+    self.assertEqual(2, len(self.ledger))
+
+  def test_delta_sync_fetches_from_watermark_and_rechecks_pending(self):
+    self._sync()
+    self.transfers[2] = transfer(2, "2025-01-20 10:00:00", "outgoing_payment_sent")
+    self.transfers[3] = transfer(3, "2025-02-01 09:00:00")
+    self.rechecked.clear()
+
+    result = self._sync()
+
+    self.assertEqual(date(2025, 1, 19), self.since[1])
+    self.assertEqual([], self.rechecked)  # transfer 2 was refreshed by the delta listing
+    self.assertEqual([
+      {"change": "updated", "id": 2, "status": "outgoing_payment_sent", "previous_status": "processing"},
+      {"change": "created", "id": 3, "status": "processing"},
+    ], [{k: change[k] for k in ("change", "id", "status", "previous_status") if k in change}
+        for change in result["changes"]])
+    self.assertEqual("outgoing_payment_sent", self.ledger.get("ns", 7, 2)["status"])
+
+  def test_pending_transfers_outside_the_delta_are_rechecked(self):
+    self._sync()
+    self.transfers[3] = transfer(3, "2025-03-01 09:00:00")
+    self._sync()
+    self.transfers[2] = transfer(2, "2025-01-20 10:00:00", "cancelled")
+
+    result = self._sync()
+
+    self.assertEqual([2], self.rechecked)
+    self.assertEqual(1, result["updated"])
+    self.assertEqual("cancelled", result["changes"][0]["status"])
+    self.assertEqual(1, result["pending"])
+
+  def test_unchanged_sync_reports_nothing(self):
+    self._sync()
+    result = self._sync()
+    self.assertEqual((0, 0, []), (result["created"], result["updated"], result["changes"]))
+
+  def test_limit(self):
+    result = self._sync(limit=1)
+    self.assertEqual(1, len(result["changes"]))
+    self.assertTrue(result["truncated"])
+
+  def test_namespaces_are_separate(self):
+    self._sync()
+    self.assertIsNone(self.ledger.high_water_mark("other", 7))
+    self.assertIsNone(self.ledger.get("other", 7, 1))
+
+
+class TestWiseAPISyncTransfers(FakeWiseTestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.directory = tempfile.TemporaryDirectory()
+    self.ledger = TransferLedger(os.path.join(self.directory.name, "store.db"))
+    self.wise.add_transfers([
+      transfer(1, "2025-01-05 10:00:00", "outgoing_payment_sent"),
+      transfer(2, "2025-01-20 10:00:00"),
+    ])
+    self.wise_api = self.create_wise_api(transfer_ledger=self.ledger)
+
+  def tearDown(self):
+    self.wise_api.close()
+    self.ledger.close()
+    self.directory.cleanup()
+
+  def test_sync_transfers_tool(self):
+    first = json.loads(self.wise_api.run("sync_transfers"))
+    self.wise.transfers[2] = transfer(2, "2025-01-20 10:00:00", "outgoing_payment_sent")
+    second = json.loads(self.wise_api.run("sync_transfers"))
+
+    self.assertEqual(2, first["created"])
+    self.assertEqual(
+      [("updated", 2, "processing")],
+      [(c["change"], c["id"], c["previous_status"]) for c in second["changes"]],
+    )
+    self.assertEqual("2025-01-19", self.wise.requests[-1][1]["createdDateStart"])
+
+  def test_requires_a_transfer_ledger(self):
+    wise_api = self.create_wise_api()
+    with self.assertRaises(ValueError):
+      wise_api.run("sync_transfers")
+    wise_api.close()
+
+
+if __name__ == "__main__":
+  unittest.main()
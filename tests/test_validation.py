@@ -0,0 +1,50 @@
+import unittest
+from datetime import datetime
+
+from wise_agent_toolkit.schema import CreateRecipientAccount, ListProfiles, ListTransfers
+from wise_agent_toolkit.validation import InvalidArgumentsError, compiled_validator, validate_arguments
+
+
+class TestValidateArguments(unittest.TestCase):
+
+  def test_coerces_strings(self):
+    arguments = validate_arguments(
+      ListTransfers,
+      {"profile": "123", "limit": "10", "fetch_all": "true", "created_date_start": "2025-01-01T00:00:00Z"},
+    )
+
+    self.assertEqual(123, arguments["profile"])
+    self.assertEqual(10, arguments["limit"])
+    self.assertIs(True, arguments["fetch_all"])
+    self.assertIsInstance(arguments["created_date_start"], datetime)
+
+  def test_only_supplied_arguments_are_returned(self):
+    self.assertEqual({"status": "processing"}, validate_arguments(ListTransfers, {"status": "processing"}))
+    self.assertEqual({}, validate_arguments(ListProfiles, None))
+
+  def test_rejects_invalid_values(self):
+    with self.assertRaises(InvalidArgumentsError) as ctx:
+      validate_arguments(ListTransfers, {"limit": "ten"})
+
+    self.assertIn("limit", str(ctx.exception))
+
+  def test_rejects_unknown_arguments(self):
+    with self.assertRaises(InvalidArgumentsError) as ctx:
+      validate_arguments(ListTransfers, {"profile_id": 1})
+
+    self.assertIn("profile_id", str(ctx.exception))
+
+  def test_schemas_allowing_extra_fields_keep_them(self):
+    arguments = validate_arguments(
+      CreateRecipientAccount,
+      {"currency": "GBP", "type": "sort_code", "account_holder_name": "Ann", "details": {}, "sort_code": "040075"},
+    )
+
+    self.assertEqual("040075", arguments["sort_code"])
+
+  def test_validator_is_compiled_once(self):
+    self.assertIs(compiled_validator(ListTransfers), compiled_validator(ListTransfers))
+
+
+if __name__ == "__main__":
+  unittest.main()
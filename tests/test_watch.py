@@ -0,0 +1,177 @@
+import json
+import threading
+import time
+import unittest
+from unittest import mock
+
+from wise_api_client.exceptions import ApiException, NotFoundException
+
+from wise_agent_toolkit.api import WiseAPI
+from wise_agent_toolkit.cancellation import CallCancelledError, CancellationToken, cancellation_scope
+from wise_agent_toolkit.watch import MAX_TOOL_WAIT_SECONDS, TransferWatcher
+
+
+class FakeTransfers:
+  """Returns the next status of a scripted sequence on every fetch."""
+
+  def __init__(self, statuses):
+    self.statuses = list(statuses)
+    self.fetches = 0
+    self.lock = threading.Lock()
+
+  def __call__(self, transfer_id):
+    with self.lock:
+      self.fetches += 1
+      status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+    return {"id": transfer_id, "status": status}
+
+
+class TestTransferWatcher(unittest.TestCase):
+
+  def test_waits_until_status_is_reached(self):
+    fetch = FakeTransfers(["processing", "processing", "outgoing_payment_sent"])
+    watcher = TransferWatcher(fetch, initial_interval=0.01)
+
+    result = watcher.wait(1, timeout=5)
+
+    self.assertTrue(result["reached"])
+    self.assertEqual("outgoing_payment_sent", result["status"])
+    self.assertEqual(3, fetch.fetches)
+
+  def test_times_out(self):
+    watcher = TransferWatcher(FakeTransfers(["processing"]), initial_interval=0.01)
+
+    result = watcher.wait(1, statuses=["outgoing_payment_sent"], timeout=0.1)
+
+    self.assertFalse(result["reached"])
+    self.assertTrue(result["timed_out"])
+    self.assertEqual("processing", result["status"])
+
+  def test_final_status_ends_wait_early(self):
+    watcher = TransferWatcher(FakeTransfers(["cancelled"]), initial_interval=0.01)
+
+    result = watcher.wait(1, statuses=["outgoing_payment_sent"], timeout=5)
+
+    self.assertFalse(result["reached"])
+    self.assertFalse(result["timed_out"])
+    self.assertEqual("cancelled", result["status"])
+
+  def test_waiters_share_one_poller(self):
+    fetch = FakeTransfers(["processing"] * 5 + ["outgoing_payment_sent"])
+    watcher = TransferWatcher(fetch, initial_interval=0.02, backoff=1.0)
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(watcher.wait(1, timeout=5))) for _ in range(5)]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+
+    self.assertEqual([True] * 5, [result["reached"] for result in results])
+    self.assertEqual(6, fetch.fetches)
+    self.assertEqual(0, watcher.pollers())
+
+  def test_polling_backs_off(self):
+    fetch = FakeTransfers(["processing"])
+    watcher = TransferWatcher(fetch, initial_interval=0.01, max_interval=1.0, backoff=3.0)
+
+    watcher.wait(1, statuses=["outgoing_payment_sent"], timeout=0.5)
+
+    # 0.01 + 0.03 + 0.09 + 0.27 s between fetches: far fewer than fixed-interval polling
+    self.assertLessEqual(fetch.fetches, 6)
+
+  def test_repeated_errors_are_raised(self):
+    fetches = []
+
+    def fetch(transfer_id):
+      fetches.append(transfer_id)
+      raise ApiException(status=503, reason="Service Unavailable")
+
+    watcher = TransferWatcher(fetch, initial_interval=0.01, max_errors=3)
+
+    with self.assertRaises(ApiException):
+      watcher.wait(1, timeout=5)
+    self.assertEqual(3, len(fetches))
+
+  def test_transient_errors_are_retried(self):
+    outcomes = [ApiException(status=502), TimeoutError("read timed out"), {"id": 1, "status": "outgoing_payment_sent"}]
+
+    def fetch(transfer_id):
+      outcome = outcomes.pop(0)
+      if isinstance(outcome, Exception):
+        raise outcome
+      return outcome
+
+    watcher = TransferWatcher(fetch, initial_interval=0.01)
+
+    self.assertTrue(watcher.wait(1, timeout=5)["reached"])
+
+  def test_rejected_requests_are_not_retried(self):
+    fetches = []
+
+    def fetch(transfer_id):
+      fetches.append(transfer_id)
+      raise NotFoundException(status=404, reason="Not Found")
+
+    watcher = TransferWatcher(fetch, initial_interval=0.01)
+
+    with self.assertRaises(NotFoundException):
+      watcher.wait(1, timeout=5)
+    self.assertEqual(1, len(fetches))
+
+  def test_cancellation(self):
+    watcher = TransferWatcher(FakeTransfers(["processing"]), initial_interval=0.01)
+    token = CancellationToken()
+    threading.Timer(0.1, token.cancel).start()
+
+    started = time.monotonic()
+    with self.assertRaises(CallCancelledError):
+      with cancellation_scope(token):
+        watcher.wait(1, statuses=["outgoing_payment_sent"], timeout=30)
+
+    self.assertLess(time.monotonic() - started, 3)
+
+  def test_publish_wakes_waiters(self):
+    watcher = TransferWatcher(FakeTransfers(["processing"]), initial_interval=10.0)
+    threading.Timer(0.1, lambda: watcher.publish({"id": 1, "status": "outgoing_payment_sent"})).start()
+
+    result = watcher.wait(1, timeout=5)
+
+    self.assertTrue(result["reached"])
+    self.assertLess(result["waited_seconds"], 5)
+
+  def test_close_ends_waits_and_pollers(self):
+    watcher = TransferWatcher(FakeTransfers(["processing"]), initial_interval=10.0)
+    threading.Timer(0.1, watcher.close).start()
+
+    started = time.monotonic()
+    with self.assertRaises(RuntimeError):
+      watcher.wait(1, timeout=30)
+    self.assertLess(time.monotonic() - started, 3)
+
+    deadline = time.monotonic() + 3
+    while watcher.pollers() and time.monotonic() < deadline:
+      time.sleep(0.01)
+    self.assertEqual(0, watcher.pollers())
+    with self.assertRaises(RuntimeError):
+      watcher.wait(1, timeout=1)
+
+
+class TestWaitTool(unittest.TestCase):
+
+  def test_tool_waits_are_capped(self):
+    wise_api = WiseAPI(api_key="test-api-key", host="http://127.0.0.1:9", context={"profile_id": "123"})
+    result = {"transfer_id": 1, "status": "processing", "reached": False, "timed_out": True}
+
+    with mock.patch.object(wise_api.transfer_watcher, "wait", return_value=result) as wait:
+      self.assertTrue(json.loads(wise_api.run("wait_for_transfer_status", transfer_id=1, timeout=600))["timed_out"])
+      wise_api.run("wait_for_transfer_status", transfer_id=1)
+      wise_api.wait_for_transfer_status(1, timeout=600)
+
+    self.assertEqual(
+      [MAX_TOOL_WAIT_SECONDS, MAX_TOOL_WAIT_SECONDS, 600], [call.args[2] for call in wait.call_args_list]
+    )
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,244 @@
+import base64
+import json
+import os
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+from tests.fake_wise import FakeWiseTestCase, transfer
+from wise_agent_toolkit import webhooks
+from wise_agent_toolkit.records import TransferRecord
+from wise_agent_toolkit.webhooks import LiveState, SignatureVerifier, WebhookReceiver
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "webhooks")
+
+
+def _fixture(name):
+  with open(os.path.join(FIXTURES, name), "rb") as file:
+    return file.read()
+
+
+def _post(url, body, headers=None):
+  request = urllib.request.Request(url, data=body, headers=headers or {}, method="POST")
+  try:
+    with urllib.request.urlopen(request, timeout=5) as response:
+      return response.status
+  except urllib.error.HTTPError as e:
+    return e.code
+
+
+class TestLiveState(unittest.TestCase):
+
+  def setUp(self):
+    self.now = 0.0
+    self.state = LiveState(max_transfers=2, max_age=60.0, clock=lambda: self.now)
+
+  def test_only_remembered_transfers_are_updated(self):
+    self.assertIsNone(self.state.apply_transfer_state(1, "processing"))
+    self.state.remember({"id": 1, "status": "incoming_payment_waiting", "sourceValue": 10.0})
+
+    transfer = self.state.apply_transfer_state(1, "processing", "2025-01-05T10:00:00Z")
+    self.assertEqual({"id": 1, "status": "processing", "sourceValue": 10.0}, transfer)
+    self.assertEqual(transfer, self.state.transfer(1))
+
+  def test_outdated_events_are_ignored(self):
+    self.state.remember({"id": 1, "status": "processing"})
+    self.state.apply_transfer_state(1, "outgoing_payment_sent", "2025-01-05T10:30:00Z")
+
+    self.assertIsNone(self.state.apply_transfer_state(1, "processing", "2025-01-05T10:00:00Z"))
+    self.assertEqual("outgoing_payment_sent", self.state.transfer(1)["status"])
+
+  def test_stale_and_evicted_transfers_are_not_served(self):
+    self.state.remember({"id": 1, "status": "processing"})
+    self.now = 61.0
+    self.assertIsNone(self.state.transfer(1))
+
+    self.state.remember({"id": 2})
+    self.state.remember({"id": 3})
+    self.assertIsNone(self.state.transfer(1))
+
+  def test_transfers_are_held_as_records(self):
+    self.state.remember({"id": 1, "status": "processing", "created": datetime(2025, 1, 5, 10)})
+    self.state.apply_transfer_state(1, "outgoing_payment_sent")
+
+    self.assertIsInstance(self.state._transfers[1][0], TransferRecord)
+    self.assertEqual({"id": 1, "status": "outgoing_payment_sent", "created": "2025-01-05 10:00:00"},
+                     self.state.transfer(1))
+
+  def test_balances(self):
+    self.state.apply_balance(7, "GBP", 100.0, occurred_at="2025-01-05T10:30:00Z")
+    self.assertFalse(self.state.apply_balance(7, "GBP", 50.0, occurred_at="2025-01-05T10:00:00Z"))
+    self.assertEqual(100.0, self.state.balances(7)["GBP"]["amount"])
+    self.assertEqual({}, self.state.balances(8))
+
+
+class TestWebhookReceiver(unittest.TestCase):
+
+  def setUp(self):
+    self.events = []
+    self.receiver = WebhookReceiver(self.events.append, allow_unsigned=True)
+    self.receiver.start()
+
+  def tearDown(self):
+    self.receiver.close()
+
+  def test_fixture_events_are_handled(self):
+    for name in ("transfers_state_change.json", "balances_update.json"):
+      self.assertEqual(200, _post(self.receiver.url, _fixture(name)))
+    self.assertEqual(["transfers#state-change", "balances#update"], [e["event_type"] for e in self.events])
+
+  def test_invalid_requests(self):
+    self.assertEqual(400, _post(self.receiver.url, b"not json"))
+    self.assertEqual(404, _post(self.receiver.url.replace("/wise/webhooks", "/other"), b"{}"))
+    self.assertEqual([], self.events)
+
+  def test_test_notifications_are_acknowledged_only(self):
+    status = _post(self.receiver.url, _fixture("transfers_state_change.json"), {"X-Test-Notification": "true"})
+    self.assertEqual(200, status)
+    self.assertEqual([], self.events)
+
+  def test_handler_failure_asks_for_redelivery(self):
+    def fail(event):
+      raise RuntimeError("database is locked")
+
+    self.receiver.handler = fail
+    self.assertEqual(500, _post(self.receiver.url, _fixture("transfers_state_change.json")))
+
+  def test_verifier_is_required(self):
+    with self.assertRaises(ValueError):
+      WebhookReceiver(self.events.append)
+
+
+@unittest.skipIf(webhooks.serialization is None, "cryptography is not installed")
+class TestSignatures(unittest.TestCase):
+
+  @classmethod
+  def setUpClass(cls):
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import padding, rsa
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    cls.sign = staticmethod(
+      lambda body: base64.b64encode(key.sign(body, padding.PKCS1v15(), hashes.SHA256())).decode()
+    )
+    cls.public_key = key.public_key().public_bytes(
+      serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+
+  def setUp(self):
+    self.events = []
+    self.receiver = WebhookReceiver(self.events.append, SignatureVerifier(self.public_key))
+    self.receiver.start()
+
+  def tearDown(self):
+    self.receiver.close()
+
+  def test_signed_events_are_accepted(self):
+    body = _fixture("transfers_state_change.json")
+    self.assertEqual(200, _post(self.receiver.url, body, {"X-Signature-SHA256": self.sign(body)}))
+    self.assertEqual(1, len(self.events))
+
+  def test_unsigned_and_tampered_events_are_rejected(self):
+    body = _fixture("transfers_state_change.json")
+    signature = self.sign(body)
+    self.assertEqual(401, _post(self.receiver.url, body))
+    self.assertEqual(401, _post(self.receiver.url, body.replace(b"111", b"112"), {"X-Signature-SHA256": signature}))
+    self.assertEqual(401, _post(self.receiver.url, body, {"X-Signature-SHA256": "bm90IGEgc2lnbmF0dXJl"}))
+    self.assertEqual([], self.events)
+    self.assertEqual(3, self.receiver.rejected)
+
+
+class TestWiseAPILiveUpdates(FakeWiseTestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.wise.add_transfers([transfer(111)])
+    self.wise_api = self.create_wise_api(live_updates=True)
+    self.receiver = WebhookReceiver(self.wise_api.handle_webhook_event, allow_unsigned=True)
+    self.receiver.start()
+
+  def tearDown(self):
+    self.receiver.close()
+    self.wise_api.close()
+
+  def test_reads_are_answered_from_webhook_state(self):
+    self.assertEqual("processing", json.loads(self.wise_api.run("get_transfer_by_id", transfer_id=111))["status"])
+    self.assertEqual(200, _post(self.receiver.url, _fixture("transfers_state_change.json")))
+
+    transfer = json.loads(self.wise_api.run("get_transfer_by_id", transfer_id=111))
+    self.assertEqual("outgoing_payment_sent", transfer["status"])
+    self.assertEqual("invoice", transfer["details"]["reference"])
+    self.assertEqual(1, len(self.wise.requests))
+
+  def test_waiters_are_released_by_events(self):
+    self.wise_api.transfer_watcher.initial_interval = 30.0
+    result = {}
+    waiter = threading.Thread(target=lambda: result.update(self.wise_api.wait_for_transfer_status(111, timeout=20)))
+    waiter.start()
+    while self.wise_api.transfer_watcher.pollers() == 0 and len(self.wise.requests) == 0:
+      pass
+
+    _post(self.receiver.url, _fixture("transfers_state_change.json"))
+    waiter.join(10)
+
+    self.assertTrue(result["reached"])
+    self.assertEqual("outgoing_payment_sent", result["status"])
+    self.assertLess(result["waited_seconds"], 10)
+
+  def test_events_with_string_transfer_ids_release_waiters(self):
+    self.wise_api.run("get_transfer_by_id", transfer_id=111)
+    self.wise_api.transfer_watcher.initial_interval = 30.0
+    result = {}
+    waiter = threading.Thread(target=lambda: result.update(self.wise_api.wait_for_transfer_status(111, timeout=20)))
+    waiter.start()
+    while self.wise_api.transfer_watcher.pollers() == 0:
+      pass
+
+    event = json.loads(_fixture("transfers_state_change.json"))
+    event["data"]["resource"]["id"] = "111"
+    response = self.wise_api.handle_webhook_event(event)
+    waiter.join(10)
+
+    self.assertEqual((111, True, True), (response["transfer_id"], response["updated"], response["waiters_notified"]))
+    self.assertTrue(result["reached"])
+
+  def test_polls_skip_the_live_state(self):
+    self.wise_api.run("get_transfer_by_id", transfer_id=111)
+    self.wise.transfers[111] = transfer(111, status="outgoing_payment_sent")
+    self.wise_api.transfer_watcher.initial_interval = 0.01
+
+    result = self.wise_api.wait_for_transfer_status(111, timeout=5)
+
+    self.assertTrue(result["reached"])
+    self.assertEqual("outgoing_payment_sent", json.loads(self.wise_api.run("get_transfer_by_id", transfer_id=111))["status"])
+
+  def test_balance_events(self):
+    _post(self.receiver.url, _fixture("balances_update.json"))
+    self.assertEqual(1250.5, self.wise_api.live_state.balances(7)["GBP"]["amount"])
+
+  def test_events_without_their_data_are_rejected(self):
+    state_change = json.loads(_fixture("transfers_state_change.json"))
+    balance_update = json.loads(_fixture("balances_update.json"))
+    invalid = [
+      dict(state_change, data=None),
+      dict(state_change, data=dict(state_change["data"], resource={"type": "transfer"})),
+      dict(state_change, data=dict(state_change["data"], resource={"type": "transfer", "id": "abc"})),
+      dict(state_change, data=dict(state_change["data"], current_state=None)),
+      dict(state_change, data=dict(state_change["data"], occurred_at="yesterday")),
+      dict(balance_update, data=dict(balance_update["data"], post_transaction_balance_amount="a lot")),
+      dict(balance_update, data=dict(balance_update["data"], currency=None)),
+    ]
+    for event in invalid:
+      with self.subTest(event=event["data"]):
+        self.assertEqual(400, _post(self.receiver.url, json.dumps(event).encode()))
+    self.assertEqual({}, self.wise_api.live_state.balances(7))
+
+  def test_unknown_events_are_ignored(self):
+    self.assertEqual({"event_type": "profiles#verification-state-change", "updated": False},
+                     self.wise_api.handle_webhook_event({"event_type": "profiles#verification-state-change"}))
+
+
+if __name__ == "__main__":
+  unittest.main()
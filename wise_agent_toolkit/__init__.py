@@ -9,7 +9,7 @@ __version__ = "0.2.1"
 # Core imports (always available)
 from .api import WiseAPI
 from .configuration import Configuration
-from .tools import tools
+from .tools import select_tools, tools
 from .integrations import get_available_integrations as _get_integration_list
 
 # Integration-specific imports (optional)
@@ -30,7 +30,7 @@ except ImportError:
   pass
 
 # Conditional integration exports
-__all__ = ["WiseAPI", "Configuration", "tools", "get_available_integrations"]
+__all__ = ["WiseAPI", "Configuration", "tools", "select_tools", "get_available_integrations"]
 
 if _langchain_available:
   from . import langchain as langchain_support
@@ -0,0 +1,220 @@
+"""
+Aggregation of transfer history into small summary tables.
+
+Questions like "how much did we send to GBP recipients per month this year"
+used to require the model to page through ``list_transfers`` and add numbers
+up itself. ``TransferColumns`` instead keeps only the fields needed for
+analytics in compact typed arrays: amounts and timestamps as doubles, and
+status, currencies and recipient as dictionary-encoded integer codes. It is
+filled while transfers stream in, as dictionaries or ``TransferRecord``s, so
+hundreds of thousands of transfers take a few megabytes.
+
+``summarize`` groups the rows by any of ``DIMENSIONS`` and returns the count,
+sum and average of each group. With numpy installed the group-by runs
+vectorized (``np.unique`` plus ``np.bincount``). Without it, a single pass over
+the arrays produces the same table.
+"""
+
+import math
+from array import array
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+try:
+  import numpy as np
+except ImportError:  # numpy is optional
+  np = None
+
+from .records import TransferRecord, epoch_seconds
+
+CATEGORICAL_DIMENSIONS = ("status", "source_currency", "target_currency", "recipient")
+TIME_DIMENSIONS = ("day", "week", "month", "year")
+DIMENSIONS = CATEGORICAL_DIMENSIONS + TIME_DIMENSIONS
+
+# Summaries never return more groups than this
+MAX_GROUPS = 1000
+
+_FIELDS = {
+  "status": "status",
+  "source_currency": "sourceCurrency",
+  "target_currency": "targetCurrency",
+  "recipient": "targetAccount",
+}
+
+# Code of rows without a creation date in the time dimensions
+_NO_DATE = -(2 ** 40)
+_EPOCH = date(1970, 1, 1)
+_SECONDS_PER_DAY = 86400
+
+
+class TransferColumns:
+  """Columnar, array-backed store of the analytics fields of transfers."""
+
+  def __init__(self, transfers: Iterable[Union[Dict[str, Any], TransferRecord]] = ()):
+    self.source_value = array("d")
+    self.target_value = array("d")
+    self.created = array("d")
+    self._codes = {dimension: array("l") for dimension in CATEGORICAL_DIMENSIONS}
+    self._vocabularies: Dict[str, List[Any]] = {dimension: [] for dimension in CATEGORICAL_DIMENSIONS}
+    self._lookups: Dict[str, Dict[Any, int]] = {dimension: {} for dimension in CATEGORICAL_DIMENSIONS}
+    self.extend(transfers)
+
+  def __len__(self) -> int:
+    return len(self.created)
+
+  def append(self, transfer: Union[Dict[str, Any], TransferRecord]) -> None:
+    """Add a transfer, as returned by ``to_dict()`` or compacted into a ``TransferRecord``."""
+    if isinstance(transfer, TransferRecord):
+      self.source_value.append(0.0 if math.isnan(transfer.source_value) else transfer.source_value)
+      self.target_value.append(0.0 if math.isnan(transfer.target_value) else transfer.target_value)
+      self.created.append(transfer.created)
+      values = (transfer.status, transfer.source_currency, transfer.target_currency, transfer.target_account)
+    else:
+      self.source_value.append(float(transfer.get("sourceValue") or 0.0))
+      self.target_value.append(float(transfer.get("targetValue") or 0.0))
+      self.created.append(epoch_seconds(transfer.get("created")))
+      values = tuple(transfer.get(field) for field in _FIELDS.values())
+    for dimension, value in zip(_FIELDS, values):
+      lookup = self._lookups[dimension]
+      code = lookup.get(value)
+      if code is None:
+        code = lookup[value] = len(self._vocabularies[dimension])
+        self._vocabularies[dimension].append(value)
+      self._codes[dimension].append(code)
+
+  def extend(self, transfers: Iterable[Union[Dict[str, Any], TransferRecord]]) -> None:
+    for transfer in transfers:
+      self.append(transfer)
+
+  def codes(self, dimension: str) -> Tuple[Sequence[int], Callable[[int], Any]]:
+    """Return the integer code of every row in ``dimension`` and a function turning a code into its label."""
+    if dimension in CATEGORICAL_DIMENSIONS:
+      return self._codes[dimension], self._vocabularies[dimension].__getitem__
+    if dimension not in TIME_DIMENSIONS:
+      raise ValueError(f"Unknown dimension: {dimension}. Choose from: {', '.join(DIMENSIONS)}")
+    return _time_codes(self.created, dimension), lambda code: _time_label(dimension, code)
+
+
+def _time_codes(created: array, dimension: str) -> Sequence[int]:
+  if np is not None:
+    seconds = np.frombuffer(created, dtype=np.float64)
+    missing = np.isnan(seconds)
+    days = np.floor(np.where(missing, 0, seconds) / _SECONDS_PER_DAY).astype(np.int64)
+    if dimension == "day":
+      codes = days
+    elif dimension == "week":
+      # 1970-01-01 was a Thursday; weeks start on Monday
+      codes = days - (days + 3) % 7
+    else:
+      months = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64) + 1970 * 12
+      codes = months if dimension == "month" else months // 12
+    return np.where(missing, _NO_DATE, codes)
+
+  codes = array("q")
+  cache: Dict[int, int] = {}
+  for seconds in created:
+    if math.isnan(seconds):
+      codes.append(_NO_DATE)
+      continue
+    day = int(seconds // _SECONDS_PER_DAY)
+    code = cache.get(day)
+    if code is None:
+      if dimension == "day":
+        code = day
+      elif dimension == "week":
+        code = day - (day + 3) % 7
+      else:
+        moment = _EPOCH + timedelta(days=day)
+        code = moment.year * 12 + moment.month - 1 if dimension == "month" else moment.year
+      cache[day] = code
+    codes.append(code)
+  return codes
+
+
+def _time_label(dimension: str, code: int) -> Optional[str]:
+  if code == _NO_DATE:
+    return None
+  if dimension in ("day", "week"):
+    return (_EPOCH + timedelta(days=int(code))).isoformat()
+  if dimension == "month":
+    return f"{int(code) // 12:04d}-{int(code) % 12 + 1:02d}"
+  return str(int(code))
+
+
+def summarize(
+  columns: TransferColumns,
+  group_by: Sequence[str] = ("source_currency",),
+  value: str = "source",
+  limit: int = MAX_GROUPS,
+) -> Dict[str, Any]:
+  """Group the transfers by ``group_by`` and return count, sum and average of the ``value`` amounts.
+
+  Amounts in different currencies are never added up: the currency of the
+  summed side is added to the grouping when it is not already part of it.
+  """
+  if value not in ("source", "target"):
+    raise ValueError("value must be 'source' or 'target'")
+  group_by = list(dict.fromkeys(group_by))
+  currency = f"{value}_currency"
+  if currency not in group_by:
+    group_by.insert(0, currency)
+
+  code_columns, labelers = [], []
+  for dimension in group_by:
+    codes, labeler = columns.codes(dimension)
+    code_columns.append(codes)
+    labelers.append(labeler)
+  values = columns.source_value if value == "source" else columns.target_value
+
+  if np is not None and len(columns):
+    groups = _group_numpy(code_columns, values)
+  else:
+    groups = _group_python(code_columns, values)
+
+  rows = []
+  for key, (count, total) in groups:
+    row = {dimension: labeler(code) for dimension, labeler, code in zip(group_by, labelers, key)}
+    row.update({"count": count, "sum": round(total, 2), "average": round(total / count, 2)})
+    rows.append(row)
+  rows.sort(key=lambda row: tuple("" if row[d] is None else str(row[d]) for d in group_by))
+
+  return {
+    "group_by": group_by,
+    "value": value,
+    "transfers": len(columns),
+    "groups": len(rows),
+    "truncated": len(rows) > limit,
+    "rows": rows[:limit],
+    "engine": "numpy" if np is not None else "python",
+  }
+
+
+def _group_numpy(code_columns: List[Sequence[int]], values: array) -> List[Tuple[tuple, Tuple[int, float]]]:
+  # Factorize each column, then fold the columns into one mixed-radix key, so
+  # the group-by is a single 1-D unique plus bincount
+  uniques, key = [], np.zeros(len(values), dtype=np.int64)
+  for codes in code_columns:
+    unique, inverse = np.unique(np.asarray(codes, dtype=np.int64), return_inverse=True)
+    uniques.append(unique)
+    key = key * len(unique) + inverse.reshape(-1)
+  groups, inverse = np.unique(key, return_inverse=True)
+  inverse = inverse.reshape(-1)
+  counts = np.bincount(inverse, minlength=len(groups))
+  sums = np.bincount(inverse, weights=np.frombuffer(values, dtype=np.float64), minlength=len(groups))
+
+  columns = []
+  for unique in reversed(uniques):
+    groups, index = np.divmod(groups, len(unique))
+    columns.append(unique[index])
+  keys = zip(*(column.tolist() for column in reversed(columns)))
+  return [(key, (count, total)) for key, count, total in zip(keys, counts.tolist(), sums.tolist())]
+
+
+def _group_python(code_columns: List[Sequence[int]], values: array) -> List[Tuple[tuple, Tuple[int, float]]]:
+  counts: Dict[tuple, int] = {}
+  sums: Dict[tuple, float] = {}
+  for row in zip(values, *code_columns):
+    key = row[1:]
+    counts[key] = counts.get(key, 0) + 1
+    sums[key] = sums.get(key, 0.0) + row[0]
+  return [(key, (count, sums[key])) for key, count in counts.items()]
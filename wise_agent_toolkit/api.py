@@ -1,18 +1,90 @@
 from __future__ import annotations
 
+import hashlib
+import inspect
 import json
-from typing import Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
 
 import wise_api_client
 from pydantic import BaseModel
 from wise_api_client import ApiClient
+from wise_api_client.rest import RESTClientObject
 
-from .configuration import Context
+from .analytics import TransferColumns, summarize
+from .cancellation import CancellableRESTClient
+from .concurrency import arun_batch, batch_key, run_async, run_batch
+from .configuration import Context, capabilities, is_read_only_tool
+from .export import default_export_dir, export_path, export_records
+from .fanout import ALL_PROFILES, fetch_profiles, is_fan_out, merge_newest_first
 from .functions import (
   create_transfer, create_quote, update_quote, list_recipient_accounts, create_recipient_account,
   deactivate_recipient_account, list_transfers, cancel_transfer, get_transfer_by_id, list_profiles,
   get_profile_by_id, get_quote_by_id, get_recipient_account_by_id, list_activities, get_account_requirements,
+  iter_transfers, iter_activities, iter_recipient_accounts,
 )
+from .ledger import ActivityLedger
+from .quotes import QuoteCache
+from .recipients import RecipientIndex
+from .requirements import AccountRequirementsCache
+from .records import TransferRecord, epoch_seconds
+from .store import ObjectStore, is_immutable_quote, is_immutable_transfer
+from .tools import tools
+from .transfer_ledger import TransferLedger
+from .watch import MAX_TOOL_WAIT_SECONDS, TransferWatcher
+from .webhooks import BALANCE_EVENTS, TRANSFER_STATE_CHANGE, InvalidEventError, LiveState, event_amount, event_data
+
+# Calls that change something in Wise; arun never aborts them half-way
+WRITE_METHODS = frozenset(tool["method"] for tool in tools if not is_read_only_tool(tool))
+
+
+def _arguments(func, args, kwargs) -> Dict[str, Any]:
+  """Return every argument of a call of ``func(api_client, context, *args, **kwargs)`` by name."""
+  bound = inspect.signature(func).bind(None, None, *args, **kwargs)
+  bound.apply_defaults()
+  return {name: value for name, value in bound.arguments.items() if name not in ("api_client", "context")}
+
+
+def _argument(func, args, kwargs, name: str):
+  """Return the value of argument ``name`` in a call of ``func(api_client, context, *args, **kwargs)``."""
+  return _arguments(func, args, kwargs)[name]
+
+
+def _utc_date(value):
+  # Wise reads date filters as UTC dates
+  if isinstance(value, datetime):
+    return (value.astimezone(timezone.utc) if value.tzinfo else value).date()
+  return value
+
+
+def _created_between(since: Optional[datetime], until: Optional[datetime]):
+  """Return the date filters Wise accepts for a transfer listing and a check of the exact bounds.
+
+  Wise filters transfers by creation date only, so the listing covers whole
+  days (``until``'s day included) and ``created(transfer)`` keeps the
+  transfers created between ``since`` and ``until`` inclusive.
+  """
+  start = epoch_seconds(since) if isinstance(since, datetime) else None
+  end = epoch_seconds(until) if isinstance(until, datetime) else None
+
+  def created(transfer: Dict[str, Any]) -> bool:
+    seconds = epoch_seconds(transfer.get("created"))
+    return (start is None or seconds >= start) and (end is None or seconds <= end)
+
+  start_date, end_date = _utc_date(since), _utc_date(until)
+  if end is not None:
+    end_date += timedelta(days=1)
+  return start_date, end_date, created
+
+
+def batch_keys(method: str, inputs: List[Any]) -> Optional[List[Optional[str]]]:
+  """Return the keys under which identical inputs of a batch of ``method`` calls run once."""
+  # Two identical writes may be meant as two (e.g. two equal payments)
+  if method in WRITE_METHODS:
+    return None
+  return [batch_key(arguments) for arguments in inputs]
 
 
 class WiseAPI(BaseModel):
@@ -20,8 +92,34 @@ class WiseAPI(BaseModel):
 
   _context: Context
   _api_client: ApiClient
+  _store: Optional[ObjectStore]
+  _store_namespace: str
+  _ledger: Optional[ActivityLedger]
+  _transfer_ledger: Optional[TransferLedger]
+  _quote_cache: Optional[QuoteCache]
+  _transfer_watcher: TransferWatcher
+  _live_state: Optional[LiveState]
+  _recipient_index: RecipientIndex
+  _requirements: AccountRequirementsCache
+  _export_dir: str
+  _capabilities: FrozenSet[str]
+  _all_profile_ids: Optional[List[int]]
+  _executor: Optional[ThreadPoolExecutor]
+  _executor_lock: threading.Lock
 
-  def __init__(self, api_key: str, host: str, context: Optional[Context]):
+  def __init__(
+    self,
+    api_key: str,
+    host: str,
+    context: Optional[Context],
+    rest_client: Optional[RESTClientObject] = None,
+    store: Optional[ObjectStore] = None,
+    ledger: Optional[ActivityLedger] = None,
+    quote_cache: Optional[QuoteCache] = None,
+    export_dir: Optional[str] = None,
+    transfer_ledger: Optional[TransferLedger] = None,
+    live_updates: bool = False,
+  ):
     super().__init__()
 
     self._context = context if context is not None else Context()
@@ -32,58 +130,423 @@ class WiseAPI(BaseModel):
     )
     self._api_client = wise_api_client.ApiClient(configuration)
 
+    # The access token is applied per request, so clients for the same host
+    # can share one pooled HTTP transport.
+    if rest_client is None:
+      rest_client = CancellableRESTClient(configuration)
+    self._api_client.rest_client = rest_client
+
+    # Immutable objects fetched with this key are kept in the optional store,
+    # namespaced so that other keys sharing the store cannot read them
+    self._store = store
+    self._store_namespace = hashlib.sha256(f"{host}\n{api_key}".encode()).hexdigest()
+    self._ledger = ledger
+    self._transfer_ledger = transfer_ledger
+    self._quote_cache = quote_cache
+    self._export_dir = export_dir or default_export_dir()
+    # Tools that depend on an optional feature missing here are not offered (see is_tool_available)
+    self._capabilities = capabilities(ledger=ledger, transfer_ledger=transfer_ledger, export_dir=export_dir)
+    # Looked up on the first profile="all" listing; profiles are rarely added
+    self._all_profile_ids = None
+    # Worker threads for arun, created on first use
+    self._executor = None
+    self._executor_lock = threading.Lock()
+
+    # Shared by every caller of this client, so each transfer has one poller. Polls skip the live
+    # state, which would answer with the last status it knows until it goes stale after a missed event
+    self._transfer_watcher = TransferWatcher(
+      lambda transfer_id: json.loads(self._get_transfer(transfer_id, live=False))
+    )
+    # Kept current by webhook events (see handle_webhook_event), so reads can skip the network
+    self._live_state = LiveState() if live_updates else None
+    # Requirements are looked up by the route of the quote, so most quotes reuse a cached form
+    self._requirements = AccountRequirementsCache()
+    self._recipient_index = RecipientIndex(
+      lambda profile_id: (
+        r.to_dict() for r in iter_recipient_accounts(self._api_client, self._context, profile_id=profile_id)
+      )
+    )
+
+  @property
+  def context(self) -> Context:
+    return self._context
+
+  @property
+  def rest_client(self) -> RESTClientObject:
+    """The pooled HTTP transport used by this client."""
+    return self._api_client.rest_client
+
+  @property
+  def executor(self) -> ThreadPoolExecutor:
+    """The worker threads that ``arun`` runs calls on.
+
+    There is one worker per connection the HTTP transport keeps pooled, so
+    concurrent calls reuse pooled connections rather than opening ones the
+    pool would discard.
+    """
+    with self._executor_lock:
+      if self._executor is None:
+        self._executor = ThreadPoolExecutor(
+          max_workers=self._api_client.configuration.connection_pool_maxsize, thread_name_prefix="wise-api"
+        )
+      return self._executor
+
+  @property
+  def capabilities(self) -> FrozenSet[str]:
+    return self._capabilities
+
+  @property
+  def transfer_watcher(self) -> TransferWatcher:
+    return self._transfer_watcher
+
+  @property
+  def live_state(self) -> Optional[LiveState]:
+    return self._live_state
+
+  @property
+  def recipient_index(self) -> RecipientIndex:
+    return self._recipient_index
+
+  @property
+  def account_requirements(self) -> AccountRequirementsCache:
+    return self._requirements
+
+  def search_recipients(
+    self,
+    profile_id: Optional[int] = None,
+    query: Optional[str] = None,
+    currency: Optional[str] = None,
+    iban: Optional[str] = None,
+    account_ending: Optional[str] = None,
+    limit: Optional[int] = None,
+  ) -> Dict[str, Any]:
+    """Search the profile's recipient accounts by name (fuzzy), currency, IBAN or account number ending."""
+    profile_id = profile_id or self._context.get("profile_id")
+    if not profile_id:
+      raise ValueError("Profile ID must be provided either as a parameter or in context.")
+    matches = self._recipient_index.search(
+      int(profile_id), query=query, currency=currency, iban=iban, account_ending=account_ending, limit=limit or 5
+    )
+    return {"matches": matches, "count": len(matches)}
+
+  def wait_for_transfer_status(
+    self,
+    transfer_id: int,
+    statuses: Optional[Iterable[str]] = None,
+    timeout: Optional[float] = None,
+  ) -> Dict[str, Any]:
+    """Block until a transfer reaches one of ``statuses`` (default: any final status) or ``timeout`` passes."""
+    return self._transfer_watcher.wait(transfer_id, statuses, 60.0 if timeout is None else timeout)
+
+  def handle_webhook_event(self, event: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply a Wise webhook event to the live state and the status waiters.
+
+    Raises InvalidEventError for an event without the data its type needs.
+    """
+    event_type = event.get("event_type")
+
+    if event_type == TRANSFER_STATE_CHANGE:
+      data, resource = event_data(event)
+      transfer_id, status = resource.get("id"), data.get("current_state")
+      if not isinstance(transfer_id, (int, str)) or not isinstance(status, str) or not status:
+        raise InvalidEventError("Transfer state change event without a transfer ID or state")
+      try:
+        # The live state and the status waiters key transfers by integer ID
+        transfer_id = int(transfer_id)
+      except ValueError:
+        raise InvalidEventError(f"Transfer state change event with an invalid transfer ID: {transfer_id!r}")
+      transfer = None
+      if self._live_state is not None:
+        transfer = self._live_state.apply_transfer_state(transfer_id, status, data.get("occurred_at"))
+        if transfer is not None and is_immutable_transfer(transfer):
+          self._store_object("transfer", str(transfer_id), json.dumps(transfer, default=str))
+      return {
+        "event_type": event_type,
+        "transfer_id": transfer_id,
+        "status": status,
+        "updated": transfer is not None,
+        "waiters_notified": self._transfer_watcher.publish_status(transfer_id, status),
+      }
+
+    if event_type in BALANCE_EVENTS and self._live_state is not None:
+      data, resource = event_data(event)
+      currency = data.get("currency")
+      if not isinstance(currency, str) or not currency:
+        raise InvalidEventError(f"{event_type} event without a currency")
+      updated = self._live_state.apply_balance(
+        resource.get("profile_id"),
+        currency,
+        event_amount(data, "post_transaction_balance_amount"),
+        data.get("balance_id", resource.get("id")),
+        data.get("occurred_at"),
+      )
+      return {"event_type": event_type, "profile_id": resource.get("profile_id"), "updated": updated}
+
+    return {"event_type": event_type, "updated": False}
+
+  def sync_activities(self, profile_id: Optional[int] = None) -> Dict[str, Any]:
+    """Fetch the activities created since the last sync into the ledger."""
+    profile_id = self._ledger_profile_id(profile_id)
+    return self._ledger.sync(
+      self._store_namespace,
+      profile_id,
+      lambda since: (
+        a.to_dict() for a in iter_activities(self._api_client, self._context, profile_id=profile_id, since=since)
+      ),
+    )
+
+  def query_activities(
+    self,
+    profile_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    currency: Optional[str] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    type: Optional[str] = None,
+    status: Optional[str] = None,
+    text: Optional[str] = None,
+    limit: Optional[int] = 100,
+    sync: Optional[bool] = True,
+  ) -> Dict[str, Any]:
+    """Query the activity ledger, first syncing the activities created since the last sync."""
+    profile_id = self._ledger_profile_id(profile_id)
+    synced = self.sync_activities(profile_id) if sync is not False else None
+    activities = self._ledger.query(
+      self._store_namespace, profile_id, since=since, until=until, currency=currency, min_amount=min_amount,
+      max_amount=max_amount, type=type, status=status, text=text, limit=limit,
+    )
+    return {"activities": activities, "count": len(activities), "sync": synced}
+
+  def sync_transfers(self, profile: Optional[int] = None, limit: Optional[int] = 100) -> Dict[str, Any]:
+    """Fetch the transfers created since the last sync, re-check pending ones and return what changed."""
+    if self._transfer_ledger is None:
+      raise ValueError("Transfer sync is not enabled. Create the client with a TransferLedger.")
+    profile = profile or self._context.get("profile_id")
+    if not profile:
+      raise ValueError("Profile ID must be provided either as a parameter or in context.")
+    profile = int(profile)
+    return self._transfer_ledger.sync(
+      self._store_namespace,
+      profile,
+      lambda since: (
+        t.to_dict() for t in iter_transfers(self._api_client, self._context, profile=profile, created_date_start=since)
+      ),
+      lambda transfer_id: json.loads(self.run("get_transfer_by_id", transfer_id=transfer_id)),
+      limit=limit,
+    )
+
+  def analyze_transfers(
+    self,
+    group_by: Optional[List[str]] = None,
+    value: Optional[str] = None,
+    **filters,
+  ) -> Dict[str, Any]:
+    """Fetch the transfers matching ``filters`` (as for ``list_transfers``) and summarize them by ``group_by``.
+
+    The creation date filters are whole UTC dates; the time of day of a datetime is dropped.
+    """
+    for name in ("created_date_start", "created_date_end"):
+      if name in filters:
+        filters[name] = _utc_date(filters[name])
+    columns = TransferColumns(
+      TransferRecord(t.to_dict(), keep_body=False) for t in iter_transfers(self._api_client, self._context, **filters)
+    )
+    return summarize(columns, group_by or ["month"], value or "source")
+
+  def export_records(
+    self,
+    kind: str,
+    format: Optional[str] = None,
+    filename: Optional[str] = None,
+    profile_id: Optional[int] = None,
+    status: Optional[str] = None,
+    currency: Optional[str] = None,
+    source_currency: Optional[str] = None,
+    target_currency: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+  ) -> Dict[str, Any]:
+    """Stream every transfer, activity or recipient matching the filters into a file in the export directory."""
+    filters = {
+      "status": status, "currency": currency, "source_currency": source_currency,
+      "target_currency": target_currency, "since": since, "until": until,
+    }
+    if kind == "transfers":
+      supported = ("status", "source_currency", "target_currency", "since", "until")
+      start_date, end_date, created = _created_between(since, until)
+      transfers = iter_transfers(
+        self._api_client, self._context, profile=profile_id, status=status, source_currency=source_currency,
+        target_currency=target_currency, created_date_start=start_date, created_date_end=end_date,
+      )
+      records = (t for t in (t.to_dict() for t in transfers) if created(t))
+    elif kind == "activities":
+      supported = ("status", "since", "until")
+      records = (a.to_dict() for a in iter_activities(
+        self._api_client, self._context, profile_id=profile_id, status=status, since=since, until=until
+      ))
+    elif kind == "recipients":
+      supported = ("currency",)
+      records = (r.to_dict() for r in iter_recipient_accounts(
+        self._api_client, self._context, profile_id=profile_id, currency=currency
+      ))
+    else:
+      raise ValueError(f"Unknown export kind: {kind}. Choose one of: transfers, activities, recipients")
+    unsupported = [name for name, value in filters.items() if value is not None and name not in supported]
+    if unsupported:
+      raise ValueError(f"Filters not supported when exporting {kind}: {', '.join(unsupported)}")
+
+    file_format = format or "csv"
+    path = export_path(kind, file_format, self._export_dir, filename)
+    return export_records(records, path, kind, file_format)
+
+  def close(self, close_transport: bool = True) -> None:
+    """Stop the ``arun`` workers and the transfer pollers, and close the pooled connections of the HTTP transport.
+
+    Pass ``close_transport=False`` when the transport is shared with other clients.
+    """
+    with self._executor_lock:
+      executor, self._executor = self._executor, None
+    if executor is not None:
+      executor.shutdown(wait=False)
+    self._transfer_watcher.close()
+    if close_transport:
+      self._api_client.rest_client.pool_manager.clear()
+
+  async def arun(self, method: str, *args, **kwargs) -> str:
+    """Async version of ``run``; the call runs on ``executor``.
+
+    Cancelling the awaiting task aborts the HTTP request of a read. Writes
+    (see ``WRITE_METHODS``) run to completion before the cancellation is raised.
+    """
+    return await run_async(self.executor, self.run, method, *args, abortable=method not in WRITE_METHODS, **kwargs)
+
+  def run_batch(
+    self,
+    method: str,
+    inputs: List[Dict[str, Any]],
+    max_concurrency: Optional[int] = None,
+    return_exceptions: bool = False,
+  ) -> List[Any]:
+    """Run ``method`` once per dictionary of keyword arguments in ``inputs``, concurrently on ``executor``.
+
+    Identical inputs of read methods are fetched once. Results are in input order.
+    """
+    calls = [lambda kwargs=kwargs: self.run(method, **kwargs) for kwargs in inputs]
+    return run_batch(calls, self.executor, batch_keys(method, inputs), max_concurrency, return_exceptions)
+
+  async def arun_batch(
+    self,
+    method: str,
+    inputs: List[Dict[str, Any]],
+    max_concurrency: Optional[int] = None,
+    return_exceptions: bool = False,
+  ) -> List[Any]:
+    """Async ``run_batch``; each call is cancellable like ``arun``."""
+    calls = [lambda kwargs=kwargs: self.arun(method, **kwargs) for kwargs in inputs]
+    return await arun_batch(calls, batch_keys(method, inputs), max_concurrency, return_exceptions)
+
   def run(self, method: str, *args, **kwargs) -> str:
     if method == "create_transfer":
+      if self._quote_cache is not None:
+        # Wise accepts a quote for a single transfer
+        self._quote_cache.discard(_argument(create_transfer, args, kwargs, "quote_uuid"))
       transfer = create_transfer(self._api_client, self._context, *args, **kwargs).to_dict()
+      self._remember_transfer(transfer)
       return json.dumps(
         transfer,
         default=str  # to_dict() does not serialize datetime objects
       )
     elif method == "create_quote":
+      key = self._quote_key(args, kwargs) if self._quote_cache is not None else None
+      if key is not None:
+        reused = self._quote_cache.get(key)
+        if reused is not None:
+          return reused
       quote = create_quote(self._api_client, self._context, *args, **kwargs).to_dict()
-      return json.dumps(
+      self._requirements.remember_quote(quote)
+      result = json.dumps(
         quote,
         default=str  # to_dict() does not serialize datetime objects
       )
+      if key is not None:
+        self._quote_cache.put(key, quote, result)
+      return result
     elif method == "update_quote":
+      if self._quote_cache is not None:
+        self._quote_cache.discard(_argument(update_quote, args, kwargs, "quote_id"))
       quote = update_quote(self._api_client, self._context, *args, **kwargs).to_dict()
+      self._requirements.remember_quote(quote)
       return json.dumps(
         quote,
         default=str  # to_dict() does not serialize datetime objects
       )
     elif method == "list_recipient_accounts":
+      if kwargs.pop("fetch_all", None):
+        content = [r.to_dict() for r in iter_recipient_accounts(self._api_client, self._context, *args, **kwargs)]
+        return json.dumps({"content": content, "size": len(content)}, default=str)
       recipients = list_recipient_accounts(self._api_client, self._context, *args, **kwargs).to_dict()
       return json.dumps(recipients, default=str)  # to_dict() does not serialize datetime objects
+    elif method == "search_recipients":
+      return json.dumps(self.search_recipients(*args, **kwargs))
     elif method == "create_recipient_account":
+      self._requirements.validate(self._recipient_payload(args, kwargs))
       recipient = create_recipient_account(self._api_client, self._context, *args, **kwargs).to_dict()
+      self._recipient_index.add(recipient)
       return json.dumps(
         recipient,
         default=str  # to_dict() does not serialize datetime objects
       )
     elif method == "deactivate_recipient_account":
       recipient = deactivate_recipient_account(self._api_client, self._context, *args, **kwargs).to_dict()
+      self._recipient_index.remove(
+        recipient.get("id", _argument(deactivate_recipient_account, args, kwargs, "account_id")),
+        recipient.get("profileId"),
+      )
       return json.dumps(
         recipient,
         default=str  # to_dict() does not serialize datetime objects
       )
     elif method == "list_transfers":
-      transfers = list_transfers(self._api_client, self._context, *args, **kwargs)
-      transfers = [] if transfers is None else transfers
-      transfers = [t.to_dict() for t in transfers]
+      fetch = iter_transfers if kwargs.pop("fetch_all", None) else list_transfers
+      arguments = _arguments(list_transfers, args, kwargs)
+
+      def fetch_transfers(profile: Optional[int]) -> List[Dict[str, Any]]:
+        transfers = fetch(self._api_client, self._context, **dict(arguments, profile=profile))
+        return [t.to_dict() for t in transfers or []]
+
+      if is_fan_out(arguments["profile"]):
+        # limit and offset apply to each profile
+        transfers = merge_newest_first(
+          fetch_profiles(fetch_transfers, self._profile_ids(arguments["profile"])), "created"
+        )
+      else:
+        transfers = fetch_transfers(arguments["profile"])
       return json.dumps(
         transfers,
         default=str  # to_dict() does not serialize datetime objects
       )
+    elif method == "sync_transfers":
+      return json.dumps(self.sync_transfers(*args, **kwargs), default=str)
+    elif method == "analyze_transfers":
+      return json.dumps(self.analyze_transfers(*args, **kwargs))
     elif method == "cancel_transfer":
       transfer = cancel_transfer(self._api_client, self._context, *args, **kwargs).to_dict()
+      self._remember_transfer(transfer)
       return json.dumps(
         transfer,
         default=str  # to_dict() does not serialize datetime objects
       )
     elif method == "get_transfer_by_id":
-      transfer = get_transfer_by_id(self._api_client, self._context, *args, **kwargs).to_dict()
+      return self._get_transfer(_argument(get_transfer_by_id, args, kwargs, "transfer_id"))
+    elif method == "wait_for_transfer_status":
+      # A tool call holds a worker thread (and an MCP read slot) for its whole
+      # wait, so it is kept short; the caller can call again to keep waiting
+      arguments = inspect.signature(self.wait_for_transfer_status).bind(*args, **kwargs).arguments
+      timeout = arguments.get("timeout")
+      arguments["timeout"] = MAX_TOOL_WAIT_SECONDS if timeout is None else min(timeout, MAX_TOOL_WAIT_SECONDS)
       return json.dumps(
-        transfer,
+        self.wait_for_transfer_status(**arguments),
         default=str  # to_dict() does not serialize datetime objects
       )
     elif method == "list_profiles":
@@ -101,11 +564,19 @@ class WiseAPI(BaseModel):
         default=str  # to_dict() does not serialize datetime objects
       )
     elif method == "get_quote_by_id":
+      key = str(_argument(get_quote_by_id, args, kwargs, "quote_id"))
+      stored = self._stored("quote", key)
+      if stored is not None:
+        return stored
       quote = get_quote_by_id(self._api_client, self._context, *args, **kwargs).to_dict()
-      return json.dumps(
+      self._requirements.remember_quote(quote)
+      result = json.dumps(
         quote,
         default=str  # to_dict() does not serialize datetime objects
       )
+      if is_immutable_quote(quote):
+        self._store_object("quote", key, result)
+      return result
     elif method == "get_recipient_account_by_id":
       recipient = get_recipient_account_by_id(self._api_client, self._context, *args, **kwargs).to_dict()
       return json.dumps(
@@ -113,15 +584,143 @@ class WiseAPI(BaseModel):
         default=str  # to_dict() does not serialize datetime objects
       )
     elif method == "get_account_requirements":
+      # The requirements returned for a quote never change, and quotes on the same route share them
+      quote_id = _argument(get_account_requirements, args, kwargs, "quote_id")
+      address_required = _argument(get_account_requirements, args, kwargs, "address_required")
+      route = self._requirements.route(quote_id, address_required)
+      cached = self._requirements.get(route) if route is not None else None
+      if cached is not None:
+        return cached
+      key = f"{quote_id}:{address_required}"
+      stored = self._stored("account_requirements", key)
+      if stored is not None:
+        if route is not None:
+          self._requirements.put(route, stored)
+        return stored
       requirements = get_account_requirements(self._api_client, self._context, *args, **kwargs)
       requirements = [] if requirements is None else requirements
       requirements = [r.to_dict() for r in requirements]
-      return json.dumps(
+      result = json.dumps(
         requirements,
         default=str  # to_dict() does not serialize datetime objects
       )
+      if requirements:
+        self._store_object("account_requirements", key, result)
+        if route is not None:
+          self._requirements.put(route, result)
+      return result
     elif method == "list_activities":
-      activities = list_activities(self._api_client, self._context, *args, **kwargs).to_dict()
+      fetch_all = kwargs.pop("fetch_all", None)
+      arguments = _arguments(list_activities, args, kwargs)
+      if is_fan_out(arguments["profile_id"]):
+        return json.dumps(self._list_profiles_activities(arguments, fetch_all), default=str)
+      if fetch_all:
+        activities = [a.to_dict() for a in iter_activities(self._api_client, self._context, **arguments)]
+        return json.dumps({"activities": activities}, default=str)
+      activities = list_activities(self._api_client, self._context, **arguments).to_dict()
       return json.dumps(activities, default=str)  # to_dict() does not serialize datetime objects
+    elif method == "query_activity_ledger":
+      return json.dumps(self.query_activities(*args, **kwargs), default=str)
+    elif method == "export_records":
+      return json.dumps(self.export_records(*args, **kwargs))
     else:
       raise ValueError("Invalid method " + method)
+
+  def _list_profiles_activities(self, arguments: Dict[str, Any], fetch_all: Optional[bool]) -> Dict[str, Any]:
+    """List the activities of several profiles, merged newest first, with each profile's next cursor."""
+    if arguments["next_cursor"]:
+      raise ValueError("next_cursor belongs to a single profile; page through one profile_id at a time.")
+
+    def fetch_activities(profile_id: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+      call = dict(arguments, profile_id=profile_id)
+      if fetch_all:
+        return [a.to_dict() for a in iter_activities(self._api_client, self._context, **call)], None
+      response = list_activities(self._api_client, self._context, **call)
+      return [a.to_dict() for a in response.activities or []], response.cursor
+
+    results = fetch_profiles(fetch_activities, self._profile_ids(arguments["profile_id"]))
+    activities = merge_newest_first([(profile_id, result[0]) for profile_id, result in results], "createdOn")
+    if fetch_all:
+      return {"activities": activities}
+    return {"activities": activities, "cursors": {str(profile_id): result[1] for profile_id, result in results}}
+
+  def _profile_ids(self, profile: Any) -> List[int]:
+    """Return the IDs named by a multi-profile argument: ``"all"`` or a list of IDs."""
+    if profile != ALL_PROFILES:
+      if not profile:
+        raise ValueError("At least one profile ID must be given.")
+      return [int(profile_id) for profile_id in profile]
+    if self._all_profile_ids is None:
+      self._all_profile_ids = [p.to_dict()["id"] for p in list_profiles(self._api_client, self._context) or []]
+    return self._all_profile_ids
+
+  def _quote_key(self, args, kwargs) -> tuple:
+    """Return the parameters that identify a ``create_quote`` call, for reusing its quote."""
+    bound = inspect.signature(create_quote).bind(None, None, *args, **kwargs)
+    bound.apply_defaults()
+    arguments = bound.arguments
+    side = "source" if arguments["source_amount"] is not None else "target"
+    amount = arguments[f"{side}_amount"]
+    return (
+      self._store_namespace,
+      str(arguments["profile_id"] or self._context.get("profile_id")),
+      arguments["source_currency"].upper(),
+      arguments["target_currency"].upper(),
+      side,
+      None if amount is None else float(amount),
+      arguments["target_account"],
+      arguments["pay_out"],
+      arguments["preferred_pay_in"],
+    )
+
+  @staticmethod
+  def _recipient_payload(args, kwargs) -> Dict[str, Any]:
+    """Return the request body ``create_recipient_account`` would send for these arguments."""
+    bound = inspect.signature(create_recipient_account).bind(None, None, *args, **kwargs)
+    arguments = bound.arguments
+    return {
+      "accountHolderName": arguments.get("account_holder_name"),
+      "currency": arguments.get("currency"),
+      "type": arguments.get("type"),
+      **arguments.get("kwargs", {}),
+    }
+
+  def _ledger_profile_id(self, profile_id: Optional[int]) -> int:
+    if self._ledger is None:
+      raise ValueError("The activity ledger is not enabled. Create the client with an ActivityLedger.")
+    profile_id = profile_id or self._context.get("profile_id")
+    if not profile_id:
+      raise ValueError("Profile ID must be provided either as a parameter or in context.")
+    return int(profile_id)
+
+  def _get_transfer(self, transfer_id: int, live: bool = True) -> str:
+    """Return a transfer as JSON; with ``live=False`` the live state is not consulted."""
+    key = str(transfer_id)
+    stored = self._stored("transfer", key)
+    if stored is not None:
+      return stored
+    transfer = self._live_state.transfer(int(key)) if live and self._live_state is not None else None
+    if transfer is not None:
+      return json.dumps(transfer, default=str)
+    transfer = get_transfer_by_id(self._api_client, self._context, transfer_id=transfer_id).to_dict()
+    self._remember_transfer(transfer)
+    result = json.dumps(
+      transfer,
+      default=str  # to_dict() does not serialize datetime objects
+    )
+    if is_immutable_transfer(transfer):
+      self._store_object("transfer", key, result)
+    return result
+
+  def _remember_transfer(self, transfer: Dict[str, Any]) -> None:
+    if self._live_state is not None:
+      self._live_state.remember(transfer)
+
+  def _stored(self, kind: str, key: str) -> Optional[str]:
+    if self._store is None:
+      return None
+    return self._store.get(self._store_namespace, kind, key)
+
+  def _store_object(self, kind: str, key: str, body: str) -> None:
+    if self._store is not None:
+      self._store.put(self._store_namespace, kind, key, body)
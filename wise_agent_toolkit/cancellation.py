@@ -0,0 +1,135 @@
+"""
+Cooperative cancellation for blocking Wise API calls.
+
+A ``CancellationToken`` is bound to the current call with ``cancellation_scope``.
+The ``CancellableRESTClient`` transport consults the bound token: it refuses to
+start new HTTP requests once the token is cancelled and shuts down the socket of
+any response still being read, so an abandoned read releases its connection
+immediately instead of running to completion.
+
+A request cannot be aborted before its response headers arrive, so requests
+made under a token always carry a bounded timeout (``REQUEST_TIMEOUT`` unless
+the caller sets one): a cancelled call then ends within that bound even when
+the server never answers.
+"""
+
+import contextlib
+import threading
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from wise_api_client.rest import RESTClientObject, RESTResponse
+
+# (connect, read) timeout in seconds of requests made under a cancellation token
+REQUEST_TIMEOUT = (10.0, 60.0)
+
+
+class CallCancelledError(Exception):
+  """Raised inside a Wise API call whose caller has cancelled it."""
+
+
+class CancellationToken:
+  """Thread-safe cancellation flag that can abort in-flight HTTP responses."""
+
+  def __init__(self):
+    self._event = threading.Event()
+    self._lock = threading.Lock()
+    self._responses = set()
+
+  @property
+  def cancelled(self) -> bool:
+    return self._event.is_set()
+
+  def cancel(self) -> None:
+    """Cancel the call and abort every HTTP response it is still reading."""
+    with self._lock:
+      self._event.set()
+      responses = list(self._responses)
+      self._responses.clear()
+    for response in responses:
+      _abort(response)
+
+  def raise_if_cancelled(self) -> None:
+    if self.cancelled:
+      raise CallCancelledError("The call was cancelled by the client.")
+
+  def track(self, response) -> None:
+    """Track an in-flight urllib3 response so that ``cancel`` can abort it."""
+    with self._lock:
+      if not self._event.is_set():
+        self._responses.add(response)
+        return
+    _abort(response)
+
+  def untrack(self, response) -> None:
+    with self._lock:
+      self._responses.discard(response)
+
+
+def _abort(response) -> None:
+  # urllib3 >= 2.3 can interrupt a blocking read from another thread
+  shutdown = getattr(response, "shutdown", None)
+  try:
+    if shutdown is not None:
+      shutdown()
+    else:
+      response.close()
+  except Exception:
+    pass
+
+
+_current_token: ContextVar[Optional[CancellationToken]] = ContextVar("wise_cancellation_token", default=None)
+
+
+def current_token() -> Optional[CancellationToken]:
+  """Return the cancellation token bound to the current call, if any."""
+  return _current_token.get()
+
+
+@contextlib.contextmanager
+def cancellation_scope(token: CancellationToken) -> Iterator[CancellationToken]:
+  """Bind ``token`` to Wise API calls made in the current context."""
+  reset = _current_token.set(token)
+  try:
+    yield token
+  finally:
+    _current_token.reset(reset)
+
+
+class _CancellableRESTResponse(RESTResponse):
+
+  def __init__(self, resp, token: CancellationToken) -> None:
+    super().__init__(resp)
+    self._token = token
+
+  def read(self):
+    try:
+      return super().read()
+    except Exception:
+      self._token.raise_if_cancelled()
+      raise
+    finally:
+      self._token.untrack(self.response)
+
+
+class CancellableRESTClient(RESTClientObject):
+  """REST transport that honours the cancellation token of the current call."""
+
+  def request(self, method, url, headers=None, body=None, post_params=None, _request_timeout=None):
+    token = current_token()
+    if token is None:
+      return super().request(
+        method, url, headers=headers, body=body, post_params=post_params, _request_timeout=_request_timeout
+      )
+
+    token.raise_if_cancelled()
+    try:
+      response = super().request(
+        method, url, headers=headers, body=body, post_params=post_params,
+        _request_timeout=_request_timeout or REQUEST_TIMEOUT,
+      )
+    except Exception:
+      token.raise_if_cancelled()
+      raise
+    token.track(response.response)
+    return _CancellableRESTResponse(response.response, token)
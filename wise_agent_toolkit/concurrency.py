@@ -0,0 +1,124 @@
+"""
+Running blocking Wise API calls from asyncio and in batches.
+
+The Wise API client is synchronous, so ``run_async`` runs a call on a
+bounded thread pool (``WiseAPI.executor``, one worker per pooled connection)
+and binds a ``CancellationToken`` to it. Cancelling the awaiting task then
+aborts the call's HTTP request and frees its worker and connection, instead
+of leaving a thread blocked on the read. Writes are not abortable: once sent
+they run to completion, as in the MCP server, and the cancellation is raised
+afterwards.
+
+``run_batch`` and ``arun_batch`` run many calls at once with a cap on how
+many are in flight. Calls with the same key (e.g. the same tool arguments)
+run once and share the result, and results are returned in input order.
+"""
+
+import asyncio
+import contextlib
+import json
+import threading
+from concurrent.futures import Executor, Future
+from contextvars import copy_context
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, TypeVar
+
+from .cancellation import CancellationToken, cancellation_scope
+
+T = TypeVar("T")
+
+
+async def run_async(executor: Optional[Executor], func: Callable[..., T], *args, abortable: bool = True, **kwargs) -> T:
+  """Await ``func(*args, **kwargs)`` run on ``executor``, in a copy of the caller's context."""
+  token = CancellationToken()
+
+  def call() -> T:
+    with cancellation_scope(token) if abortable else contextlib.nullcontext():
+      return func(*args, **kwargs)
+
+  future = asyncio.get_running_loop().run_in_executor(executor, copy_context().run, call)
+  if abortable:
+    try:
+      return await future
+    except asyncio.CancelledError:
+      token.cancel()
+      raise
+
+  try:
+    return await asyncio.shield(future)
+  except asyncio.CancelledError:
+    # A write that has been sent must not be abandoned half-way: the caller
+    # could not tell whether it happened and might issue it twice.
+    await asyncio.wait([future])
+    raise
+
+
+def batch_key(value: Any) -> Optional[str]:
+  """Return a key identifying equal call arguments, or None if they cannot be compared."""
+  try:
+    return json.dumps(value, sort_keys=True)
+  except (TypeError, ValueError):
+    return None
+
+
+def _unique(keys: Sequence[Optional[Hashable]]) -> List[int]:
+  """Return, for each position, the position of the first call with the same key."""
+  first: Dict[Hashable, int] = {}
+  return [index if key is None else first.setdefault(key, index) for index, key in enumerate(keys)]
+
+
+def run_batch(
+  calls: Sequence[Callable[[], T]],
+  executor: Executor,
+  keys: Optional[Sequence[Optional[Hashable]]] = None,
+  max_concurrency: Optional[int] = None,
+  return_exceptions: bool = False,
+) -> List[Any]:
+  """Run ``calls`` on ``executor`` and return their results in order.
+
+  Calls with an equal, non-None key run once. At most ``max_concurrency``
+  calls are submitted at a time (the executor's own size also bounds them).
+  A failure is raised, or returned in its place with ``return_exceptions``.
+  """
+  sources = _unique(keys if keys is not None else [None] * len(calls))
+  slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+  futures: Dict[int, Future] = {}
+  for index in sorted(set(sources)):
+    if slots is not None:
+      slots.acquire()
+    future = executor.submit(copy_context().run, calls[index])
+    if slots is not None:
+      future.add_done_callback(lambda _: slots.release())
+    futures[index] = future
+
+  results = []
+  for source in sources:
+    try:
+      results.append(futures[source].result())
+    except Exception as e:
+      if not return_exceptions:
+        raise
+      results.append(e)
+  return results
+
+
+async def arun_batch(
+  calls: Sequence[Callable[[], Awaitable[T]]],
+  keys: Optional[Sequence[Optional[Hashable]]] = None,
+  max_concurrency: Optional[int] = None,
+  return_exceptions: bool = False,
+) -> List[Any]:
+  """Async ``run_batch``: await the coroutines made by ``calls`` concurrently."""
+  sources = _unique(keys if keys is not None else [None] * len(calls))
+  slots = asyncio.Semaphore(max_concurrency) if max_concurrency else contextlib.nullcontext()
+
+  async def run(index: int) -> T:
+    async with slots:
+      return await calls[index]()
+
+  unique = sorted(set(sources))
+  outcomes = dict(zip(unique, await asyncio.gather(*(run(index) for index in unique), return_exceptions=True)))
+  if not return_exceptions:
+    for source in sources:
+      if isinstance(outcomes[source], BaseException):
+        raise outcomes[source]
+  return [outcomes[source] for source in sources]
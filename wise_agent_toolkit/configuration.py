@@ -38,10 +38,15 @@ class Context(TypedDict, total=False):
   profile_id: Optional[str]
 
 
+# Define DescriptionProfile type: how much of each tool prompt is sent to the model
+DescriptionProfile = Literal["full", "compact", "minimal"]
+
+
 # Define Configuration type
 class Configuration(TypedDict, total=False):
   actions: Optional[Actions]
   context: Optional[Context]
+  description_profile: Optional[DescriptionProfile]
 
 
 ACTIONS_ALL: Actions = {
@@ -54,6 +59,31 @@ ACTIONS_ALL: Actions = {
 }
 
 
+def is_read_only_tool(tool):
+  """Return True if the tool only needs read permissions."""
+  return all(
+    permission == "read"
+    for permissions in tool.get("actions").values()
+    for permission in permissions
+  )
+
+
+# Optional features a tool can depend on (the "requires" of its entry in tools.py)
+Capability = Literal["ledger", "transfer_ledger", "export_dir"]
+
+
+def capabilities(ledger=None, transfer_ledger=None, export_dir=None) -> frozenset:
+  """Return the optional features enabled by a client's (or server's) settings."""
+  enabled = {"ledger": ledger is not None, "transfer_ledger": transfer_ledger is not None, "export_dir": bool(export_dir)}
+  return frozenset(name for name, on in enabled.items() if on)
+
+
+def is_tool_available(tool, capabilities):
+  """Return True if the client offers the optional feature the tool depends on, if any."""
+  requirement = tool.get("requires")
+  return requirement is None or requirement in capabilities
+
+
 def is_tool_allowed(tool, configuration):
   # Configuration should never be None now that we provide defaults
   for resource, permissions in tool.get("actions").items():
@@ -0,0 +1,233 @@
+"""
+Streaming export of transfers, activities and recipients to files.
+
+Finance teams ask for exports of whole histories, which used to come back as
+one huge JSON string. ``export_records`` instead streams records from the
+paginated iterators straight into a CSV, NDJSON or Parquet file. Records are
+written as they arrive (Parquet in row groups of ``batch_size`` records), so
+memory stays flat however long the history is. Only the file path and row
+count are returned.
+
+Parquet needs pyarrow (``pip install wise-agent-toolkit[export]``). Files are
+written under a ``.part`` name and renamed once complete, so a reader never
+sees a half-written export.
+"""
+
+import csv
+import json
+import os
+import re
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+  import pyarrow as pa
+  import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional
+  pa = None
+  pq = None
+
+from .ledger import parse_amount
+
+FORMATS = ("csv", "ndjson", "parquet")
+
+# Parquet row groups hold this many records
+BATCH_SIZE = 1000
+
+_TAG = re.compile(r"<[^>]*>")
+_FILENAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+Column = Tuple[str, Callable[[Dict[str, Any]], Any], str]
+
+
+def _field(path: str) -> Callable[[Dict[str, Any]], Any]:
+  keys = path.split(".")
+
+  def get(record: Dict[str, Any]) -> Any:
+    value = record
+    for key in keys:
+      if not isinstance(value, dict):
+        return None
+      value = value.get(key)
+    return value
+
+  return get
+
+
+def _text(path: str) -> Callable[[Dict[str, Any]], Any]:
+  """Like ``_field``, with the markup Wise puts in activity titles removed."""
+  get = _field(path)
+  return lambda record: _TAG.sub("", get(record)) if get(record) else get(record)
+
+
+# Columns written to CSV and Parquet: (name, extractor, type); NDJSON keeps whole records
+COLUMNS: Dict[str, List[Column]] = {
+  "transfers": [
+    ("id", _field("id"), "int"),
+    ("created", _field("created"), "timestamp"),
+    ("status", _field("status"), "string"),
+    ("source_currency", _field("sourceCurrency"), "string"),
+    ("source_value", _field("sourceValue"), "float"),
+    ("target_currency", _field("targetCurrency"), "string"),
+    ("target_value", _field("targetValue"), "float"),
+    ("rate", _field("rate"), "float"),
+    ("target_account", _field("targetAccount"), "int"),
+    ("source_account", _field("sourceAccount"), "int"),
+    ("quote_uuid", _field("quoteUuid"), "string"),
+    ("reference", _field("details.reference"), "string"),
+    ("customer_transaction_id", _field("customerTransactionId"), "string"),
+    ("has_active_issues", _field("hasActiveIssues"), "bool"),
+  ],
+  "activities": [
+    ("id", _field("id"), "string"),
+    ("created_on", _field("createdOn"), "timestamp"),
+    ("updated_on", _field("updatedOn"), "timestamp"),
+    ("type", _field("type"), "string"),
+    ("status", _field("status"), "string"),
+    ("title", _text("title"), "string"),
+    ("description", _text("description"), "string"),
+    ("amount", lambda record: parse_amount(record.get("primaryAmount"))[0], "float"),
+    ("currency", lambda record: parse_amount(record.get("primaryAmount"))[1], "string"),
+    ("primary_amount", _text("primaryAmount"), "string"),
+    ("secondary_amount", _text("secondaryAmount"), "string"),
+    ("resource_type", _field("resource.type"), "string"),
+    ("resource_id", _field("resource.id"), "string"),
+  ],
+  "recipients": [
+    ("id", _field("id"), "int"),
+    ("profile_id", _field("profileId"), "int"),
+    ("name", _field("name.fullName"), "string"),
+    ("currency", _field("currency"), "string"),
+    ("country", _field("country"), "string"),
+    ("type", _field("type"), "string"),
+    ("legal_entity_type", _field("legalEntityType"), "string"),
+    ("account_summary", _field("accountSummary"), "string"),
+    ("long_account_summary", _field("longAccountSummary"), "string"),
+    ("active", _field("active"), "bool"),
+    ("owned_by_customer", _field("ownedByCustomer"), "bool"),
+  ],
+}
+
+
+def default_export_dir() -> str:
+  return os.path.join(tempfile.gettempdir(), "wise-agent-toolkit-exports")
+
+
+def export_path(kind: str, file_format: str, export_dir: Optional[str] = None, filename: Optional[str] = None) -> str:
+  """Return the path of a new export file inside ``export_dir``.
+
+  ``filename`` may only name a file, never a path, so callers such as agents
+  cannot write outside the export directory.
+  """
+  if filename is None:
+    filename = f"{kind}-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')}.{file_format}"
+  elif not _FILENAME.match(filename):
+    raise ValueError("filename must be a plain file name (letters, digits, '.', '_' and '-')")
+  elif not filename.endswith(f".{file_format}"):
+    filename = f"{filename}.{file_format}"
+  return os.path.join(export_dir or default_export_dir(), filename)
+
+
+def export_records(
+  records: Iterable[Dict[str, Any]],
+  path: str,
+  kind: str,
+  file_format: str = "csv",
+  batch_size: int = BATCH_SIZE,
+) -> Dict[str, Any]:
+  """Stream ``records`` (dictionaries as returned by ``to_dict()``) of ``kind`` into a file at ``path``."""
+  if kind not in COLUMNS:
+    raise ValueError(f"Unknown export kind: {kind}. Choose one of: {', '.join(COLUMNS)}")
+  if file_format not in FORMATS:
+    raise ValueError(f"Unsupported export format: {file_format}. Choose one of: {', '.join(FORMATS)}")
+  if file_format == "parquet" and pa is None:
+    raise ImportError(
+      "pyarrow is required for Parquet exports. "
+      "Install it with: pip install wise-agent-toolkit[export]"
+    )
+
+  os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+  partial = f"{path}.part"
+  try:
+    if file_format == "csv":
+      rows = _write_csv(records, partial, COLUMNS[kind])
+    elif file_format == "ndjson":
+      rows = _write_ndjson(records, partial)
+    else:
+      rows = _write_parquet(records, partial, COLUMNS[kind], batch_size)
+    os.replace(partial, path)
+  except BaseException:
+    if os.path.exists(partial):
+      os.remove(partial)
+    raise
+
+  return {"path": path, "rows": rows, "format": file_format, "bytes": os.path.getsize(path)}
+
+
+def _csv_value(value: Any) -> Any:
+  if isinstance(value, datetime):
+    return value.isoformat()
+  return "" if value is None else value
+
+
+def _write_csv(records: Iterable[Dict[str, Any]], path: str, columns: List[Column]) -> int:
+  rows = 0
+  with open(path, "w", newline="", encoding="utf-8") as file:
+    writer = csv.writer(file)
+    writer.writerow([name for name, _, _ in columns])
+    for record in records:
+      writer.writerow([_csv_value(get(record)) for _, get, _ in columns])
+      rows += 1
+  return rows
+
+
+def _write_ndjson(records: Iterable[Dict[str, Any]], path: str) -> int:
+  rows = 0
+  with open(path, "w", encoding="utf-8") as file:
+    for record in records:
+      file.write(json.dumps(record, default=str))  # to_dict() does not serialize datetime objects
+      file.write("\n")
+      rows += 1
+  return rows
+
+
+def _parquet_value(value: Any, column_type: str) -> Any:
+  if value is None:
+    return None
+  if column_type == "timestamp":
+    if isinstance(value, str):
+      value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+  if column_type == "string":
+    return str(value)
+  return value
+
+
+def _write_parquet(records: Iterable[Dict[str, Any]], path: str, columns: List[Column], batch_size: int) -> int:
+  types = {
+    "int": pa.int64(),
+    "float": pa.float64(),
+    "bool": pa.bool_(),
+    "string": pa.string(),
+    "timestamp": pa.timestamp("us", tz="UTC"),
+  }
+  schema = pa.schema([(name, types[column_type]) for name, _, column_type in columns])
+
+  def flush(batch: List[List[Any]]) -> None:
+    arrays = [pa.array(values, type=schema.field(i).type) for i, values in enumerate(batch)]
+    writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+  rows = 0
+  with pq.ParquetWriter(path, schema) as writer:
+    batch: List[List[Any]] = [[] for _ in columns]
+    for record in records:
+      for values, (_, get, column_type) in zip(batch, columns):
+        values.append(_parquet_value(get(record), column_type))
+      rows += 1
+      if rows % batch_size == 0:
+        flush(batch)
+        batch = [[] for _ in columns]
+    if rows % batch_size or rows == 0:
+      flush(batch)
+  return rows
@@ -0,0 +1,95 @@
+"""
+Listing over several profiles at once.
+
+``list_transfers`` and ``list_activities`` accept ``"all"`` or a list of
+profile IDs in place of a single profile. Each profile is fetched from its own
+thread, so the call costs one round trip instead of one per profile. The
+per-profile lists, newest first as Wise returns them, are merged with
+``heapq.merge`` and every item is tagged with the ``profileId`` it belongs to.
+"""
+
+import functools
+import heapq
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+from .progress import ProgressCallback, current_callback, progress_scope
+from .records import epoch_seconds
+
+ALL_PROFILES = "all"
+PROFILE_KEY = "profileId"
+
+# Upper bound on the requests in flight for one call
+MAX_WORKERS = 8
+
+T = TypeVar("T")
+
+
+def is_fan_out(profile: Any) -> bool:
+  """Return True if ``profile`` names several profiles rather than one."""
+  return profile == ALL_PROFILES or isinstance(profile, (list, tuple, set))
+
+
+class _ProgressTotal:
+  """Adds up the progress each profile reports and passes the running total on.
+
+  Each profile counts the items it has fetched so far; the caller's callback
+  gets the sum over all profiles, one report at a time, so it only ever
+  increases.
+  """
+
+  def __init__(self, callback: ProgressCallback):
+    self._callback = callback
+    self._lock = threading.Lock()
+    self._progress: Dict[int, float] = {}
+
+  def report(self, profile_id: int, progress: float, message: Optional[str]) -> None:
+    with self._lock:
+      self._progress[profile_id] = max(progress, self._progress.get(profile_id, 0))
+      self._callback(sum(self._progress.values()), None, f"Profile {profile_id}: {message}" if message else None)
+
+  def fetch(self, fetch: Callable[[int], T], profile_id: int) -> T:
+    with progress_scope(lambda progress, total, message: self.report(profile_id, progress, message)):
+      return fetch(profile_id)
+
+
+def fetch_profiles(
+  fetch: Callable[[int], T], profile_ids: Iterable[Any], max_workers: int = MAX_WORKERS
+) -> List[Tuple[int, T]]:
+  """Call ``fetch(profile_id)`` for every profile concurrently and return ``(profile_id, result)`` pairs in order.
+
+  Workers run in a copy of the caller's context, so the cancellation token
+  bound to the call applies to every request. The progress callback bound to
+  the call receives the total fetched over all profiles, and is called from
+  the worker threads (see ``_ProgressTotal``). If a profile fails, the
+  requests not yet started are dropped and the error is raised.
+  """
+  profile_ids = list(dict.fromkeys(int(profile_id) for profile_id in profile_ids))
+  if len(profile_ids) <= 1:
+    return [(profile_id, fetch(profile_id)) for profile_id in profile_ids]
+
+  callback = current_callback()
+  if callback is not None:
+    fetch = functools.partial(_ProgressTotal(callback).fetch, fetch)
+  executor = ThreadPoolExecutor(max_workers=min(max_workers, len(profile_ids)), thread_name_prefix="wise-profiles")
+  try:
+    futures = [executor.submit(copy_context().run, fetch, profile_id) for profile_id in profile_ids]
+    return [(profile_id, future.result()) for profile_id, future in zip(profile_ids, futures)]
+  finally:
+    executor.shutdown(wait=True, cancel_futures=True)
+
+
+def merge_newest_first(results: Sequence[Tuple[int, List[Dict[str, Any]]]], created_key: str) -> List[Dict[str, Any]]:
+  """Tag the items of each profile with its ID and merge the newest-first lists into one."""
+
+  def created(item: Dict[str, Any]) -> float:
+    value = epoch_seconds(item.get(created_key))
+    return -math.inf if math.isnan(value) else value
+
+  for profile_id, items in results:
+    for item in items:
+      item[PROFILE_KEY] = profile_id
+  return list(heapq.merge(*(items for _, items in results), key=created, reverse=True))
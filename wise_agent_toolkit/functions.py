@@ -4,8 +4,14 @@ from datetime import datetime
 import wise_api_client
 
 from .configuration import Context
+from .progress import report_progress
 import uuid
 
+# Page sizes used when iterating over every page of a list endpoint
+TRANSFERS_PAGE_SIZE = 40
+ACTIVITIES_PAGE_SIZE = 100
+RECIPIENTS_PAGE_SIZE = 40
+
 
 def create_transfer(
   api_client,
@@ -566,3 +572,171 @@ def list_activities(
     next_cursor=next_cursor,
     size=size
   )
+
+
+def iter_transfers(
+  api_client,
+  context: Context,
+  profile: Optional[int] = None,
+  status: Optional[str] = None,
+  source_currency: Optional[str] = None,
+  target_currency: Optional[str] = None,
+  created_date_start: Optional[datetime] = None,
+  created_date_end: Optional[datetime] = None,
+  limit: Optional[int] = None,
+  offset: Optional[int] = None,
+):
+  """
+  Iterate over every transfer matching the filters, fetching page by page.
+
+  Progress (transfers fetched so far) is reported after each page.
+
+  Parameters:
+      api_client: The Wise API client.
+      context (Context): The context.
+      profile (int, optional): The profile ID. If not provided, will be taken from context.
+      status (str, optional): Filter by transfer status.
+      source_currency (str, optional): Filter by source currency.
+      target_currency (str, optional): Filter by target currency.
+      created_date_start (datetime, optional): Filter transfers created after this date.
+      created_date_end (datetime, optional): Filter transfers created before this date.
+      limit (int, optional): Number of items fetched per page (default 40).
+      offset (int, optional): Offset to start from (default 0).
+
+  Yields:
+      Transfers, in the order returned by Wise.
+  """
+  limit = limit or TRANSFERS_PAGE_SIZE
+  offset = offset or 0
+  fetched = 0
+  pages = 0
+
+  while True:
+    page = list_transfers(
+      api_client,
+      context,
+      profile=profile,
+      status=status,
+      source_currency=source_currency,
+      target_currency=target_currency,
+      created_date_start=created_date_start,
+      created_date_end=created_date_end,
+      limit=limit,
+      offset=offset,
+    ) or []
+    pages += 1
+    fetched += len(page)
+    report_progress(fetched, message=f"Fetched {fetched} transfers ({pages} pages)")
+
+    yield from page
+
+    if len(page) < limit:
+      return
+    offset += len(page)
+
+
+def iter_activities(
+  api_client,
+  context: Context,
+  profile_id: Optional[int] = None,
+  monetary_resource_type: Optional[str] = None,
+  status: Optional[str] = None,
+  since: Optional[datetime] = None,
+  until: Optional[datetime] = None,
+  next_cursor: Optional[str] = None,
+  size: Optional[int] = None,
+):
+  """
+  Iterate over every activity matching the filters, following the pagination cursor.
+
+  Progress (activities fetched so far) is reported after each page.
+
+  Parameters:
+      api_client: The Wise API client.
+      context (Context): The context.
+      profile_id (int, optional): The profile ID. If not provided, will be taken from context.
+      monetary_resource_type (str, optional): Filter by resource type.
+      status (str, optional): Filter by activity status.
+      since (datetime, optional): Filter activities created after this timestamp.
+      until (datetime, optional): Filter activities created before this timestamp.
+      next_cursor (str, optional): Pagination cursor to start from.
+      size (int, optional): Number of results fetched per page (default 100).
+
+  Yields:
+      Activities, in the order returned by Wise.
+  """
+  size = size or ACTIVITIES_PAGE_SIZE
+  fetched = 0
+  pages = 0
+
+  while True:
+    response = list_activities(
+      api_client,
+      context,
+      profile_id=profile_id,
+      monetary_resource_type=monetary_resource_type,
+      status=status,
+      since=since,
+      until=until,
+      next_cursor=next_cursor,
+      size=size,
+    )
+    activities = response.activities or []
+    pages += 1
+    fetched += len(activities)
+    report_progress(fetched, message=f"Fetched {fetched} activities ({pages} pages)")
+
+    yield from activities
+
+    next_cursor = response.cursor
+    if not next_cursor or not activities:
+      return
+
+
+def iter_recipient_accounts(
+  api_client,
+  context: Context,
+  profile_id: Optional[str] = None,
+  currency: Optional[str] = None,
+  size: Optional[int] = None,
+  seek_position: Optional[int] = None,
+):
+  """
+  Iterate over every recipient account, following the seek position.
+
+  Progress (recipients fetched so far) is reported after each page.
+
+  Parameters:
+      api_client: The Wise API client.
+      context (Context): The context.
+      profile_id (str, optional): The profile ID. If not provided, will be taken from context.
+      currency (str, optional): Filter by currency.
+      size (int, optional): Number of items fetched per page (default 40).
+      seek_position (int, optional): Position to start seeking from.
+
+  Yields:
+      Recipient accounts, in the order returned by Wise.
+  """
+  size = size or RECIPIENTS_PAGE_SIZE
+  fetched = 0
+  pages = 0
+
+  while True:
+    page = list_recipient_accounts(
+      api_client,
+      context,
+      profile_id=profile_id,
+      currency=currency,
+      size=size,
+      seek_position=seek_position,
+    )
+    recipients = page.content or []
+    pages += 1
+    fetched += len(recipients)
+    report_progress(fetched, message=f"Fetched {fetched} recipients ({pages} pages)")
+
+    yield from recipients
+
+    seek_position = page.seek_position_for_next
+    if seek_position is None or not recipients:
+      return
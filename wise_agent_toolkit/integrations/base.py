@@ -33,11 +33,11 @@ class BaseIntegrationToolkit(ABC):
   """Base class for integration-specific toolkits."""
 
   def __init__(self, api_key: str, host: str = "https://api.sandbox.transferwise.tech",
-               configuration: Optional[Configuration] = None):
+               configuration: Optional[Configuration] = None, wise_api: Optional[WiseAPI] = None):
     self.api_key = api_key
     self.host = host
     self.configuration = configuration
-    self._wise_api = None
+    self._wise_api = wise_api
 
   @property
   def wise_api(self) -> WiseAPI:
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-from typing import Any, Optional, Type
+import functools
+from typing import Any, List, Optional, Type
 from pydantic import BaseModel, Field
 
 # Check for LangChain availability
 try:
   from langchain.tools import BaseTool
+  from langchain_core.runnables.config import get_config_list
 
   _LANGCHAIN_AVAILABLE = True
 except ImportError:
@@ -16,7 +18,8 @@ except ImportError:
   class BaseTool:
     pass
 
-from ..api import WiseAPI
+from ..api import WiseAPI, batch_keys
+from ..concurrency import arun_batch, run_batch
 from ..integrations.base import BaseIntegrationTool
 
 
@@ -53,6 +56,49 @@ class WiseTool(BaseTool, BaseIntegrationTool):
     """Use the Wise API to run an operation (LangChain interface)."""
     return self.execute(*args, **kwargs)
 
+  async def _arun(
+    self,
+    *args: Any,
+    **kwargs: Any,
+  ) -> str:
+    """Use the Wise API to run an operation without blocking the event loop (LangChain interface).
+
+    Cancelling the calling task aborts the HTTP request of a read tool.
+    """
+    return await self.wise_api.arun(self.method, *args, **kwargs)
+
+  def batch(
+    self, inputs: List[Any], config: Any = None, *, return_exceptions: bool = False, **kwargs: Any
+  ) -> List[Any]:
+    """Run the tool on many inputs concurrently on the client's worker pool (LangChain interface).
+
+    Identical inputs of a read tool run once. The ``max_concurrency`` of the
+    config caps the calls in flight. Results are in input order.
+    """
+    if not inputs:
+      return []
+    configs = get_config_list(config, len(inputs))
+    calls = [
+      functools.partial(self.invoke, tool_input, run_config, **kwargs)
+      for tool_input, run_config in zip(inputs, configs)
+    ]
+    max_concurrency = configs[0].get("max_concurrency")
+    return run_batch(calls, self.wise_api.executor, batch_keys(self.method, inputs), max_concurrency, return_exceptions)
+
+  async def abatch(
+    self, inputs: List[Any], config: Any = None, *, return_exceptions: bool = False, **kwargs: Any
+  ) -> List[Any]:
+    """Async ``batch``; each call is cancellable like ``_arun``."""
+    if not inputs:
+      return []
+    configs = get_config_list(config, len(inputs))
+    calls = [
+      functools.partial(self.ainvoke, tool_input, run_config, **kwargs)
+      for tool_input, run_config in zip(inputs, configs)
+    ]
+    max_concurrency = configs[0].get("max_concurrency")
+    return await arun_batch(calls, batch_keys(self.method, inputs), max_concurrency, return_exceptions)
+
   def execute(self, *args: Any, **kwargs: Any) -> str:
     """Execute the tool with the given arguments (BaseIntegrationTool interface)."""
     return self.wise_api.run(self.method, *args, **kwargs)
@@ -1,9 +1,11 @@
 from typing import List, Optional, Dict, Any
 from pydantic import PrivateAttr
 
-from ..tools import tools
-from ..configuration import Configuration, is_tool_allowed
+from ..api import WiseAPI
+from ..tools import tool_description, tools
+from ..configuration import Configuration, is_tool_allowed, is_tool_available
 from ..integrations.base import BaseIntegrationToolkit
+from ..retrieval import DEFAULT_TOP_K, ToolIndex
 
 # Check for LangChain availability
 try:
@@ -28,12 +30,14 @@ class WiseAgentToolkit(BaseIntegrationToolkit):
   """Wise Agent Toolkit for LangChain integration."""
 
   _tools: List = PrivateAttr(default=[])
+  _tool_index: Optional[ToolIndex] = PrivateAttr(default=None)
 
   def __init__(
     self,
     api_key: str,
     host: str = "https://api.sandbox.transferwise.tech",
-    configuration: Optional[Configuration] = None
+    configuration: Optional[Configuration] = None,
+    wise_api: Optional[WiseAPI] = None,
   ):
     if not _LANGCHAIN_AVAILABLE:
       raise ImportError(
@@ -41,25 +45,34 @@ class WiseAgentToolkit(BaseIntegrationToolkit):
         "Install it with: pip install wise-agent-toolkit[langchain]"
       )
 
-    super().__init__(api_key=api_key, host=host, configuration=configuration)
+    super().__init__(api_key=api_key, host=host, configuration=configuration, wise_api=wise_api)
 
     filtered_tools = [
-      tool for tool in tools if is_tool_allowed(tool, configuration)
+      tool for tool in tools
+      if is_tool_allowed(tool, configuration) and is_tool_available(tool, self.wise_api.capabilities)
     ]
 
     self._tools = [
       self.create_tool(tool) for tool in filtered_tools
     ]
+    self._tool_index = ToolIndex(filtered_tools)
 
-  def get_tools(self) -> List:
-    """Get the tools in the toolkit."""
-    return self._tools
+  def get_tools(self, query: Optional[str] = None, k: int = DEFAULT_TOP_K) -> List:
+    """Get the tools in the toolkit.
+
+    With a ``query`` (e.g. the user's message), only the ``k`` tools most
+    relevant to it are returned, or all of them when nothing matches.
+    """
+    if not query:
+      return self._tools
+    selected = {tool["method"] for tool in self._tool_index.select(query, k)}
+    return [tool for tool in self._tools if tool.method in selected]
 
   def create_tool(self, tool_config: Dict[str, Any]) -> WiseTool:
     """Create a LangChain-specific tool from configuration."""
     return WiseTool(
       name=tool_config["method"],
-      description=tool_config["description"],
+      description=tool_description(tool_config, (self.configuration or {}).get("description_profile")),
       method=tool_config["method"],
       wise_api=self.wise_api,
       args_schema=tool_config.get("args_schema", None),
@@ -0,0 +1,245 @@
+"""
+Local, indexed copy of the Wise activity feed.
+
+``ActivityLedger`` keeps the activities of each profile in a SQLite table
+indexed by date, currency and amount. A sync walks the feed with ``since`` and
+the pagination cursor starting just before the persisted high-water mark (the
+newest ``createdOn`` seen so far), so after the first run only new activity is
+fetched. Activities created within ``overlap`` of the high-water mark are
+fetched again, which picks up late status changes such as a pending payment
+completing.
+
+Questions like "activity last month over 1000 EUR" are then answered by
+``query`` from the index, without any network call.
+
+The ledger can share the database file of an ``ObjectStore``; rows are
+namespaced the same way, so one API key never sees the activities of another.
+"""
+
+import json
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .store import SQLiteDatabase
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS activities (
+  namespace TEXT NOT NULL,
+  profile_id INTEGER NOT NULL,
+  id TEXT NOT NULL,
+  type TEXT,
+  resource_type TEXT,
+  resource_id TEXT,
+  title TEXT,
+  description TEXT,
+  status TEXT,
+  amount REAL,
+  currency TEXT,
+  created_on TEXT,
+  updated_on TEXT,
+  body TEXT NOT NULL,
+  PRIMARY KEY (namespace, profile_id, id)
+);
+CREATE INDEX IF NOT EXISTS activities_created_on ON activities (namespace, profile_id, created_on);
+CREATE INDEX IF NOT EXISTS activities_currency_amount ON activities (namespace, profile_id, currency, amount);
+CREATE TABLE IF NOT EXISTS ledger_sync (
+  namespace TEXT NOT NULL,
+  profile_id INTEGER NOT NULL,
+  high_water_mark TEXT,
+  synced_at REAL NOT NULL,
+  PRIMARY KEY (namespace, profile_id)
+);
+"""
+
+_COLUMNS = (
+  "namespace", "profile_id", "id", "type", "resource_type", "resource_id", "title", "description", "status",
+  "amount", "currency", "created_on", "updated_on", "body",
+)
+
+# Rows are written in transactions of this many activities
+_BATCH_SIZE = 500
+
+_TAG = re.compile(r"<[^>]*>")
+_AMOUNT = re.compile(r"([-+]?)\s*(\d[\d,]*(?:\.\d+)?)")
+_CURRENCY = re.compile(r"\b([A-Z]{3})\b")
+
+
+def parse_amount(text: Optional[str]) -> Tuple[Optional[float], Optional[str]]:
+  """Parse an activity amount such as ``"<positive>+ 1,000.50 EUR</positive>"`` into ``(1000.5, "EUR")``.
+
+  The amount is returned as a magnitude; the direction of money is not
+  reported consistently by the activity feed.
+  """
+  if not text:
+    return None, None
+  text = _TAG.sub("", text)
+  amount = _AMOUNT.search(text)
+  currency = _CURRENCY.search(text)
+  return (
+    float(amount.group(2).replace(",", "")) if amount else None,
+    currency.group(1) if currency else None,
+  )
+
+
+def format_timestamp(value: Any) -> Optional[str]:
+  """Normalize a datetime or ISO string to UTC ISO-8601 with microseconds, so text order is time order."""
+  if value is None:
+    return None
+  if isinstance(value, str):
+    try:
+      value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+      return None
+  if value.tzinfo is None:
+    value = value.replace(tzinfo=timezone.utc)
+  return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def _parse_timestamp(value: str) -> datetime:
+  return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%fZ").replace(tzinfo=timezone.utc)
+
+
+class ActivityLedger(SQLiteDatabase):
+  """SQLite index of Wise activities, synced incrementally from a persisted high-water mark."""
+
+  schema = _SCHEMA
+
+  def __init__(self, path: str, overlap: timedelta = timedelta(days=3), busy_timeout: float = 5.0):
+    self.overlap = overlap
+    super().__init__(path, busy_timeout=busy_timeout)
+    # Not SQLiteDatabase._lock, which guards the connection list
+    self._sync_locks: Dict[Tuple[str, int], threading.Lock] = {}
+    self._sync_locks_lock = threading.Lock()
+
+  def high_water_mark(self, namespace: str, profile_id: int) -> Optional[str]:
+    """Return the newest ``createdOn`` synced for the profile, or None if it was never synced."""
+    row = self._connection().execute(
+      "SELECT high_water_mark FROM ledger_sync WHERE namespace = ? AND profile_id = ?",
+      (namespace, profile_id),
+    ).fetchone()
+    return row[0] if row else None
+
+  def sync(self, namespace: str, profile_id: int, fetch) -> Dict[str, Any]:
+    """Fetch the activities created since the high-water mark and index them.
+
+    ``fetch(since)`` must return an iterable of activity dictionaries (as
+    returned by ``to_dict()``) created after ``since``, or every activity when
+    ``since`` is None. Concurrent syncs of the same profile in this process
+    are serialized; the second one then has little or nothing to fetch.
+    """
+    with self._sync_lock(namespace, profile_id):
+      started = time.monotonic()
+      high_water_mark = self.high_water_mark(namespace, profile_id)
+      since = _parse_timestamp(high_water_mark) - self.overlap if high_water_mark else None
+
+      fetched = 0
+      batch = []
+      for activity in fetch(since):
+        row = self._row(namespace, profile_id, activity)
+        batch.append(row)
+        fetched += 1
+        if row[11] is not None and (high_water_mark is None or row[11] > high_water_mark):
+          high_water_mark = row[11]
+        if len(batch) >= _BATCH_SIZE:
+          self._write(batch)
+          batch = []
+      self._write(batch)
+
+      # Only advanced once every page was stored, so an interrupted sync is retried in full
+      connection = self._connection()
+      with connection:
+        connection.execute("BEGIN IMMEDIATE")
+        connection.execute(
+          "INSERT OR REPLACE INTO ledger_sync (namespace, profile_id, high_water_mark, synced_at) VALUES (?, ?, ?, ?)",
+          (namespace, profile_id, high_water_mark, time.time()),
+        )
+
+      return {
+        "profile_id": profile_id,
+        "fetched": fetched,
+        "since": format_timestamp(since),
+        "high_water_mark": high_water_mark,
+        "seconds": round(time.monotonic() - started, 3),
+      }
+
+  def query(
+    self,
+    namespace: str,
+    profile_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    currency: Optional[str] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    type: Optional[str] = None,
+    status: Optional[str] = None,
+    text: Optional[str] = None,
+    limit: Optional[int] = 100,
+  ) -> List[Dict[str, Any]]:
+    """Return the indexed activities matching every given filter, newest first."""
+    conditions = ["namespace = ?", "profile_id = ?"]
+    parameters: List[Any] = [namespace, profile_id]
+    for condition, value in (
+      ("created_on >= ?", format_timestamp(since)),
+      ("created_on < ?", format_timestamp(until)),
+      ("currency = ?", currency.upper() if currency else None),
+      ("amount >= ?", min_amount),
+      ("amount <= ?", max_amount),
+      ("type = ?", type),
+      ("status = ?", status),
+    ):
+      if value is not None:
+        conditions.append(condition)
+        parameters.append(value)
+    if text:
+      conditions.append("(title LIKE ? OR description LIKE ?)")
+      parameters.extend([f"%{text}%"] * 2)
+
+    sql = f"SELECT body FROM activities WHERE {' AND '.join(conditions)} ORDER BY created_on DESC"
+    if limit is not None:
+      sql += " LIMIT ?"
+      parameters.append(limit)
+    return [json.loads(body) for (body,) in self._connection().execute(sql, parameters)]
+
+  def __len__(self) -> int:
+    return self._connection().execute("SELECT count(*) FROM activities").fetchone()[0]
+
+  def _sync_lock(self, namespace: str, profile_id: int) -> threading.Lock:
+    with self._sync_locks_lock:
+      return self._sync_locks.setdefault((namespace, profile_id), threading.Lock())
+
+  def _write(self, rows: Iterable[tuple]) -> None:
+    rows = list(rows)
+    if not rows:
+      return
+    connection = self._connection()
+    with connection:
+      connection.execute("BEGIN IMMEDIATE")
+      connection.executemany(
+        f"INSERT OR REPLACE INTO activities ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+        rows,
+      )
+
+  @staticmethod
+  def _row(namespace: str, profile_id: int, activity: Dict[str, Any]) -> tuple:
+    amount, currency = parse_amount(activity.get("primaryAmount"))
+    resource = activity.get("resource") or {}
+    return (
+      namespace,
+      profile_id,
+      str(activity.get("id")),
+      activity.get("type"),
+      resource.get("type"),
+      None if resource.get("id") is None else str(resource.get("id")),
+      activity.get("title"),
+      activity.get("description"),
+      activity.get("status"),
+      amount,
+      currency,
+      format_timestamp(activity.get("createdOn")),
+      format_timestamp(activity.get("updatedOn")),
+      json.dumps(activity, default=str),  # to_dict() does not serialize datetime objects
+    )
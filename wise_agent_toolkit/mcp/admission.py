@@ -0,0 +1,201 @@
+"""
+Admission control and load shedding for the Wise MCP server.
+
+Every tool call must hold a slot in three budgets before it runs: its tool's
+own limit (if one is configured), the read or write budget, and the global
+in-flight limit. Reads and writes have separate budgets, so a burst of heavy
+list exports can never take the slots reserved for ``create_transfer``.
+
+Calls that cannot be admitted immediately wait in a bounded queue for at most
+``queue_timeout`` seconds. When the queue is full or the wait times out, the
+call is rejected at once with an ``OverloadedError`` telling the client when to
+retry, instead of piling up into cascading timeouts.
+
+When the server shuts down it stops admitting calls (``start_draining``) and
+waits for the in-flight ones to finish (``wait_idle``).
+"""
+
+import contextlib
+import json
+import time
+from typing import AsyncIterator, Dict, List, Optional
+
+import anyio
+
+
+class OverloadedError(Exception):
+  """Raised when a tool call is rejected because the server is at capacity."""
+
+  def __init__(self, message: str, retry_after: float, scope: str):
+    super().__init__(message)
+    self.message = message
+    self.retry_after = retry_after
+    self.scope = scope
+
+  def to_dict(self) -> Dict:
+    return {
+      "error": "overloaded",
+      "message": self.message,
+      "scope": self.scope,
+      "retry_after": self.retry_after,
+    }
+
+  def __str__(self) -> str:
+    # Serialized so that MCP clients receive a structured, machine-readable error
+    return json.dumps(self.to_dict())
+
+
+class AdmissionController:
+  """Per-tool, read/write and global in-flight limits with a bounded wait queue."""
+
+  def __init__(
+    self,
+    max_in_flight: int = 64,
+    max_reads: int = 48,
+    max_writes: int = 16,
+    tool_limits: Optional[Dict[str, int]] = None,
+    max_queue: int = 128,
+    queue_timeout: float = 5.0,
+  ):
+    if min(max_in_flight, max_reads, max_writes) < 1:
+      raise ValueError("In-flight limits must be at least 1")
+    if max_queue < 0:
+      raise ValueError("max_queue must not be negative")
+
+    self.max_in_flight = max_in_flight
+    self.max_queue = max_queue
+    self.queue_timeout = queue_timeout
+
+    self._limits: Dict[str, int] = {"global": max_in_flight, "read": max_reads, "write": max_writes}
+    self._semaphores: Dict[str, anyio.Semaphore] = {
+      scope: anyio.Semaphore(limit) for scope, limit in self._limits.items()
+    }
+    for tool_name, limit in (tool_limits or {}).items():
+      if limit < 1:
+        raise ValueError(f"Limit for tool {tool_name} must be at least 1")
+      self._limits[f"tool:{tool_name}"] = limit
+      self._semaphores[f"tool:{tool_name}"] = anyio.Semaphore(limit)
+
+    # Calls waiting for a slot, tracked per read/write class
+    self._waiting = {"read": 0, "write": 0}
+
+    # Worker threads for admitted calls; anyio's default pool is smaller than
+    # typical in-flight limits and would otherwise queue calls a second time.
+    self.thread_limiter = anyio.CapacityLimiter(max_in_flight)
+
+    # Running statistics, also used to estimate retry-after hints
+    self.in_flight = 0
+    self.admitted = 0
+    self.rejected = 0
+    self._avg_duration = 1.0
+
+    # Set once the server starts shutting down
+    self.draining_since: Optional[float] = None
+
+  @property
+  def draining(self) -> bool:
+    return self.draining_since is not None
+
+  def start_draining(self) -> None:
+    """Reject every call admitted from now on. Safe to call from a signal handler."""
+    if self.draining_since is None:
+      self.draining_since = time.monotonic()
+
+  async def wait_idle(self, timeout: float) -> bool:
+    """Wait up to ``timeout`` seconds for in-flight calls to finish; return whether they did."""
+    with anyio.move_on_after(max(timeout, 0)):
+      while self.in_flight:
+        await anyio.sleep(0.05)
+    return self.in_flight == 0
+
+  def stats(self) -> Dict[str, float]:
+    return {
+      "in_flight": self.in_flight,
+      "waiting": sum(self._waiting.values()),
+      "admitted": self.admitted,
+      "rejected": self.rejected,
+      "avg_duration": round(self._avg_duration, 3),
+    }
+
+  def retry_after(self, scope: str, kind: str) -> float:
+    """Estimate how long until a slot in ``scope`` frees up for a ``kind`` call."""
+    backlog = self._waiting[kind] + 1
+    return round(max(1.0, self._avg_duration * backlog / self._limits.get(scope, self.max_in_flight)), 1)
+
+  @contextlib.asynccontextmanager
+  async def admit(self, tool_name: str, write: bool) -> AsyncIterator[None]:
+    """Hold the slots needed to run one call of ``tool_name``."""
+    kind = "write" if write else "read"
+    self._reject_if_draining()
+
+    # Always acquire in the same order (tool, class, global) so waiters cannot deadlock
+    scopes = [scope for scope in (f"tool:{tool_name}", kind, "global") if scope in self._semaphores]
+    acquired: List[str] = []
+    # One deadline for the whole wait, however many budgets are contended
+    deadline = anyio.current_time() + self.queue_timeout
+
+    try:
+      for scope in scopes:
+        semaphore = self._semaphores[scope]
+        try:
+          semaphore.acquire_nowait()
+          acquired.append(scope)
+          continue
+        except anyio.WouldBlock:
+          pass
+
+        if self._waiting[kind] >= self.max_queue:
+          self.rejected += 1
+          raise OverloadedError(
+            f"Too many queued {kind} calls", retry_after=self.retry_after(scope, kind), scope=scope
+          )
+
+        self._waiting[kind] += 1
+        try:
+          with anyio.CancelScope(deadline=deadline):
+            await semaphore.acquire()
+            acquired.append(scope)
+        finally:
+          self._waiting[kind] -= 1
+
+        if scope not in acquired:
+          self.rejected += 1
+          raise OverloadedError(
+            f"Timed out after {self.queue_timeout}s waiting for a {scope} slot",
+            retry_after=self.retry_after(scope, kind),
+            scope=scope,
+          )
+      # The server may have started draining while this call was queued
+      self._reject_if_draining()
+    except BaseException:
+      for scope in reversed(acquired):
+        self._semaphores[scope].release()
+      raise
+
+    self.admitted += 1
+    self.in_flight += 1
+    started = time.monotonic()
+    try:
+      yield
+    finally:
+      self.in_flight -= 1
+      self._avg_duration = 0.8 * self._avg_duration + 0.2 * (time.monotonic() - started)
+      for scope in reversed(acquired):
+        self._semaphores[scope].release()
+
+  def _reject_if_draining(self) -> None:
+    if self.draining:
+      self.rejected += 1
+      # Another instance is normally taking over, so retrying soon is safe
+      raise OverloadedError("The server is shutting down", retry_after=1.0, scope="drain")
+
+
+def parse_tool_limits(values: Optional[List[str]]) -> Dict[str, int]:
+  """Parse ``NAME=LIMIT`` command-line values into a per-tool limit mapping."""
+  limits = {}
+  for value in values or []:
+    name, sep, limit = value.partition("=")
+    if not sep or not name.strip():
+      raise ValueError(f"Invalid tool limit '{value}', expected NAME=LIMIT")
+    limits[name.strip()] = int(limit)
+  return limits
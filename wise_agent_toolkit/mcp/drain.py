@@ -0,0 +1,75 @@
+"""
+Graceful shutdown of the Wise MCP server.
+
+On SIGTERM/SIGINT, or when a stdio client closes its input, the server stops
+admitting tool calls and waits up to its drain deadline for the in-flight ones
+(including writes such as ``create_transfer``) to finish and deliver their
+results before it closes.
+"""
+
+import logging
+import signal
+import time
+
+import anyio
+
+from .admission import AdmissionController
+
+logger = logging.getLogger(__name__)
+
+
+async def drain(admission: AdmissionController, timeout: float) -> bool:
+  """Stop admitting tool calls and wait for the in-flight ones to finish.
+
+  The deadline counts from the moment draining started, so calling this again
+  (e.g. from the HTTP lifespan after a signal) never extends it.
+  """
+  if not admission.draining:
+    logger.info(f"Draining {admission.in_flight} in-flight tool calls")
+  admission.start_draining()
+
+  remaining = timeout - (time.monotonic() - admission.draining_since)
+  drained = await admission.wait_idle(remaining)
+  if not drained:
+    logger.warning(f"{admission.in_flight} tool calls still running after the {timeout}s drain deadline")
+  return drained
+
+
+async def drain_on_signal(mcp_server, cancel_scope) -> None:
+  """Drain ``mcp_server`` when the process receives SIGTERM or SIGINT, then cancel ``cancel_scope``.
+
+  Cancelling the scope that runs the session lets it unwind normally, so the
+  ``finally`` blocks that close the server, its store and its ledgers run.
+  """
+  try:
+    signals = anyio.open_signal_receiver(signal.SIGTERM, signal.SIGINT)
+  except NotImplementedError:
+    # Signal receivers are not available on Windows
+    return
+
+  with signals:
+    async for signum in signals:
+      logger.info(f"Received signal {signum}")
+      await mcp_server.drain()
+      # Give the stdout writer a moment to deliver the final responses
+      await anyio.sleep(0.1)
+      cancel_scope.cancel()
+      return
+
+
+def drain_on_close(mcp_server, read_stream, task_group):
+  """Forward client messages and drain in-flight calls once the client closes its input.
+
+  ``Server.run`` cancels every running handler as soon as its input stream
+  ends, so the end of the client's stream is held back until the drain is over.
+  """
+  send_stream, receive_stream = anyio.create_memory_object_stream(0)
+
+  async def forward() -> None:
+    async with send_stream:
+      async for message in read_stream:
+        await send_stream.send(message)
+      await mcp_server.drain()
+
+  task_group.start_soon(forward)
+  return receive_stream
@@ -0,0 +1,73 @@
+"""
+Settings of the Wise MCP server.
+
+``ServerOptions`` gathers everything ``WiseMCPServer`` and ``serve`` can be
+configured with, so that a new setting is a new field here rather than one
+more keyword argument threaded through every constructor.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from ..ledger import ActivityLedger
+from ..quotes import QuoteCache
+from ..store import ObjectStore
+from ..transfer_ledger import TransferLedger
+from ..webhooks import SignatureVerifier
+from .admission import AdmissionController
+
+# Transports selectable from the command line
+TRANSPORTS = ("stdio", "sse", "streamable-http")
+
+
+@dataclass
+class ServerOptions:
+  """Settings of a Wise MCP server.
+
+  The Wise API host, the MCP server name and the default profile, then:
+
+  - ``multi_tenant``, ``max_tenants``, ``tenant_idle_timeout``: per-request
+    credentials over HTTP and the bounds of the tenant LRU.
+  - ``admission``: the concurrency budgets (a default ``AdmissionController``
+    when None).
+  - ``resource_refresh_interval``: seconds between resource snapshot refreshes.
+  - ``warm_up``, ``drain_timeout``: start-up prefetching and the shutdown drain deadline.
+  - ``store``, ``ledger``, ``transfer_ledger``, ``quote_cache``, ``export_dir``:
+    the optional local state the tools use.
+  - ``live_updates``: keep fetched transfers current from webhook events.
+  - ``description_profile``: "full", "compact" or "minimal" tool descriptions.
+  - ``transport``, ``http_host``, ``http_port``: how ``serve`` is reached.
+  - ``webhook_port``, ``webhook_host``, ``webhook_verifier``: the webhook
+    receiver ``serve`` starts (which turns ``live_updates`` on).
+  """
+
+  host: str = "https://api.sandbox.transferwise.tech"
+  server_name: str = "wise-agent-toolkit"
+  profile_id: Optional[int] = None
+  multi_tenant: bool = False
+  max_tenants: int = 256
+  tenant_idle_timeout: float = 900.0
+  admission: Optional[AdmissionController] = None
+  resource_refresh_interval: float = 300.0
+  warm_up: bool = False
+  drain_timeout: float = 30.0
+  store: Optional[ObjectStore] = None
+  ledger: Optional[ActivityLedger] = None
+  quote_cache: Optional[QuoteCache] = None
+  export_dir: Optional[str] = None
+  transfer_ledger: Optional[TransferLedger] = None
+  live_updates: bool = False
+  description_profile: Optional[str] = None
+  transport: str = "stdio"
+  http_host: str = "127.0.0.1"
+  http_port: int = 8000
+  webhook_port: Optional[int] = None
+  webhook_host: str = "127.0.0.1"
+  webhook_verifier: Optional[SignatureVerifier] = None
+
+  def validate(self) -> None:
+    """Raise ValueError if the transport settings cannot be served."""
+    if self.transport not in TRANSPORTS:
+      raise ValueError(f"Unsupported transport: {self.transport}. Choose one of: {', '.join(TRANSPORTS)}")
+    if self.multi_tenant and self.transport == "stdio":
+      raise ValueError("Multi-tenant mode requires an HTTP transport (sse or streamable-http).")
@@ -0,0 +1,167 @@
+"""
+Wise profiles and recipients published as MCP resources.
+
+Agents look up profile and recipient IDs at the start of almost every
+conversation. Publishing them as resources backed by a shared in-memory
+snapshot turns those repeated tool calls into cheap resource reads:
+
+- ``wise://profiles`` lists the profiles of the API key.
+- ``wise://profiles/{profile_id}/recipients`` lists every recipient account of a profile.
+
+Snapshots expire after ``ttl`` seconds, are refreshed in the background by the
+server and are invalidated by the write tools that change them, at which point
+subscribed sessions receive a ``notifications/resources/updated``.
+"""
+
+import json
+import re
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..api import WiseAPI
+
+PROFILES_URI = "wise://profiles"
+_RECIPIENTS_URI = re.compile(r"^wise://profiles/(\d+)/recipients$")
+
+# Write tools and the resources whose content they change
+INVALIDATED_BY = {
+  "create_recipient_account": "recipients",
+  "deactivate_recipient_account": "recipients",
+}
+
+
+def recipients_uri(profile_id: Any) -> str:
+  return f"wise://profiles/{profile_id}/recipients"
+
+
+class ResourceCache:
+  """Shared snapshots of the resources of one Wise API client.
+
+  Snapshots are stored as the serialized JSON served to clients, so a read of
+  a fresh snapshot costs nothing but a dictionary lookup. Concurrent reads of
+  a stale snapshot trigger a single fetch.
+  """
+
+  def __init__(self, wise_api: WiseAPI, ttl: float = 300.0, clock: Callable[[], float] = time.monotonic):
+    self.wise_api = wise_api
+    self.ttl = ttl
+    self._clock = clock
+    self._snapshots: Dict[str, Tuple[str, float]] = {}
+    self._fetch_locks: Dict[str, threading.Lock] = {}
+    self._lock = threading.Lock()
+    # Sessions subscribed to each URI; sessions drop out once they are closed
+    self._subscribers: Dict[str, "weakref.WeakSet"] = {}
+
+  def resources(self) -> List[Tuple[str, str, str]]:
+    """Return ``(uri, name, description)`` for every resource currently available."""
+    resources = [(PROFILES_URI, "Wise profiles", "Profiles available to the Wise API key")]
+    for profile_id in self._profile_ids():
+      resources.append((
+        recipients_uri(profile_id),
+        f"Recipients of profile {profile_id}",
+        f"Recipient accounts of Wise profile {profile_id}",
+      ))
+    return resources
+
+  def read(self, uri: str) -> str:
+    """Return the snapshot of ``uri``, fetching it if it is missing or expired."""
+    snapshot = self._fresh_snapshot(uri)
+    if snapshot is not None:
+      return snapshot
+
+    with self._fetch_lock(uri):
+      # Another thread may have fetched it while this one waited
+      snapshot = self._fresh_snapshot(uri)
+      if snapshot is not None:
+        return snapshot
+      return self._update(uri)[0]
+
+  def refresh(self, uri: str) -> bool:
+    """Fetch ``uri`` now and return whether its content changed."""
+    return self._update(uri)[1]
+
+  def cached_uris(self) -> List[str]:
+    with self._lock:
+      return list(self._snapshots)
+
+  def invalidate(self, tool_name: str) -> List[str]:
+    """Expire the snapshots changed by the write tool ``tool_name`` and return their URIs."""
+    kind = INVALIDATED_BY.get(tool_name)
+    if kind is None:
+      return []
+
+    with self._lock:
+      uris = [uri for uri in self._snapshots if self._kind(uri) == kind]
+      for uri in uris:
+        del self._snapshots[uri]
+      subscribed = [uri for uri, sessions in self._subscribers.items() if sessions and self._kind(uri) == kind]
+    return sorted(set(uris) | set(subscribed))
+
+  def subscribe(self, uri: str, session: Any) -> None:
+    self._kind(uri, strict=True)
+    with self._lock:
+      self._subscribers.setdefault(uri, weakref.WeakSet()).add(session)
+
+  def unsubscribe(self, uri: str, session: Any) -> None:
+    with self._lock:
+      sessions = self._subscribers.get(uri)
+      if sessions is not None:
+        sessions.discard(session)
+
+  def subscribers(self, uri: str) -> list:
+    with self._lock:
+      return list(self._subscribers.get(uri, ()))
+
+  def clear(self) -> None:
+    """Drop every snapshot and subscription."""
+    with self._lock:
+      self._snapshots.clear()
+      self._subscribers.clear()
+
+  def _fresh_snapshot(self, uri: str) -> Optional[str]:
+    with self._lock:
+      snapshot = self._snapshots.get(uri)
+    if snapshot is not None and self._clock() - snapshot[1] < self.ttl:
+      return snapshot[0]
+    return None
+
+  def _fetch_lock(self, uri: str) -> threading.Lock:
+    with self._lock:
+      return self._fetch_locks.setdefault(uri, threading.Lock())
+
+  def _update(self, uri: str) -> Tuple[str, bool]:
+    text = self._fetch(uri)
+    with self._lock:
+      previous = self._snapshots.get(uri)
+      self._snapshots[uri] = (text, self._clock())
+    return text, previous is None or previous[0] != text
+
+  def _fetch(self, uri: str) -> str:
+    if self._kind(uri, strict=True) == "profiles":
+      return self.wise_api.run("list_profiles")
+    profile_id = int(_RECIPIENTS_URI.match(uri).group(1))
+    return self.wise_api.run("list_recipient_accounts", profile_id=profile_id, fetch_all=True)
+
+  def _profile_ids(self) -> List[int]:
+    profile_ids = []
+    with self._lock:
+      snapshot = self._snapshots.get(PROFILES_URI)
+    if snapshot is not None:
+      profile_ids = [profile.get("id") for profile in json.loads(snapshot[0]) if profile.get("id") is not None]
+
+    context_profile_id = self.wise_api.context.get("profile_id")
+    if context_profile_id and int(context_profile_id) not in profile_ids:
+      profile_ids.insert(0, int(context_profile_id))
+    return profile_ids
+
+  @staticmethod
+  def _kind(uri: str, strict: bool = False) -> Optional[str]:
+    if uri == PROFILES_URI:
+      return "profiles"
+    if _RECIPIENTS_URI.match(uri):
+      return "recipients"
+    if strict:
+      raise ValueError(f"Unknown resource: {uri}")
+    return None
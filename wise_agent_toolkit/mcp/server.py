@@ -2,115 +2,648 @@
 MCP Server implementation for Wise Agent Toolkit.
 
 Provides a complete MCP server that exposes Wise API operations as MCP tools.
+The server can be reached over stdio (one process per client) or over HTTP
+(SSE or Streamable HTTP), where a single long-lived process serves many
+concurrent sessions from the same toolkit and connection pool. Over HTTP the
+server can also run multi-tenant, with each session supplying its own Wise
+credentials or profile.
+
+Profiles and recipient accounts are also published as subscribable MCP
+resources backed by a shared snapshot (see ``resources``).
 """
 
 import logging
 import argparse
+import dataclasses
 import os
-from typing import Optional
+import time
+from typing import Any, Dict, Optional
 from pathlib import Path
 
 # Handle imports for both module and standalone execution
 try:
-  from ..configuration import Configuration, Context, ACTIONS_ALL
+  from ..configuration import Configuration, Context, ACTIONS_ALL, capabilities, is_tool_allowed, is_tool_available, is_read_only_tool
   from ..api import WiseAPI
+  from ..ledger import ActivityLedger
+  from ..quotes import QuoteCache
+  from ..store import ObjectStore
+  from ..transfer_ledger import TransferLedger
+  from ..webhooks import InvalidEventError, SignatureVerifier, WebhookReceiver
+  from ..cancellation import CallCancelledError, CancellationToken, cancellation_scope
+  from ..progress import progress_scope
+  from ..retrieval import DEFAULT_TOP_K, ToolIndex
+  from ..prompts import DESCRIPTION_PROFILES
+  from ..tools import tool_description, tools
   from .toolkit import WiseAgentToolkit
-  from .tool import _fix_mcp_schema
+  from .tenants import TenantRegistry, credentials_from_headers
+  from .admission import AdmissionController, OverloadedError, parse_tool_limits
+  from .resources import PROFILES_URI, ResourceCache, recipients_uri
+  from .options import TRANSPORTS, ServerOptions
+  from .drain import drain
+  from .transports import http_app, run_http, run_stdio
 except ImportError:
   # If relative imports fail, try absolute imports
   import sys
 
   sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
-  from wise_agent_toolkit.configuration import Configuration, Context
+  from wise_agent_toolkit.configuration import Configuration, Context, ACTIONS_ALL, capabilities, is_tool_allowed, is_tool_available, is_read_only_tool
   from wise_agent_toolkit.api import WiseAPI
+  from wise_agent_toolkit.ledger import ActivityLedger
+  from wise_agent_toolkit.quotes import QuoteCache
+  from wise_agent_toolkit.store import ObjectStore
+  from wise_agent_toolkit.transfer_ledger import TransferLedger
+  from wise_agent_toolkit.webhooks import InvalidEventError, SignatureVerifier, WebhookReceiver
+  from wise_agent_toolkit.cancellation import CallCancelledError, CancellationToken, cancellation_scope
+  from wise_agent_toolkit.progress import progress_scope
+  from wise_agent_toolkit.retrieval import DEFAULT_TOP_K, ToolIndex
+  from wise_agent_toolkit.prompts import DESCRIPTION_PROFILES
+  from wise_agent_toolkit.tools import tool_description, tools
   from wise_agent_toolkit.mcp.toolkit import WiseAgentToolkit
-  from wise_agent_toolkit.mcp.tool import _fix_mcp_schema
+  from wise_agent_toolkit.mcp.tenants import TenantRegistry, credentials_from_headers
+  from wise_agent_toolkit.mcp.admission import AdmissionController, OverloadedError, parse_tool_limits
+  from wise_agent_toolkit.mcp.resources import PROFILES_URI, ResourceCache, recipients_uri
+  from wise_agent_toolkit.mcp.options import TRANSPORTS, ServerOptions
+  from wise_agent_toolkit.mcp.drain import drain
+  from wise_agent_toolkit.mcp.transports import http_app, run_http, run_stdio
 
 # Check for MCP availability
 try:
+  import anyio
+  from mcp import types
   from mcp.server import Server
-  from mcp.server.stdio import stdio_server
-  from mcp.types import TextContent, Tool
+  from mcp.server.lowlevel.helper_types import ReadResourceContents
+  from mcp.types import Resource, TextContent, Tool
 
   _MCP_AVAILABLE = True
 except ImportError:
   _MCP_AVAILABLE = False
   Server = None
 
+if _MCP_AVAILABLE:
+  class _SubscribableServer(Server):
+    """Low-level server that advertises resource subscriptions once a handler is registered."""
 
-async def serve(
-  api_key: str,
-  host: str = "https://api.sandbox.transferwise.tech",
-  server_name: str = "wise-agent-toolkit",
-  profile_id: Optional[int] = None
-) -> None:
-  """Serve the MCP server."""
-  logger = logging.getLogger(__name__)
+    def get_capabilities(self, notification_options, experimental_capabilities):
+      capabilities = super().get_capabilities(notification_options, experimental_capabilities)
+      if capabilities.resources is not None and types.SubscribeRequest in self.request_handlers:
+        capabilities.resources.subscribe = True
+      return capabilities
 
-  if not _MCP_AVAILABLE:
-    logger.error("MCP is not available. Install it with: pip install wise-agent-toolkit[mcp]")
-    return
+# Keys of a tools/list request's _meta selecting the tools relevant to a
+# message; an extension of this server that other MCP clients simply omit
+TOOL_QUERY_META = "wise/toolQuery"
+TOP_K_META = "wise/topK"
 
-  # Initialize the API client and toolkit locally
-  context = Context(profile_id=profile_id)
-  toolkit = WiseAgentToolkit(
-    api_key=api_key,
-    host=host,
-    configuration={"actions": ACTIONS_ALL, "context": context}
-  )
-
-  # Create a dictionary mapping tool names to tool instances
-  tool_name_and_tool = {tool.name: tool for tool in toolkit.get_tools()}
-
-  server = Server(server_name)
-
-  @server.list_tools()
-  async def list_tools() -> list[Tool]:
-    """List all available Wise API tools."""
-    tools = []
-    for tool in tool_name_and_tool.values():
-      # Convert WiseTool to MCP Tool format with schema fix
-      input_schema = {}
-      if tool.args_schema:
-        original_schema = tool.args_schema.model_json_schema()
-        input_schema = _fix_mcp_schema(original_schema)
-
-      tools.append(Tool(
-        name=tool.name,
-        description=tool.description,
-        inputSchema=input_schema
-      ))
-
-    return tools
-
-  @server.call_tool()
-  async def call_tool(name: str, arguments: dict) -> list[TextContent]:
-    """Execute a Wise API tool."""
-    try:
-      # Look up the tool in our dictionary
-      if name not in tool_name_and_tool:
+
+class WiseMCPServer:
+  """MCP server exposing the Wise Agent Toolkit tools.
+
+  A single instance owns one toolkit (and therefore one pooled Wise API client)
+  and can serve any number of MCP sessions concurrently when run over HTTP.
+
+  In multi-tenant mode the credentials come from each HTTP request instead:
+  an ``Authorization: Bearer <api key>`` header and/or an ``X-Wise-Profile-Id``
+  header, falling back to ``api_key`` and ``profile_id``. Per-tenant toolkits
+  live in a bounded LRU and share one pooled transport per Wise host.
+
+  When a client cancels a request, read tools abort their in-flight HTTP call;
+  the worker thread keeps its slot until the aborted call returns, which the
+  bounded request timeout guarantees. Write tools are never interrupted
+  mid-request: they run to completion, but no follow-up work is done for them.
+
+  Tools that walk many pages (e.g. ``fetch_all`` listings) report their progress
+  as MCP progress notifications when the client sends a progress token.
+
+  Every call passes through an ``AdmissionController``: when the per-tool,
+  read/write or global budgets are exhausted the call is rejected quickly with
+  a structured "overloaded, retry after X" error.
+
+  Profiles and recipient accounts are served as resources from snapshots that
+  are refreshed every ``resource_refresh_interval`` seconds and invalidated by
+  the write tools that change them; subscribed sessions are notified.
+
+  With ``warm_up`` enabled, the server builds its tool schemas, opens a pooled
+  connection to the Wise host and prefetches the profiles and the context
+  profile's recipients while the first MCP session initializes, so the first
+  tool call does not pay for them.
+
+  On SIGTERM/SIGINT, or when a stdio client closes its input, the server
+  drains: it rejects new calls, waits up to ``drain_timeout`` seconds for
+  in-flight calls (including writes such as ``create_transfer``) to finish and
+  deliver their results, then flushes its logs and closes the connection pools.
+
+  With a ``store``, terminal transfers, expired quotes and account requirements
+  are kept on disk and served without network calls, across restarts and
+  across worker processes sharing the same database file.
+
+  With a ``ledger``, the ``query_activity_ledger`` tool answers activity
+  questions from a local index that is synced incrementally from Wise. With a
+  ``transfer_ledger``, the ``sync_transfers`` tool reports the transfers that
+  are new or changed since its previous call. Neither tool is listed without
+  its ledger.
+
+  With a ``quote_cache``, ``create_quote`` calls repeating the parameters of a
+  quote that is still valid return that quote instead of creating a new one.
+
+  With an ``export_dir``, the ``export_records`` tool writes its files there,
+  in a subdirectory per API key in multi-tenant mode.
+
+  With ``live_updates``, the clients keep the transfers they fetch current
+  from the Wise webhook events passed to ``handle_webhook_event``, and answer
+  reads and status waits from them.
+
+  ``description_profile`` ("full", "compact" or "minimal") sets how much of
+  each tool prompt is listed; the compact and minimal profiles leave the
+  arguments to the input schemas.
+
+  A ``tools/list`` request can carry the user's message in its ``_meta``
+  under ``wise/toolQuery`` (and a count under ``wise/topK``): the server then
+  lists only the tools most relevant to it, ranked by a local ``ToolIndex``,
+  or every tool when nothing in the message matches.
+
+  The settings are given as ``ServerOptions``; keyword arguments override
+  single fields, e.g. ``WiseMCPServer(api_key, profile_id=1, warm_up=True)``.
+  """
+
+  def __init__(self, api_key: Optional[str], options: Optional[ServerOptions] = None, **settings):
+    if not _MCP_AVAILABLE:
+      raise ImportError(
+        "MCP is required for this functionality. "
+        "Install it with: pip install wise-agent-toolkit[mcp]"
+      )
+    options = dataclasses.replace(options or ServerOptions(), **settings)
+    if not api_key and not options.multi_tenant:
+      raise ValueError("An API key is required unless the server runs in multi-tenant mode.")
+
+    self.options = options
+    self.logger = logging.getLogger(__name__)
+    self.host = options.host
+    self.api_key = api_key
+    self.profile_id = options.profile_id
+    self.configuration: Configuration = {
+      "actions": ACTIONS_ALL,
+      "context": Context(profile_id=options.profile_id),
+      "description_profile": options.description_profile,
+    }
+
+    self.toolkit = None
+    self.tool_name_and_tool: Dict[str, Any] = {}
+    self.tenants: Optional[TenantRegistry] = None
+    self.resources: Optional[ResourceCache] = None
+    self.resource_refresh_interval = options.resource_refresh_interval
+    self.warm_up_enabled = options.warm_up
+    self.drain_timeout = options.drain_timeout
+    self._closed = False
+    self.store = options.store
+    self.ledger = options.ledger
+    self.transfer_ledger = options.transfer_ledger
+
+    if options.multi_tenant:
+      self.tenants = TenantRegistry(
+        host=options.host,
+        max_tenants=options.max_tenants,
+        idle_timeout=options.tenant_idle_timeout,
+        resource_ttl=options.resource_refresh_interval,
+        store=options.store,
+        ledger=options.ledger,
+        quote_cache=options.quote_cache,
+        export_dir=options.export_dir,
+        transfer_ledger=options.transfer_ledger,
+        live_updates=options.live_updates,
+      )
+    else:
+      # Initialize the API client and toolkit once; all sessions share them
+      self.toolkit = WiseAgentToolkit(
+        api_key=api_key,
+        host=options.host,
+        configuration=self.configuration,
+        wise_api=WiseAPI(
+          api_key=api_key,
+          host=options.host,
+          context=self.configuration["context"],
+          store=options.store,
+          ledger=options.ledger,
+          quote_cache=options.quote_cache,
+          export_dir=options.export_dir,
+          transfer_ledger=options.transfer_ledger,
+          live_updates=options.live_updates,
+        ),
+      )
+
+      # Create a dictionary mapping tool names to tool instances
+      self.tool_name_and_tool = {tool.name: tool for tool in self.toolkit.get_tools()}
+      self.resources = ResourceCache(self.toolkit.wise_api, ttl=options.resource_refresh_interval)
+
+    self.capabilities = capabilities(
+      ledger=options.ledger, transfer_ledger=options.transfer_ledger, export_dir=options.export_dir
+    )
+    self._mcp_tools: Optional[list] = None
+    self._tool_index: Optional[ToolIndex] = None
+    self.write_methods = {tool["method"] for tool in tools if not is_read_only_tool(tool)}
+    self.admission = options.admission if options.admission is not None else AdmissionController()
+
+    self.server = _SubscribableServer(options.server_name)
+    self._register_handlers()
+
+  def is_tool_offered(self, tool_config: Dict[str, Any]) -> bool:
+    """Return True if the tool is permitted and the optional feature it depends on is configured."""
+    return is_tool_allowed(tool_config, self.configuration) and is_tool_available(tool_config, self.capabilities)
+
+  def mcp_tools(self, query: Optional[str] = None, k: int = DEFAULT_TOP_K) -> list:
+    """Return the MCP tool definitions, building the schemas only once.
+
+    With a ``query``, only the ``k`` tools most relevant to it are returned.
+    """
+    if self._mcp_tools is None:
+      mcp_tools = []
+      for tool_config in tools:
+        if not self.is_tool_offered(tool_config):
+          continue
+
+        # Convert the tool definition to MCP Tool format
+        input_schema = {}
+        if tool_config.get("args_schema"):
+          input_schema = tool_config["args_schema"].model_json_schema()
+
+        mcp_tools.append(Tool(
+          name=tool_config["method"],
+          description=tool_description(tool_config, self.configuration["description_profile"]),
+          inputSchema=input_schema
+        ))
+      self._mcp_tools = mcp_tools
+    if not query:
+      return self._mcp_tools
+
+    if self._tool_index is None:
+      self._tool_index = ToolIndex(tool for tool in tools if self.is_tool_offered(tool))
+    selected = {tool["method"] for tool in self._tool_index.select(query, k)}
+    return [tool for tool in self._mcp_tools if tool.name in selected]
+
+  def tools_for_request(self) -> Dict[str, Any]:
+    """Return the tools of the tenant the current MCP request belongs to."""
+    if self.tenants is None:
+      return self.tool_name_and_tool
+    return self._tenant_for_request().tool_name_and_tool
+
+  def resources_for_request(self) -> ResourceCache:
+    """Return the resource cache of the tenant the current MCP request belongs to."""
+    if self.tenants is None:
+      return self.resources
+    return self._tenant_for_request().resources
+
+  def resource_caches(self) -> list:
+    """Return every live resource cache."""
+    if self.tenants is None:
+      return [self.resources]
+    return self.tenants.resource_caches()
+
+  def handle_webhook_event(self, event: Dict[str, Any]) -> list:
+    """Apply a Wise webhook event to every client.
+
+    In multi-tenant mode every live tenant receives the event; each one only
+    updates the transfers it has fetched itself. A tenant that fails does not
+    keep the event from the others; the first failure is raised once all of
+    them had it, so the receiver asks Wise to deliver the event again.
+    """
+    wise_apis = self.tenants.wise_apis() if self.tenants is not None else [self.toolkit.wise_api]
+    results, error = [], None
+    for wise_api in wise_apis:
+      try:
+        results.append(wise_api.handle_webhook_event(event))
+      except InvalidEventError:
+        # Every tenant would reject it the same way
+        raise
+      except Exception as e:
+        self.logger.warning(f"A tenant failed to handle a {event.get('event_type')} webhook event: {e}")
+        error = error or e
+    if error is not None:
+      raise error
+    return results
+
+  def _tenant_for_request(self):
+    request = self.server.request_context.request
+    headers = getattr(request, "headers", None)
+    api_key, profile_id = credentials_from_headers(headers, self.api_key, self.profile_id)
+    if not api_key:
+      raise ValueError("No Wise API key supplied. Send an 'Authorization: Bearer <api key>' header.")
+    return self.tenants.get(api_key, profile_id)
+
+  def _register_handlers(self) -> None:
+    """Register the MCP request handlers on the low-level server."""
+    server = self.server
+    logger = self.logger
+
+    @server.list_tools()
+    async def list_tools() -> list[Tool]:
+      """List the Wise API tools, only the relevant ones when the request carries a query."""
+      # Read from the request context rather than a request argument, which
+      # older MCP versions do not pass. Refills of the library's tool cache run
+      # outside a tools/list request and get every tool.
+      try:
+        meta = server.request_context.meta
+      except LookupError:
+        meta = None
+      extra = (meta.model_extra or {}) if meta is not None else {}
+      query = extra.get(TOOL_QUERY_META)
+      if not isinstance(query, str):
+        query = None
+      try:
+        k = max(1, int(extra.get(TOP_K_META, DEFAULT_TOP_K)))
+      except (TypeError, ValueError):
+        k = DEFAULT_TOP_K
+      return self.mcp_tools(query, k)
+
+    # Arguments are validated and coerced by each tool's compiled validator
+    # rather than by the stricter JSON schema check of the MCP library
+    @server.call_tool(validate_input=False)
+    async def call_tool(name: str, arguments: dict) -> list[TextContent]:
+      """Execute a Wise API tool."""
+      try:
+        # Look up the tool in the current tenant's dictionary
+        tool_name_and_tool = self.tools_for_request()
+        if name not in tool_name_and_tool:
+          return [TextContent(
+            type="text",
+            text=f"Tool '{name}' not found"
+          )]
+
+        tool = tool_name_and_tool[name]
+        write = name in self.write_methods
+        async with self.admission.admit(name, write=write):
+          if write:
+            result = await self._run_write(tool, arguments)
+            await self._notify_updated(self.resources_for_request(), name)
+          else:
+            result = await self._run_read(tool, arguments)
+        return [TextContent(
+          type="text",
+          text=result
+        )]
+      except OverloadedError as e:
+        logger.warning(f"Rejected tool {name}: {e.message} (retry after {e.retry_after}s)")
+        # Raised so that the client receives it as an error result
+        raise
+      except Exception as e:
+        logger.error(f"Error executing tool {name}: {str(e)}")
         return [TextContent(
           type="text",
-          text=f"Tool '{name}' not found"
+          text=f"Error executing {name}: {str(e)}"
         )]
 
-      tool = tool_name_and_tool[name]
-      result = tool.execute(arguments)
-      return [TextContent(
-        type="text",
-        text=result
-      )]
+    @server.list_resources()
+    async def list_resources() -> list[Resource]:
+      """List the cached Wise resources."""
+      return [
+        Resource(uri=uri, name=name, description=description, mimeType="application/json")
+        for uri, name, description in self.resources_for_request().resources()
+      ]
+
+    @server.read_resource()
+    async def read_resource(uri) -> list[ReadResourceContents]:
+      """Read a Wise resource from its snapshot, fetching it if it has expired."""
+      cache = self.resources_for_request()
+      async with self.admission.admit("read_resource", write=False):
+        text = await anyio.to_thread.run_sync(cache.read, str(uri), limiter=self.admission.thread_limiter)
+      return [ReadResourceContents(content=text, mime_type="application/json")]
+
+    @server.subscribe_resource()
+    async def subscribe_resource(uri) -> None:
+      self.resources_for_request().subscribe(str(uri), self.server.request_context.session)
+
+    @server.unsubscribe_resource()
+    async def unsubscribe_resource(uri) -> None:
+      self.resources_for_request().unsubscribe(str(uri), self.server.request_context.session)
+
+  async def _notify_updated(self, cache: ResourceCache, tool_name: str) -> None:
+    """Expire the resources changed by a write tool and notify their subscribers."""
+    for uri in cache.invalidate(tool_name):
+      await self._send_resource_updated(cache, uri)
+
+  async def _send_resource_updated(self, cache: ResourceCache, uri: str) -> None:
+    for session in cache.subscribers(uri):
+      try:
+        await session.send_resource_updated(uri)
+      except Exception as e:
+        # The session has gone away; stop notifying it
+        self.logger.debug(f"Could not notify a subscriber of {uri}: {e}")
+        cache.unsubscribe(uri, session)
+
+  async def refresh_resources(self) -> None:
+    """Refresh every cached resource snapshot and notify subscribers of changes."""
+    for cache in self.resource_caches():
+      for uri in cache.cached_uris():
+        try:
+          changed = await anyio.to_thread.run_sync(cache.refresh, uri, limiter=self.admission.thread_limiter)
+        except Exception as e:
+          self.logger.warning(f"Could not refresh resource {uri}: {e}")
+          continue
+        if changed:
+          await self._send_resource_updated(cache, uri)
+
+  async def _refresh_resources_forever(self) -> None:
+    while True:
+      await anyio.sleep(self.resource_refresh_interval)
+      await self.refresh_resources()
+
+  def start_background_tasks(self, task_group) -> None:
+    """Start the resource refresher (and the warm-up, if enabled) in ``task_group``."""
+    task_group.start_soon(self._refresh_resources_forever)
+    if self.warm_up_enabled:
+      task_group.start_soon(self.warm_up)
+
+  async def warm_up(self) -> None:
+    """Prepare the client and the hot data before the first tool call needs them.
+
+    Every step is best effort: a failure is logged and the server keeps serving.
+    """
+    started = time.monotonic()
+    self.mcp_tools()
+
+    async with anyio.create_task_group() as task_group:
+      if self.resources is None:
+        # Multi-tenant: no credentials yet, but the shared connection pool can be primed
+        task_group.start_soon(self._warm_up_step, "connect", self._open_connection)
+      else:
+        # The prefetches run concurrently, each priming a pooled connection
+        task_group.start_soon(self._warm_up_step, "profiles", self.resources.read, PROFILES_URI)
+        if self.profile_id:
+          task_group.start_soon(self._warm_up_step, "recipients", self.resources.read, recipients_uri(self.profile_id))
+
+    self.logger.info(f"Warm-up finished in {time.monotonic() - started:.2f}s")
+
+  async def _warm_up_step(self, name: str, func, *args) -> None:
+    try:
+      await anyio.to_thread.run_sync(func, *args, limiter=self.admission.thread_limiter)
     except Exception as e:
-      logger.error(f"Error executing tool {name}: {str(e)}")
-      return [TextContent(
-        type="text",
-        text=f"Error executing {name}: {str(e)}"
-      )]
+      self.logger.warning(f"Warm-up step {name} failed: {e}")
+
+  def _open_connection(self) -> None:
+    # Any response will do; it leaves a TLS connection to the host in the pool
+    self.tenants.transport().pool_manager.request("HEAD", self.host, retries=False, timeout=10.0)
+
+  async def drain(self) -> bool:
+    """Stop admitting tool calls and wait up to ``drain_timeout`` for the in-flight ones."""
+    return await drain(self.admission, self.drain_timeout)
+
+  def close(self) -> None:
+    """Flush the final statistics and logs and close the Wise API connection pools."""
+    if self._closed:
+      return
+    self._closed = True
+
+    self.logger.info(f"Shutting down; admission stats: {self.admission.stats()}")
+    if self.tenants is not None:
+      self.tenants.close()
+    else:
+      self.toolkit.wise_api.close()
+    if self.store is not None:
+      self.store.close()
+    if self.ledger is not None:
+      self.ledger.close()
+    if self.transfer_ledger is not None:
+      self.transfer_ledger.close()
+
+    for handler in logging.getLogger().handlers:
+      handler.flush()
+
+  async def _run_read(self, tool, arguments: dict) -> str:
+    """Run a read tool in a worker thread, aborting its HTTP call on cancellation.
+
+    The worker keeps its thread-limiter slot until it has returned: the
+    cancellation token (and the bounded timeout it puts on every request) ends
+    the call, rather than the thread being abandoned while it is still blocked
+    on a socket and the server going over its own concurrency budget.
+    """
+    token = CancellationToken()
+    send_progress = self._progress_sender()
+
+    def run() -> str:
+      with cancellation_scope(token), progress_scope(send_progress):
+        return tool.execute(arguments)
+
+    async def cancel_token_when_cancelled() -> None:
+      try:
+        await anyio.sleep_forever()
+      finally:
+        token.cancel()
+
+    # Wise API calls are blocking; run them in a worker thread so that one
+    # slow call does not stall every other session on the event loop.
+    result, error = None, None
+    try:
+      async with anyio.create_task_group() as task_group:
+        task_group.start_soon(cancel_token_when_cancelled)
+        with anyio.CancelScope(shield=True):
+          try:
+            result = await anyio.to_thread.run_sync(run, limiter=self.admission.thread_limiter)
+          except Exception as e:
+            error = e
+        task_group.cancel_scope.cancel()
+      if isinstance(error, CallCancelledError):
+        # Aborted by the token: deliver the request's own cancellation instead
+        await anyio.lowlevel.checkpoint()
+    except anyio.get_cancelled_exc_class():
+      self.logger.info(f"Cancelled read tool {tool.name}")
+      raise
+
+    if error is not None:
+      raise error
+    return result
+
+  def _progress_sender(self):
+    """Return a progress callback for the threads serving the current request.
+
+    It may be called from any thread, including the ones a fan-out over
+    several profiles starts, so it carries the event loop token rather than
+    relying on running in an AnyIO worker thread.
+    """
+    request_context = self.server.request_context
+    progress_token = request_context.meta.progressToken if request_context.meta else None
+    if progress_token is None:
+      return lambda progress, total, message: None
+
+    session = request_context.session
+    request_id = str(request_context.request_id)
+    event_loop = anyio.lowlevel.current_token()
+
+    def send_progress(progress: float, total: Optional[float], message: Optional[str]) -> None:
+      try:
+        anyio.from_thread.run(
+          lambda: session.send_progress_notification(
+            progress_token, progress, total=total, message=message, related_request_id=request_id
+          ),
+          token=event_loop,
+        )
+      except Exception as e:
+        # Progress is best effort; never fail the tool call because of it
+        self.logger.debug(f"Could not send progress notification: {e}")
+
+    return send_progress
+
+  async def _run_write(self, tool, arguments: dict) -> str:
+    """Run a write tool to completion even if the client cancels the request."""
+    # A write that has been sent must not be abandoned half-way: the client could
+    # not tell whether it happened and might issue it twice.
+    with anyio.CancelScope(shield=True):
+      result = await anyio.to_thread.run_sync(tool.execute, arguments, limiter=self.admission.thread_limiter)
+
+    # Skip any follow-up work if the request was cancelled in the meantime
+    await anyio.lowlevel.checkpoint()
+    return result
+
+  async def run_stdio(self) -> None:
+    """Serve a single MCP session over stdin/stdout."""
+    await run_stdio(self)
+
+  def http_app(self, transport: str = "streamable-http"):
+    """Build the Starlette application serving MCP sessions over HTTP (see ``transports.http_app``)."""
+    return http_app(self, transport)
+
+  async def run_http(self, transport: str = "streamable-http", host: str = "127.0.0.1", port: int = 8000) -> None:
+    """Serve MCP sessions over HTTP until the process is stopped."""
+    await run_http(self, transport=transport, host=host, port=port)
+
+
+async def serve(api_key: Optional[str], options: Optional[ServerOptions] = None, **settings) -> None:
+  """Serve the MCP server.
+
+  ``options`` (and keyword arguments overriding its fields) select the
+  transport, the optional webhook receiver and the ``WiseMCPServer`` settings.
+
+  As an opt-in extension, a ``tools/list`` request whose ``_meta`` carries the
+  user's message under ``wise/toolQuery`` (and optionally a count under
+  ``wise/topK``, default 5) gets only the most relevant tools. Requests
+  without these keys, i.e. those of any standard MCP client, get every tool.
+  """
+  logger = logging.getLogger(__name__)
+
+  if not _MCP_AVAILABLE:
+    logger.error("MCP is not available. Install it with: pip install wise-agent-toolkit[mcp]")
+    return
+
+  options = dataclasses.replace(options or ServerOptions(), **settings)
+  options.validate()
+  if options.webhook_port is not None:
+    options = dataclasses.replace(options, live_updates=True)
+
+  mcp_server = WiseMCPServer(api_key, options)
+
+  webhooks = None
+  if options.webhook_port is not None:
+    webhooks = WebhookReceiver(
+      mcp_server.handle_webhook_event, options.webhook_verifier, host=options.webhook_host, port=options.webhook_port
+    )
+    webhooks.start()
 
   # Run the server
-  options = server.create_initialization_options()
-  async with stdio_server() as (read_stream, write_stream):
-    await server.run(read_stream, write_stream, options, raise_exceptions=True)
+  try:
+    if options.transport == "stdio":
+      await mcp_server.run_stdio()
+    else:
+      await mcp_server.run_http(transport=options.transport, host=options.http_host, port=options.http_port)
+  finally:
+    if webhooks is not None:
+      webhooks.close()
 
 
 def main():
@@ -145,20 +678,189 @@ def main():
     default=None,
     help="Wise profile ID"
   )
+  parser.add_argument(
+    "--transport",
+    choices=TRANSPORTS,
+    default=os.getenv("WISE_MCP_TRANSPORT", "stdio"),
+    help="MCP transport (default: stdio)"
+  )
+  parser.add_argument(
+    "--http_host",
+    default="127.0.0.1",
+    help="Interface to bind when using an HTTP transport (default: 127.0.0.1)"
+  )
+  parser.add_argument(
+    "--port",
+    type=int,
+    default=8000,
+    help="Port to listen on when using an HTTP transport (default: 8000)"
+  )
+  parser.add_argument(
+    "--multi_tenant",
+    action="store_true",
+    help="Let each HTTP session supply its own API key (Authorization: Bearer) and profile (X-Wise-Profile-Id)"
+  )
+  parser.add_argument(
+    "--max_tenants",
+    type=int,
+    default=256,
+    help="Maximum number of tenant clients kept in memory in multi-tenant mode (default: 256)"
+  )
+  parser.add_argument(
+    "--tenant_idle_timeout",
+    type=float,
+    default=900.0,
+    help="Seconds after which an idle tenant client is evicted in multi-tenant mode (default: 900)"
+  )
+
+  parser.add_argument(
+    "--max_in_flight",
+    type=int,
+    default=64,
+    help="Maximum number of tool calls running at once (default: 64)"
+  )
+  parser.add_argument(
+    "--max_reads",
+    type=int,
+    default=48,
+    help="Maximum number of read tool calls running at once (default: 48)"
+  )
+  parser.add_argument(
+    "--max_writes",
+    type=int,
+    default=16,
+    help="Maximum number of write tool calls running at once (default: 16)"
+  )
+  parser.add_argument(
+    "--tool_limit",
+    action="append",
+    metavar="NAME=LIMIT",
+    help="Maximum number of concurrent calls of one tool; may be repeated"
+  )
+  parser.add_argument(
+    "--max_queue",
+    type=int,
+    default=128,
+    help="Maximum number of calls of each kind waiting for a slot (default: 128)"
+  )
+  parser.add_argument(
+    "--queue_timeout",
+    type=float,
+    default=5.0,
+    help="Seconds a call may wait for a slot before it is rejected (default: 5)"
+  )
+  parser.add_argument(
+    "--resource_refresh_interval",
+    type=float,
+    default=300.0,
+    help="Seconds between background refreshes of the profile and recipient resources (default: 300)"
+  )
+  parser.add_argument(
+    "--warm_up",
+    action="store_true",
+    default=os.getenv("WISE_MCP_WARM_UP", "").lower() in ("1", "true", "yes"),
+    help="Open connections and prefetch profiles and recipients while the MCP session initializes"
+  )
+  parser.add_argument(
+    "--drain_timeout",
+    type=float,
+    default=30.0,
+    help="Seconds to wait for in-flight tool calls when shutting down (default: 30)"
+  )
+  parser.add_argument(
+    "--store_path",
+    default=os.getenv("WISE_STORE_PATH"),
+    help="SQLite file keeping immutable objects (terminal transfers, expired quotes) and the activity and transfer "
+         "ledgers across restarts"
+  )
+  parser.add_argument(
+    "--store_max_mb",
+    type=float,
+    default=64.0,
+    help="Size in MB above which the least recently used stored objects are evicted (default: 64)"
+  )
+
+  parser.add_argument(
+    "--reuse_quotes",
+    action="store_true",
+    default=os.getenv("WISE_REUSE_QUOTES", "").lower() in ("1", "true", "yes"),
+    help="Return the existing quote when create_quote is called again with identical parameters while it is valid"
+  )
+  parser.add_argument(
+    "--quote_reuse_margin",
+    type=float,
+    default=60.0,
+    help="Seconds of validity a quote must have left to be reused (default: 60)"
+  )
+  parser.add_argument(
+    "--webhook_port",
+    type=int,
+    default=int(os.getenv("WISE_WEBHOOK_PORT")) if os.getenv("WISE_WEBHOOK_PORT") else None,
+    help="Port to receive Wise webhook events on (transfer state changes, balance updates); disabled by default"
+  )
+  parser.add_argument(
+    "--webhook_host",
+    default="127.0.0.1",
+    help="Interface to bind the webhook receiver to (default: 127.0.0.1)"
+  )
+  parser.add_argument(
+    "--webhook_public_key",
+    default=os.getenv("WISE_WEBHOOK_PUBLIC_KEY"),
+    help="PEM file with the Wise public key that webhook event signatures are checked against"
+  )
+  parser.add_argument(
+    "--description_profile",
+    choices=DESCRIPTION_PROFILES,
+    default=os.getenv("WISE_DESCRIPTION_PROFILE", "full"),
+    help="How much of each tool prompt to list: full, compact (arguments left to the input schemas) or minimal"
+  )
+  parser.add_argument(
+    "--export_dir",
+    default=os.getenv("WISE_EXPORT_DIR"),
+    help="Directory the export_records tool writes files to; the tool is only offered when this is set"
+  )
 
   args = parser.parse_args()
 
-  if not args.api_key:
+  if not args.api_key and not args.multi_tenant:
     logger.error("API key is required. Provide it via --api-key or WISE_API_KEY environment variable.")
     return
+  if args.webhook_port is not None and not args.webhook_public_key:
+    logger.error("Receiving webhooks requires the Wise public key. Provide it via --webhook_public_key.")
+    return
 
   import asyncio
-  asyncio.run(serve(
-    api_key=args.api_key,
+  asyncio.run(serve(args.api_key, ServerOptions(
     host=args.host,
     server_name=args.server_name,
     profile_id=args.profile_id,
-  ))
+    transport=args.transport,
+    http_host=args.http_host,
+    http_port=args.port,
+    multi_tenant=args.multi_tenant,
+    max_tenants=args.max_tenants,
+    tenant_idle_timeout=args.tenant_idle_timeout,
+    admission=AdmissionController(
+      max_in_flight=args.max_in_flight,
+      max_reads=args.max_reads,
+      max_writes=args.max_writes,
+      tool_limits=parse_tool_limits(args.tool_limit),
+      max_queue=args.max_queue,
+      queue_timeout=args.queue_timeout,
+    ),
+    resource_refresh_interval=args.resource_refresh_interval,
+    warm_up=args.warm_up,
+    drain_timeout=args.drain_timeout,
+    store=ObjectStore(args.store_path, max_bytes=int(args.store_max_mb * 1024 * 1024)) if args.store_path else None,
+    ledger=ActivityLedger(args.store_path) if args.store_path else None,
+    transfer_ledger=TransferLedger(args.store_path) if args.store_path else None,
+    quote_cache=QuoteCache(margin=args.quote_reuse_margin) if args.reuse_quotes else None,
+    export_dir=args.export_dir,
+    webhook_port=args.webhook_port,
+    webhook_host=args.webhook_host,
+    webhook_verifier=SignatureVerifier.from_file(args.webhook_public_key) if args.webhook_port is not None else None,
+    description_profile=args.description_profile,
+  )))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,218 @@
+"""
+Multi-tenant support for the Wise MCP server.
+
+Each MCP session may bring its own Wise API key and/or profile ID. Tenants are
+kept in a bounded LRU with idle-timeout eviction, and tenants talking to the
+same Wise host share one pooled HTTP transport. An evicted tenant is closed:
+its worker threads, transfer pollers and resource snapshots go with it, while
+the shared transport stays open.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import wise_api_client
+from wise_api_client.rest import RESTClientObject
+
+from ..api import WiseAPI
+from ..cancellation import CancellableRESTClient
+from ..configuration import ACTIONS_ALL, Context
+from ..ledger import ActivityLedger
+from ..quotes import QuoteCache
+from ..store import ObjectStore
+from ..transfer_ledger import TransferLedger
+from .resources import ResourceCache
+from .toolkit import WiseAgentToolkit
+
+# HTTP headers a session uses to select its tenant
+API_KEY_HEADER = "authorization"
+PROFILE_ID_HEADER = "x-wise-profile-id"
+
+
+class Tenant:
+  """Per-tenant toolkit state held by the registry."""
+
+  def __init__(self, key: Tuple[str, Optional[int]], toolkit: WiseAgentToolkit, resource_ttl: float = 300.0):
+    self.key = key
+    self.toolkit = toolkit
+    self.wise_api = toolkit.wise_api
+    self.resources = ResourceCache(self.wise_api, ttl=resource_ttl)
+    self.tool_name_and_tool = {tool.name: tool for tool in toolkit.get_tools()}
+    self.last_used = time.monotonic()
+
+  def close(self) -> None:
+    """Stop the tenant's workers and pollers and drop its resource snapshots, leaving the shared transport open."""
+    self.wise_api.close(close_transport=False)
+    self.resources.clear()
+
+
+class TenantRegistry:
+  """Bounded LRU of tenants with idle-timeout eviction.
+
+  Tenants are keyed by a hash of their API key and their profile ID, so raw
+  credentials are never used as dictionary keys.
+  """
+
+  def __init__(
+    self,
+    host: str,
+    max_tenants: int = 256,
+    idle_timeout: float = 900.0,
+    clock: Callable[[], float] = time.monotonic,
+    resource_ttl: float = 300.0,
+    store: Optional[ObjectStore] = None,
+    ledger: Optional[ActivityLedger] = None,
+    quote_cache: Optional[QuoteCache] = None,
+    export_dir: Optional[str] = None,
+    transfer_ledger: Optional[TransferLedger] = None,
+    live_updates: bool = False,
+  ):
+    if max_tenants < 1:
+      raise ValueError("max_tenants must be at least 1")
+
+    self.host = host
+    self.max_tenants = max_tenants
+    self.idle_timeout = idle_timeout
+    self.resource_ttl = resource_ttl
+    self.store = store
+    self.ledger = ledger
+    self.transfer_ledger = transfer_ledger
+    self.live_updates = live_updates
+    self.quote_cache = quote_cache
+    self.export_dir = export_dir
+    self._clock = clock
+    self._tenants: "OrderedDict[Tuple[str, Optional[int]], Tenant]" = OrderedDict()
+    self._transports: Dict[str, RESTClientObject] = {}
+    self._lock = threading.Lock()
+
+  def __len__(self) -> int:
+    return len(self._tenants)
+
+  def get(self, api_key: str, profile_id: Optional[int] = None) -> Tenant:
+    """Return the tenant for the given credentials, creating it if needed."""
+    if not api_key:
+      raise ValueError("A Wise API key is required for every tenant.")
+
+    key = (hashlib.sha256(api_key.encode()).hexdigest(), profile_id)
+    now = self._clock()
+
+    with self._lock:
+      self._evict_idle(now)
+
+      tenant = self._tenants.get(key)
+      if tenant is None:
+        tenant = self._create_tenant(key, api_key, profile_id)
+        self._tenants[key] = tenant
+        while len(self._tenants) > self.max_tenants:
+          self._tenants.popitem(last=False)[1].close()
+      else:
+        self._tenants.move_to_end(key)
+
+      tenant.last_used = now
+      return tenant
+
+  def evict_idle(self) -> int:
+    """Drop tenants that have been idle longer than the timeout."""
+    with self._lock:
+      return self._evict_idle(self._clock())
+
+  def wise_apis(self) -> list:
+    """Return the Wise API clients of all live tenants."""
+    with self._lock:
+      return [tenant.wise_api for tenant in self._tenants.values()]
+
+  def close(self) -> None:
+    """Close every tenant and the shared HTTP transports."""
+    with self._lock:
+      for tenant in self._tenants.values():
+        tenant.close()
+      self._tenants.clear()
+      transports = list(self._transports.values())
+      self._transports.clear()
+    for transport in transports:
+      transport.pool_manager.clear()
+
+  def resource_caches(self) -> list:
+    """Return the resource caches of all live tenants."""
+    with self._lock:
+      return [tenant.resources for tenant in self._tenants.values()]
+
+  def _evict_idle(self, now: float) -> int:
+    evicted = 0
+    # The LRU order means idle tenants are always at the front
+    while self._tenants:
+      key, tenant = next(iter(self._tenants.items()))
+      if now - tenant.last_used <= self.idle_timeout:
+        break
+      del self._tenants[key]
+      tenant.close()
+      evicted += 1
+    return evicted
+
+  def transport(self) -> RESTClientObject:
+    """Return the pooled HTTP transport shared by all tenants of the host."""
+    with self._lock:
+      return self._transport()
+
+  def _transport(self) -> RESTClientObject:
+    # Called with the lock held
+    transport = self._transports.get(self.host)
+    if transport is None:
+      transport = CancellableRESTClient(wise_api_client.Configuration(host=self.host))
+      self._transports[self.host] = transport
+    return transport
+
+  def _create_tenant(self, key: Tuple[str, Optional[int]], api_key: str, profile_id: Optional[int]) -> Tenant:
+    context = Context(profile_id=profile_id)
+    wise_api = WiseAPI(
+      api_key=api_key,
+      host=self.host,
+      context=context,
+      rest_client=self._transport(),
+      store=self.store,
+      ledger=self.ledger,
+      transfer_ledger=self.transfer_ledger,
+      live_updates=self.live_updates,
+      quote_cache=self.quote_cache,
+      # Each API key exports into its own directory, so tenants cannot overwrite each other's files
+      export_dir=os.path.join(self.export_dir, key[0][:16]) if self.export_dir else None,
+    )
+    toolkit = WiseAgentToolkit(
+      api_key=api_key,
+      host=self.host,
+      configuration={"actions": ACTIONS_ALL, "context": context},
+      wise_api=wise_api,
+    )
+    return Tenant(key, toolkit, resource_ttl=self.resource_ttl)
+
+
+def credentials_from_headers(
+  headers: Any,
+  default_api_key: Optional[str] = None,
+  default_profile_id: Optional[int] = None,
+) -> Tuple[Optional[str], Optional[int]]:
+  """Extract the tenant API key and profile ID from HTTP request headers.
+
+  The API key is read from an ``Authorization: Bearer <key>`` header and the
+  profile from ``X-Wise-Profile-Id``; either falls back to the server default.
+  """
+  api_key = default_api_key
+  authorization = headers.get(API_KEY_HEADER) if headers is not None else None
+  if authorization:
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token.strip():
+      api_key = token.strip()
+
+  profile_id = default_profile_id
+  profile_header = headers.get(PROFILE_ID_HEADER) if headers is not None else None
+  if profile_header:
+    try:
+      profile_id = int(profile_header)
+    except ValueError:
+      raise ValueError(f"Invalid {PROFILE_ID_HEADER} header: {profile_header}")
+
+  return api_key, profile_id
@@ -10,6 +10,7 @@ from pydantic import BaseModel
 
 from ..integrations.base import BaseIntegrationTool
 from ..api import WiseAPI
+from ..validation import validate_arguments
 
 # Check for MCP availability
 try:
@@ -27,71 +28,6 @@ except ImportError:
             pass
 
 
-def _fix_mcp_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Fix schema for MCP clients by removing optional (null) types for non-string fields.
-
-    This is a workaround for MCP clients that send strings for optional integer fields.
-    We keep the original schema intact but modify the MCP-exposed version to require
-    proper types for non-string fields.
-
-    Args:
-        schema: The original JSON schema
-
-    Returns:
-        Modified schema safe for MCP clients
-    """
-    if not isinstance(schema, dict):
-        return schema
-
-    # Create a deep copy to avoid modifying the original
-    fixed_schema = {}
-
-    for key, value in schema.items():
-        if key == "properties" and isinstance(value, dict):
-            # Fix each property
-            fixed_properties = {}
-            for prop_name, prop_schema in value.items():
-                if isinstance(prop_schema, dict) and "anyOf" in prop_schema:
-                    # Handle anyOf pattern used by Pydantic for Optional fields
-                    any_of = prop_schema["anyOf"]
-                    if isinstance(any_of, list) and len(any_of) == 2:
-                        # Check if this is Optional[Type] pattern (Type and null)
-                        non_null_types = [t for t in any_of if t.get("type") != "null"]
-                        null_types = [t for t in any_of if t.get("type") == "null"]
-
-                        if len(non_null_types) == 1 and len(null_types) == 1:
-                            # This is an Optional field
-                            field_type = non_null_types[0].get("type")
-
-                            # For non-string optional fields, make them required with proper type
-                            # This prevents MCP clients from sending strings for int/number fields
-                            if field_type and field_type != "string":
-                                # Use the non-null type directly
-                                fixed_properties[prop_name] = non_null_types[0]
-                            else:
-                                # Keep string optionals as-is
-                                fixed_properties[prop_name] = prop_schema
-                        else:
-                            fixed_properties[prop_name] = prop_schema
-                    else:
-                        fixed_properties[prop_name] = prop_schema
-                else:
-                    # Recursively fix nested schemas
-                    fixed_properties[prop_name] = _fix_mcp_schema(prop_schema)
-            fixed_schema[key] = fixed_properties
-        elif isinstance(value, dict):
-            # Recursively fix nested objects
-            fixed_schema[key] = _fix_mcp_schema(value)
-        elif isinstance(value, list):
-            # Recursively fix lists
-            fixed_schema[key] = [_fix_mcp_schema(item) if isinstance(item, dict) else item for item in value]
-        else:
-            fixed_schema[key] = value
-
-    return fixed_schema
-
-
 class WiseTool(BaseIntegrationTool):
     """MCP-compatible tool for Wise API operations."""
 
@@ -121,9 +57,7 @@ class WiseTool(BaseIntegrationTool):
         """Convert to MCP Tool format."""
         input_schema = {}
         if self.args_schema:
-            # Generate schema and apply MCP client fix
-            original_schema = self.args_schema.model_json_schema()
-            input_schema = _fix_mcp_schema(original_schema)
+            input_schema = self.args_schema.model_json_schema()
 
         return Tool(
             name=self.name,
@@ -134,6 +68,10 @@ class WiseTool(BaseIntegrationTool):
     def execute(self, arguments: Dict[str, Any]) -> str:
         """Execute the tool with MCP-formatted arguments."""
         try:
+            # Reject invalid input locally and coerce e.g. "123" to 123
+            if self.args_schema:
+                arguments = validate_arguments(self.args_schema, arguments)
+
             # Use the WiseAPI.run method to execute the tool
             result = self.wise_api.run(self.method, **arguments)
             return result
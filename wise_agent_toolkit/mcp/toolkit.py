@@ -7,8 +7,9 @@ Provides a toolkit implementation that works with the Model Context Protocol sta
 from typing import List, Optional, Dict, Any
 from pydantic import PrivateAttr
 
-from ..tools import tools
-from ..configuration import Configuration, is_tool_allowed
+from ..api import WiseAPI
+from ..tools import tool_description, tools
+from ..configuration import Configuration, is_tool_allowed, is_tool_available
 from ..integrations.base import BaseIntegrationToolkit
 
 # Check for MCP availability
@@ -36,7 +37,8 @@ class WiseAgentToolkit(BaseIntegrationToolkit):
         self,
         api_key: str,
         host: str = "https://api.sandbox.transferwise.tech",
-        configuration: Optional[Configuration] = None
+        configuration: Optional[Configuration] = None,
+        wise_api: Optional[WiseAPI] = None,
     ):
         if not _MCP_AVAILABLE:
             raise ImportError(
@@ -44,10 +46,11 @@ class WiseAgentToolkit(BaseIntegrationToolkit):
                 "Install it with: pip install wise-agent-toolkit[mcp]"
             )
 
-        super().__init__(api_key=api_key, host=host, configuration=configuration)
+        super().__init__(api_key=api_key, host=host, configuration=configuration, wise_api=wise_api)
 
         filtered_tools = [
-            tool for tool in tools if is_tool_allowed(tool, configuration)
+            tool for tool in tools
+            if is_tool_allowed(tool, configuration) and is_tool_available(tool, self.wise_api.capabilities)
         ]
 
         self._tools = [
@@ -62,7 +65,7 @@ class WiseAgentToolkit(BaseIntegrationToolkit):
         """Create an MCP-specific tool from configuration."""
         return WiseTool(
             name=tool_config["method"],
-            description=tool_config["description"],
+            description=tool_description(tool_config, (self.configuration or {}).get("description_profile")),
             method=tool_config["method"],
             wise_api=self.wise_api,
             args_schema=tool_config.get("args_schema", None),
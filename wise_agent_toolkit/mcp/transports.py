@@ -0,0 +1,196 @@
+"""
+Transports of the Wise MCP server.
+
+``run_stdio`` serves a single session over stdin/stdout. ``http_app`` and
+``run_http`` serve many concurrent sessions from one process over Streamable
+HTTP (mounted at ``/mcp``) or the legacy SSE transport (``/sse`` and
+``/messages/``). Every transport runs the server's background tasks and
+drains in-flight tool calls before the server closes.
+"""
+
+import codecs
+import contextlib
+import logging
+import os
+import sys
+import threading
+
+import anyio
+
+from .drain import drain_on_close, drain_on_signal
+
+logger = logging.getLogger(__name__)
+
+
+class _StdinLines:
+  """Lines of stdin, read by a daemon thread.
+
+  The MCP library reads stdin in an AnyIO worker thread, which cannot be
+  cancelled while it is blocked and keeps the interpreter from exiting. This
+  thread can be left blocked when the session is cancelled after a signal; it
+  reads the file descriptor directly, so it holds no lock the interpreter needs
+  at exit.
+  """
+
+  def __init__(self):
+    self._send, self._receive = anyio.create_memory_object_stream(0)
+    self._thread: threading.Thread = None
+
+  def __aiter__(self):
+    return self
+
+  async def __anext__(self) -> str:
+    if self._thread is None:
+      self._thread = threading.Thread(
+        target=self._read, args=(anyio.lowlevel.current_token(),), name="mcp-stdin", daemon=True
+      )
+      self._thread.start()
+    try:
+      return await self._receive.receive()
+    except anyio.EndOfStream:
+      raise StopAsyncIteration
+
+  def _read(self, token) -> None:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    try:
+      while True:
+        chunk = os.read(sys.stdin.fileno(), 65536)
+        pending += decoder.decode(chunk, final=not chunk)
+        *lines, pending = pending.split("\n")
+        if not chunk and pending:
+          lines.append(pending)
+        for line in lines:
+          anyio.from_thread.run(self._send.send, line, token=token)
+        if not chunk:
+          break
+      anyio.from_thread.run_sync(self._send.close, token=token)
+    except Exception as e:
+      # The session is over and its event loop may be gone
+      logger.debug(f"Stopped reading stdin: {e}")
+
+
+async def run_stdio(mcp_server) -> None:
+  """Serve a single MCP session over stdin/stdout."""
+  from mcp.server.stdio import stdio_server
+
+  server = mcp_server.server
+  options = server.create_initialization_options()
+  try:
+    async with anyio.create_task_group() as task_group:
+      async with stdio_server(stdin=_StdinLines()) as (read_stream, write_stream):
+        mcp_server.start_background_tasks(task_group)
+        task_group.start_soon(drain_on_signal, mcp_server, task_group.cancel_scope)
+        read_stream = drain_on_close(mcp_server, read_stream, task_group)
+        await server.run(read_stream, write_stream, options, raise_exceptions=True)
+      task_group.cancel_scope.cancel()
+  finally:
+    mcp_server.close()
+
+
+def http_app(mcp_server, transport: str = "streamable-http"):
+  """Build the Starlette application serving MCP sessions over HTTP.
+
+  Streamable HTTP is mounted at ``/mcp``. The legacy SSE transport uses
+  ``/sse`` for the event stream and ``/messages/`` for client messages.
+  """
+  from starlette.applications import Starlette
+  from starlette.responses import Response
+  from starlette.routing import Mount, Route
+
+  server = mcp_server.server
+
+  if transport == "streamable-http":
+    from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+
+    session_manager = StreamableHTTPSessionManager(app=server)
+
+    class StreamableHTTPEndpoint:
+      # A plain ASGI callable, so Starlette routes /mcp without a redirect to /mcp/
+      async def __call__(self, scope, receive, send):
+        await session_manager.handle_request(scope, receive, send)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+      async with session_manager.run(), anyio.create_task_group() as task_group:
+        mcp_server.start_background_tasks(task_group)
+        yield
+        # Sessions keep running in the manager until it exits; let their calls finish
+        await mcp_server.drain()
+        task_group.cancel_scope.cancel()
+      mcp_server.close()
+
+    return Starlette(
+      routes=[Route("/mcp", endpoint=StreamableHTTPEndpoint())],
+      lifespan=lifespan,
+    )
+
+  if transport == "sse":
+    from mcp.server.sse import SseServerTransport
+
+    sse = SseServerTransport("/messages/")
+
+    async def handle_sse(request):
+      async with sse.connect_sse(request.scope, request.receive, request._send) as (read_stream, write_stream):
+        await server.run(read_stream, write_stream, server.create_initialization_options())
+      # Return empty response to avoid NoneType error on disconnect
+      return Response()
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+      async with anyio.create_task_group() as task_group:
+        mcp_server.start_background_tasks(task_group)
+        yield
+        await mcp_server.drain()
+        task_group.cancel_scope.cancel()
+      mcp_server.close()
+
+    return Starlette(
+      routes=[
+        Route("/sse", endpoint=handle_sse, methods=["GET"]),
+        Mount("/messages/", app=sse.handle_post_message),
+      ],
+      lifespan=lifespan,
+    )
+
+  raise ValueError(f"Unsupported HTTP transport: {transport}")
+
+
+async def run_http(mcp_server, transport: str = "streamable-http", host: str = "127.0.0.1", port: int = 8000) -> None:
+  """Serve MCP sessions over HTTP until the process is stopped."""
+  import uvicorn
+
+  # sse-starlette ends every SSE stream as soon as uvicorn receives a signal,
+  # which would drop the results of in-flight calls. Keep the streams open
+  # until the drain is over where the installed version allows it.
+  try:
+    from sse_starlette.sse import AppStatus
+  except ImportError:
+    AppStatus = None
+  hold_streams = AppStatus is not None and hasattr(AppStatus, "disable_automatic_graceful_drain")
+  if hold_streams:
+    AppStatus.disable_automatic_graceful_drain()
+
+  class DrainingServer(uvicorn.Server):
+    def handle_exit(self, sig, frame):
+      # Reject new calls right away
+      mcp_server.admission.start_draining()
+      super().handle_exit(sig, frame)
+
+    async def shutdown(self, sockets=None):
+      # Let in-flight calls finish and deliver their results before
+      # uvicorn starts closing connections
+      await mcp_server.drain()
+      if hold_streams:
+        AppStatus.should_exit = True
+      await super().shutdown(sockets=sockets)
+
+  config = uvicorn.Config(
+    http_app(mcp_server, transport),
+    host=host,
+    port=port,
+    log_level="info",
+    timeout_graceful_shutdown=mcp_server.drain_timeout,
+  )
+  logger.info(f"Serving MCP over {transport} on http://{host}:{port}")
+  await DrainingServer(config).serve()
@@ -0,0 +1,39 @@
+"""
+Progress reporting for long-running Wise API calls.
+
+Functions that walk several pages call ``report_progress`` after each page.
+Callers that want to observe progress (such as the MCP server, which turns it
+into MCP progress notifications) bind a callback with ``progress_scope``;
+without a bound callback reporting is a no-op.
+"""
+
+import contextlib
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+# Called as callback(progress, total, message)
+ProgressCallback = Callable[[float, Optional[float], Optional[str]], None]
+
+_current_callback: ContextVar[Optional[ProgressCallback]] = ContextVar("wise_progress_callback", default=None)
+
+
+def current_callback() -> Optional[ProgressCallback]:
+  """Return the callback bound to the current context, if any."""
+  return _current_callback.get()
+
+
+def report_progress(progress: float, total: Optional[float] = None, message: Optional[str] = None) -> None:
+  """Report progress of the current call to the bound callback, if any."""
+  callback = _current_callback.get()
+  if callback is not None:
+    callback(progress, total, message)
+
+
+@contextlib.contextmanager
+def progress_scope(callback: ProgressCallback) -> Iterator[None]:
+  """Bind ``callback`` to receive progress reported in the current context."""
+  reset = _current_callback.set(callback)
+  try:
+    yield
+  finally:
+    _current_callback.reset(reset)
@@ -1,3 +1,7 @@
+import functools
+import re
+from typing import Optional
+
 CREATE_TRANSFER_PROMPT = """
 This tool will create a transfer between accounts in Wise.
 
@@ -62,11 +66,28 @@ It takes the following arguments:
 - currency (str, optional): Filter recipients by currency (3-letter ISO currency code).
 - size (int, optional): Number of items per page for pagination.
 - seek_position (int, optional): Position to start seeking from for pagination.
+- fetch_all (bool, optional): Fetch every page instead of a single page. Can take a long time for large histories.
 
 Returns:
     A paginated list of recipient accounts from Wise containing information about each recipient.
 """
 
+SEARCH_RECIPIENTS_PROMPT = """
+This tool will search the recipient accounts of a profile in Wise and return only the best matches, e.g. to find "Anna's EUR account".
+Prefer it over listing every recipient.
+
+It takes the following arguments:
+- profile_id (int, optional): The profile ID to search recipients of. If not provided, will be taken from context.
+- query (str, optional): Recipient name to search for; matched fuzzily, so partial or misspelled names work.
+- currency (str, optional): Only recipients receiving this currency (3-letter ISO currency code).
+- iban (str, optional): Only the recipient with this IBAN or account number (spaces are ignored).
+- account_ending (str, optional): Only recipients whose account number ends with these digits.
+- limit (int, optional): Maximum number of matches to return (default 5).
+
+Returns:
+    The best matching recipient accounts (ID, name, currency, country, type and account summary), best first, with a match score when searching by name.
+"""
+
 CREATE_RECIPIENT_ACCOUNT_PROMPT = """
 This tool will create a recipient account in Wise.
 
@@ -99,7 +120,7 @@ LIST_TRANSFERS_PROMPT = """
 This tool will list transfers in Wise.
 
 It takes the following arguments:
-- profile (int, optional): The profile ID to list transfers for. If not provided, will be taken from context.
+- profile (int, list of int or "all", optional): The profile ID to list transfers for. If not provided, will be taken from context. Pass a list of profile IDs or "all" to list the transfers of several profiles in one call; limit and offset then apply to each profile.
 - status (str, optional): Filter transfers by status (e.g., incoming_payment_waiting, processing, outgoing_payment_sent, cancelled).
 - source_currency (str, optional): Filter transfers by source currency (3-letter ISO currency code).
 - target_currency (str, optional): Filter transfers by target currency (3-letter ISO currency code).
@@ -107,6 +128,7 @@ It takes the following arguments:
 - created_date_end (date, optional): Filter transfers created before this date. Format: YYYY-MM-DD (e.g., 2025-10-01).
 - limit (int, optional): Number of items per page for pagination (default 20, max 40).
 - offset (int, optional): Offset for pagination (default 0). This is a row count offset (e.g., offset=100 skips the first 100 transfers), NOT a transfer ID.
+- fetch_all (bool, optional): Fetch every page instead of a single page (limit is then the page size). Can take a long time for large histories.
 
 Pagination Example:
 - First page: offset=0, limit=20 (returns transfers 1-20)
@@ -114,7 +136,39 @@ Pagination Example:
 - Third page: offset=40, limit=20 (returns transfers 41-60)
 
 Returns:
-    A list of transfers from Wise containing information about each transfer.
+    A list of transfers from Wise containing information about each transfer. When several profiles are listed, the transfers are merged newest first and each has a profileId.
+"""
+
+SYNC_TRANSFERS_PROMPT = """
+This tool will report which transfers in Wise are new or have changed (e.g. a new status) since the previous sync.
+Use it to refresh a view of transfers instead of listing them all again.
+
+Only transfers created since the previous sync are listed from Wise, and transfers that were still in progress are re-checked.
+
+It takes the following arguments:
+- profile (int, optional): The profile ID to sync transfers of. If not provided, will be taken from context.
+- limit (int, optional): Maximum number of changed transfers to list (default 100).
+
+Returns:
+    The new and changed transfers (with their previous status), how many there were and how many transfers are still in progress.
+"""
+
+ANALYZE_TRANSFERS_PROMPT = """
+This tool will compute totals over the transfer history in Wise, e.g. "how much did we send to GBP recipients per month this year".
+Use it instead of listing transfers and adding amounts up yourself.
+
+It takes the following arguments:
+- group_by (list of str, optional): Dimensions to group by: status, source_currency, target_currency, recipient, day, week, month, year. The currency of the summed amounts is always included.
+- value (str, optional): Which amounts to add up: 'source' (amounts sent, default) or 'target' (amounts received by recipients).
+- profile (int, optional): The profile ID to analyze transfers of. If not provided, will be taken from context.
+- status (str, optional): Only transfers with this status (e.g., outgoing_payment_sent).
+- source_currency (str, optional): Only transfers with this source currency (3-letter ISO currency code).
+- target_currency (str, optional): Only transfers with this target currency (3-letter ISO currency code).
+- created_date_start (date, optional): Only transfers created on or after this date. Format: YYYY-MM-DD.
+- created_date_end (date, optional): Only transfers created before this date. Format: YYYY-MM-DD.
+
+Returns:
+    A summary table with one row per group: the group's dimension values, the number of transfers, and the sum and average amount.
 """
 
 CANCEL_TRANSFER_PROMPT = """
@@ -140,6 +194,20 @@ Returns:
     The transfer object from Wise containing detailed information about the transfer including its status, amounts, currencies, and other transfer details.
 """
 
+WAIT_FOR_TRANSFER_STATUS_PROMPT = """
+This tool will wait until a transfer in Wise reaches a given status, instead of checking it repeatedly.
+
+It takes the following arguments:
+- transfer_id (int): The ID of the transfer to wait for.
+- statuses (list of str, optional): Statuses to wait for (e.g., outgoing_payment_sent). Defaults to any final status (outgoing_payment_sent, cancelled, funds_refunded, bounced_back, charged_back).
+- timeout (float, optional): Maximum number of seconds to wait (default and max 30). If the wait times out, call the tool again to keep waiting.
+
+The wait also ends early if the transfer reaches a final status that was not requested.
+
+Returns:
+    An object with the transfer's last known status, whether a requested status was reached, whether the wait timed out, and the transfer object.
+"""
+
 LIST_PROFILES_PROMPT = """
 This tool will list profiles in Wise.
 
@@ -195,14 +263,105 @@ LIST_ACTIVITIES_PROMPT = """
 This tool will list activities for a profile in Wise.
 
 It takes the following arguments:
-- profile_id (int, optional): The profile ID to list activities for. If not provided, will be taken from context.
+- profile_id (int, list of int or "all", optional): The profile ID to list activities for. If not provided, will be taken from context. Pass a list of profile IDs or "all" to list the activities of several profiles in one call; size then applies to each profile.
 - monetary_resource_type (str, optional): Filter by resource type.
 - status (str, optional): Filter by activity status.
 - since (datetime, optional): Filter activities created after this timestamp.
 - until (datetime, optional): Filter activities created before this timestamp.
-- next_cursor (str, optional): Pagination cursor for next page.
+- next_cursor (str, optional): Pagination cursor for next page. Only for a single profile.
 - size (int, optional): Number of results per page (default 10).
+- fetch_all (bool, optional): Fetch every page by following the cursor instead of a single page. Can take a long time for large histories.
 
 Returns:
-    A list of activities from Wise containing information about each activity.
+    A list of activities from Wise containing information about each activity. When several profiles are listed, the activities are merged newest first, each has a profileId, and "cursors" holds the next cursor of each profile.
 """
+
+QUERY_ACTIVITY_LEDGER_PROMPT = """
+This tool will search the activities of a profile in Wise from a local index, e.g. "activity last month over 1000 EUR".
+
+Only activity created since the previous query is fetched from Wise; the search itself runs locally and is fast even over long histories.
+
+It takes the following arguments:
+- profile_id (int, optional): The profile ID to query activities for. If not provided, will be taken from context.
+- since (datetime, optional): Only activities created at or after this timestamp.
+- until (datetime, optional): Only activities created before this timestamp.
+- currency (str, optional): Only activities whose primary amount is in this currency (e.g., EUR).
+- min_amount (float, optional): Only activities whose primary amount is at least this value.
+- max_amount (float, optional): Only activities whose primary amount is at most this value.
+- type (str, optional): Only activities of this type (e.g., TRANSFER, CARD_PAYMENT).
+- status (str, optional): Only activities with this status (e.g., COMPLETED).
+- text (str, optional): Only activities whose title or description contains this text.
+- limit (int, optional): Maximum number of activities to return, newest first (default 100).
+- sync (bool, optional): Fetch new activity from Wise before querying (default true).
+
+Returns:
+    The matching activities, their count and a summary of the sync.
+"""
+
+EXPORT_RECORDS_PROMPT = """
+This tool will export every transfer, activity or recipient of a profile in Wise to a CSV, NDJSON or Parquet file.
+Use it for reports and reconciliation over long histories instead of listing records page by page.
+
+Records are streamed to the file as they are fetched, so exports of any size are supported.
+
+It takes the following arguments:
+- kind (str): What to export: 'transfers', 'activities' or 'recipients'.
+- format (str, optional): File format: 'csv' (default), 'ndjson' or 'parquet'.
+- filename (str, optional): Name of the file to write in the export directory. A name is generated if not provided.
+- profile_id (int, optional): The profile ID to export records of. If not provided, will be taken from context.
+- status (str, optional): Only transfers or activities with this status.
+- currency (str, optional): Only recipients with this currency (3-letter ISO currency code).
+- source_currency (str, optional): Only transfers with this source currency (3-letter ISO currency code).
+- target_currency (str, optional): Only transfers with this target currency (3-letter ISO currency code).
+- since (datetime, optional): Only transfers or activities created at or after this timestamp.
+- until (datetime, optional): Only transfers or activities created before this timestamp.
+
+Returns:
+    The path of the written file, the number of rows, the format and the file size in bytes.
+"""
+
+
+DESCRIPTION_PROFILES = ("full", "compact", "minimal")
+
+_ARGUMENT_LINE = re.compile(r"^- (\w+) \(")
+
+
+@functools.lru_cache(maxsize=None)
+def describe_tool(prompt: str, args_schema: Optional[type] = None, profile: str = "full") -> str:
+  """Return a tool prompt in one of the ``DESCRIPTION_PROFILES``.
+
+  ``full`` is the prompt itself. ``compact`` drops the argument lines for the
+  fields of ``args_schema``, whose JSON schema is sent alongside the
+  description and already documents them. Notes on those arguments and any
+  arguments the schema lacks are kept. ``minimal`` is only the first sentence.
+  """
+  if profile not in DESCRIPTION_PROFILES:
+    raise ValueError(f"Unknown description profile {profile!r}. Choose one of: {', '.join(DESCRIPTION_PROFILES)}")
+  if profile == "full":
+    return prompt
+
+  if profile == "minimal":
+    summary = prompt.strip().split("\n\n")[0].replace("\n", " ")
+    sentence = re.split(r"(?<=[.!?])\s+(?=[A-Z])", summary, maxsplit=1)[0]
+    return re.sub(r"^This tool will (\w)", lambda match: match.group(1).upper(), sentence)
+
+  fields = set(args_schema.model_fields) if args_schema is not None else set()
+  lines = []
+  dropping = False
+  for line in prompt.strip().splitlines():
+    argument = _ARGUMENT_LINE.match(line)
+    if argument:
+      dropping = argument.group(1) in fields
+    elif not line.startswith("  "):
+      dropping = False
+    elif dropping and line.lstrip().startswith("Note:"):
+      lines.append(line.lstrip())
+      continue
+    if not dropping:
+      lines.append(line)
+
+  text = "\n".join(lines)
+  # The argument header is dropped when no argument line is left under it
+  text = re.sub(r"It takes the following arguments:\n+(?!- )", "", text)
+  text = re.sub(r"Returns:\n\s+", "Returns: ", text)
+  return re.sub(r"\n{3,}", "\n\n", text)
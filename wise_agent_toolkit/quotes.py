@@ -0,0 +1,73 @@
+"""
+Reuse of quotes that are still valid.
+
+Agents often call ``create_quote`` again with identical parameters within
+seconds, e.g. after re-planning. ``QuoteCache`` remembers the quotes created
+for each set of parameters (profile, currencies, which side the amount is on
+and its value, target account, pay-in and pay-out methods) and returns the
+existing quote while it stays valid for at least ``margin`` more seconds, so
+it does not expire between being returned and being used for a transfer.
+
+Quotes stop being reused once they are updated or used for a transfer, since
+Wise accepts a quote for only one transfer.
+"""
+
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .store import quote_expiration
+
+# Quotes Wise still accepts for new transfers
+_REUSABLE_STATUSES = {None, "PENDING"}
+
+
+class QuoteCache:
+  """Quotes by creation parameters, returned again while they remain valid."""
+
+  def __init__(
+    self,
+    margin: float = 60.0,
+    max_quotes: int = 256,
+    clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+  ):
+    self.margin = timedelta(seconds=margin)
+    self.max_quotes = max_quotes
+    self._clock = clock
+    self._lock = threading.Lock()
+    self._quotes: Dict[Tuple, Tuple[str, str, datetime]] = {}
+
+  def get(self, key: Tuple) -> Optional[str]:
+    """Return the serialized quote created with ``key`` if it is valid for longer than the margin."""
+    with self._lock:
+      entry = self._quotes.get(key)
+      if entry is None:
+        return None
+      if entry[2] - self.margin <= self._clock():
+        del self._quotes[key]
+        return None
+      return entry[0]
+
+  def put(self, key: Tuple, quote: Dict[str, Any], text: str) -> None:
+    """Remember a newly created quote, if it can be reused at all."""
+    expiration_time = quote_expiration(quote)
+    if quote.get("id") is None or expiration_time is None or quote.get("status") not in _REUSABLE_STATUSES:
+      return
+
+    with self._lock:
+      now = self._clock()
+      for stale in [k for k, entry in self._quotes.items() if entry[2] - self.margin <= now]:
+        del self._quotes[stale]
+      if len(self._quotes) >= self.max_quotes:
+        # Drop the quote closest to expiring
+        del self._quotes[min(self._quotes, key=lambda k: self._quotes[k][2])]
+      self._quotes[key] = (text, str(quote["id"]), expiration_time)
+
+  def discard(self, quote_id: Any) -> None:
+    """Stop reusing a quote, e.g. because it was updated or used for a transfer."""
+    with self._lock:
+      for key in [k for k, entry in self._quotes.items() if entry[1] == str(quote_id)]:
+        del self._quotes[key]
+
+  def __len__(self) -> int:
+    return len(self._quotes)
@@ -0,0 +1,211 @@
+"""
+In-memory search index of recipient accounts.
+
+Finding "Anna's EUR account" used to mean listing every recipient page and
+scanning the JSON in the model context. ``RecipientIndex`` keeps the recipient
+accounts of each profile in memory instead and answers fuzzy name searches and
+exact lookups by currency, IBAN or the last digits of the account number,
+returning only the best matches.
+
+A profile's recipients are fetched in full on first use and again once they are
+older than ``ttl`` seconds. In between, ``create_recipient_account`` and
+``deactivate_recipient_account`` update the index in place.
+"""
+
+import difflib
+import re
+import threading
+import time
+import unicodedata
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Matches scoring below this are not returned by a name search
+MIN_SCORE = 0.6
+
+_NON_ALPHANUMERIC = re.compile(r"[^0-9a-z]+")
+_ACCOUNT_KEYS = ("iban", "accountnumber")
+
+
+def _normalize(text: str) -> str:
+  """Lowercase ``text`` and strip accents and apostrophes, so "Zoë O'Brien" matches "zoe obrien"."""
+  text = unicodedata.normalize("NFKD", text)
+  text = "".join(c for c in text if not unicodedata.combining(c))
+  return text.lower().replace("'", "").replace("’", "")
+
+
+def _tokens(text: str) -> List[str]:
+  return [token for token in _NON_ALPHANUMERIC.split(_normalize(text)) if token]
+
+
+def _account(text: Any) -> str:
+  """Normalize an IBAN or account number: uppercase letters and digits only."""
+  return re.sub(r"[^0-9A-Z]", "", str(text).upper())
+
+
+class _Entry:
+  """A recipient account with its precomputed search keys."""
+
+  __slots__ = ("recipient", "name", "tokens", "currency", "accounts")
+
+  def __init__(self, recipient: Dict[str, Any]):
+    self.recipient = recipient
+    name = recipient.get("name") or {}
+    full_name = name.get("fullName") or " ".join(
+      part for part in (name.get("givenName"), name.get("middleName"), name.get("familyName")) if part
+    )
+    self.name = " ".join(_tokens(full_name))
+    self.tokens = self.name.split()
+    self.currency = (recipient.get("currency") or "").upper()
+
+    accounts = set()
+    details = recipient.get("details") or {}
+    for key, value in details.items():
+      if isinstance(value, str) and _NON_ALPHANUMERIC.sub("", key.lower()) in _ACCOUNT_KEYS:
+        accounts.add(_account(value))
+    for field in recipient.get("displayFields") or []:
+      key = _NON_ALPHANUMERIC.sub("", (field.get("key") or "").lower())
+      if field.get("value") and any(account_key in key for account_key in _ACCOUNT_KEYS):
+        accounts.add(_account(field["value"]))
+    for summary in (recipient.get("accountSummary"), recipient.get("longAccountSummary")):
+      if summary:
+        # Summaries such as "(ending 1234)" or "DE89...3000" still end in the account's last digits
+        accounts.add(_account(summary))
+    self.accounts = {account for account in accounts if account}
+
+  def score(self, query_tokens: List[str], query: str) -> float:
+    """Return how well the recipient's name matches the query, from 0 to 1."""
+    if not self.tokens:
+      return 0.0
+
+    token_scores = []
+    for query_token in query_tokens:
+      best = 0.0
+      for token in self.tokens:
+        if token == query_token:
+          best = 1.0
+          break
+        if token.startswith(query_token):
+          best = max(best, 0.9)
+        else:
+          matcher = difflib.SequenceMatcher(None, query_token, token)
+          if matcher.real_quick_ratio() > best and matcher.quick_ratio() > best:
+            best = max(best, matcher.ratio())
+      token_scores.append(best)
+    return max(sum(token_scores) / len(token_scores), difflib.SequenceMatcher(None, query, self.name).ratio())
+
+
+class _Profile:
+  def __init__(self):
+    self.entries: Dict[Any, _Entry] = {}
+    self.fetched_at: Optional[float] = None
+    self.lock = threading.Lock()
+
+
+class RecipientIndex:
+  """Per-profile in-memory index of recipient accounts for fuzzy and exact search."""
+
+  def __init__(
+    self,
+    fetch: Callable[[int], Iterable[Dict[str, Any]]],
+    ttl: float = 300.0,
+    clock: Callable[[], float] = time.monotonic,
+  ):
+    self._fetch = fetch
+    self.ttl = ttl
+    self._clock = clock
+    self._profiles: Dict[int, _Profile] = {}
+    self._lock = threading.Lock()
+
+  def search(
+    self,
+    profile_id: int,
+    query: Optional[str] = None,
+    currency: Optional[str] = None,
+    iban: Optional[str] = None,
+    account_ending: Optional[str] = None,
+    limit: int = 5,
+  ) -> List[Dict[str, Any]]:
+    """Return the best matching recipient accounts of the profile, best first.
+
+    ``currency``, ``iban`` and ``account_ending`` must match exactly; ``query``
+    is matched fuzzily against the recipient's name.
+    """
+    entries = self._entries(profile_id)
+
+    if currency:
+      entries = [entry for entry in entries if entry.currency == currency.upper()]
+    if iban:
+      iban = _account(iban)
+      entries = [entry for entry in entries if iban in entry.accounts]
+    if account_ending:
+      account_ending = _account(account_ending)
+      entries = [entry for entry in entries if any(a.endswith(account_ending) for a in entry.accounts)]
+
+    query_tokens = _tokens(query) if query else []
+    if not query_tokens:
+      return [self._match(entry, None) for entry in entries[:limit]]
+
+    normalized = " ".join(query_tokens)
+    scored = [(entry.score(query_tokens, normalized), entry) for entry in entries]
+    scored = [item for item in scored if item[0] >= MIN_SCORE]
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [self._match(entry, score) for score, entry in scored[:limit]]
+
+  def add(self, recipient: Dict[str, Any]) -> None:
+    """Add a newly created recipient account to its profile's index, if that profile is indexed."""
+    profile = self._indexed(recipient.get("profileId"))
+    if profile is not None and recipient.get("id") is not None and recipient.get("active") is not False:
+      with profile.lock:
+        profile.entries[recipient["id"]] = _Entry(recipient)
+
+  def remove(self, recipient_id: Any, profile_id: Optional[int] = None) -> None:
+    """Drop a deactivated recipient account from the index."""
+    with self._lock:
+      profiles = [self._profiles[profile_id]] if profile_id in self._profiles else list(self._profiles.values())
+    for profile in profiles:
+      with profile.lock:
+        profile.entries.pop(recipient_id, None)
+
+  def invalidate(self, profile_id: Optional[int] = None) -> None:
+    """Forget the recipients of ``profile_id`` (or of every profile); they are fetched again on next use."""
+    with self._lock:
+      if profile_id is None:
+        self._profiles.clear()
+      else:
+        self._profiles.pop(profile_id, None)
+
+  def _entries(self, profile_id: int) -> List[_Entry]:
+    with self._lock:
+      profile = self._profiles.setdefault(profile_id, _Profile())
+
+    with profile.lock:
+      # Concurrent searches of a stale profile share a single fetch
+      if profile.fetched_at is None or self._clock() - profile.fetched_at >= self.ttl:
+        entries = {}
+        for recipient in self._fetch(profile_id):
+          if recipient.get("id") is not None and recipient.get("active") is not False:
+            entries[recipient["id"]] = _Entry(recipient)
+        profile.entries = entries
+        profile.fetched_at = self._clock()
+      return list(profile.entries.values())
+
+  def _indexed(self, profile_id: Any) -> Optional[_Profile]:
+    with self._lock:
+      profile = self._profiles.get(profile_id)
+    return profile if profile is not None and profile.fetched_at is not None else None
+
+  @staticmethod
+  def _match(entry: _Entry, score: Optional[float]) -> Dict[str, Any]:
+    recipient = entry.recipient
+    match = {
+      "id": recipient.get("id"),
+      "name": (recipient.get("name") or {}).get("fullName"),
+      "currency": recipient.get("currency"),
+      "country": recipient.get("country"),
+      "type": recipient.get("type"),
+      "account_summary": recipient.get("longAccountSummary") or recipient.get("accountSummary"),
+    }
+    if score is not None:
+      match["score"] = round(score, 3)
+    # Matches are returned to the model; empty fields only cost tokens
+    return {key: value for key, value in match.items() if value is not None}
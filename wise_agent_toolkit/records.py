@@ -0,0 +1,98 @@
+"""
+Compact in-memory records of transfers.
+
+A transfer as returned by ``to_dict()`` is a dictionary with nested
+dictionaries and datetime objects, and costs over 2 KB of memory.
+``TransferRecord`` holds only the fields that caches, indexes and analytics
+work with (ID, status, amounts, currencies, creation time, recipient) in
+``__slots__`` attributes. Status and currency strings are interned, so each
+distinct value is stored once. ``LiveState`` keeps the transfers it serves as
+records, and ``WiseAPI.analyze_transfers`` streams records without the full
+object into ``TransferColumns``.
+
+The full object is kept as zlib-compressed JSON, or not at all with
+``keep_body=False``, and is only decoded when ``to_dict()`` or ``to_model()``
+is called. ``examples/benchmark_records.py`` compares the memory use of the
+different forms.
+"""
+
+import json
+import math
+import sys
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+import wise_api_client
+
+
+def epoch_seconds(value: Any) -> float:
+  """Return a datetime or ISO string as seconds since the epoch (naive values are UTC), or NaN if it is unknown."""
+  if isinstance(value, str):
+    try:
+      value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+      return math.nan
+  if not isinstance(value, datetime):
+    return math.nan
+  if value.tzinfo is None:
+    value = value.replace(tzinfo=timezone.utc)
+  return value.timestamp()
+
+
+def _shared(value: Any) -> Any:
+  return sys.intern(value) if isinstance(value, str) else value
+
+
+def _float(value: Any) -> float:
+  return math.nan if value is None else float(value)
+
+
+class _Record:
+  __slots__ = ("_body",)
+
+  def __init__(self, record: Dict[str, Any], keep_body: bool):
+    self._body = zlib.compress(json.dumps(record, default=str).encode()) if keep_body else None
+
+  @property
+  def created_at(self) -> Optional[datetime]:
+    """The creation time as an aware datetime, or None if it is unknown."""
+    created = self.created
+    return None if math.isnan(created) else datetime.fromtimestamp(created, timezone.utc)
+
+  def to_dict(self) -> Dict[str, Any]:
+    """Return the full object, with datetimes as ISO strings."""
+    if self._body is None:
+      raise ValueError("The full object was not kept for this record (keep_body=False).")
+    return json.loads(zlib.decompress(self._body))
+
+  def to_model(self):
+    """Return the full object as its Wise API client model."""
+    return self._model.from_dict(self.to_dict())
+
+  def __repr__(self) -> str:
+    fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+    return f"{type(self).__name__}({fields})"
+
+
+class TransferRecord(_Record):
+  """The hot fields of a transfer; amounts and ``created`` (epoch seconds) are NaN when unknown."""
+
+  __slots__ = (
+    "id", "status", "source_currency", "source_value", "target_currency", "target_value", "target_account",
+    "created",
+  )
+  _model = wise_api_client.ListTransfers200ResponseInner
+
+  def __init__(self, transfer: Dict[str, Any], keep_body: bool = True):
+    """Compact a transfer, as returned by ``to_dict()``."""
+    super().__init__(transfer, keep_body)
+    self.id = transfer.get("id")
+    self.status = _shared(transfer.get("status"))
+    self.source_currency = _shared(transfer.get("sourceCurrency"))
+    self.source_value = _float(transfer.get("sourceValue"))
+    self.target_currency = _shared(transfer.get("targetCurrency"))
+    self.target_value = _float(transfer.get("targetValue"))
+    self.target_account = transfer.get("targetAccount")
+    self.created = epoch_seconds(transfer.get("created"))
+
@@ -0,0 +1,196 @@
+"""
+Account requirements cached by route and compiled into local validators.
+
+The recipient fields Wise requires depend on the route of a quote (source and
+target currency, roughly the amount, and whether an address is requested),
+not on the quote itself. ``AccountRequirementsCache`` remembers the route of
+every quote the client has seen, so ``get_account_requirements`` for a new quote
+on a known route is answered without a network call.
+
+Each cached form is compiled into ``CompiledRequirements``: per account type,
+the required fields, validation regexes and allowed values. Payloads for
+``create_recipient_account`` are checked against the compiled rules of their
+currency before the POST, so invalid ones fail immediately with a message
+naming the offending fields.
+"""
+
+import json
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .validation import InvalidArgumentsError
+
+logger = logging.getLogger(__name__)
+
+# Routes of at most this many quotes are remembered
+MAX_QUOTES = 1024
+
+Route = Tuple[str, str, Optional[str], bool]
+
+
+def quote_route(quote: Dict[str, Any], address_required: Optional[bool] = None) -> Optional[Route]:
+  """Return the route of a quote: currencies, amount band (order of magnitude) and address flag."""
+  source, target = quote.get("sourceCurrency"), quote.get("targetCurrency")
+  if not source or not target:
+    return None
+
+  band = None
+  for side in ("source", "target"):
+    amount = quote.get(f"{side}Amount")
+    if isinstance(amount, (int, float)) and amount > 0:
+      band = f"{side}:{math.floor(math.log10(amount))}"
+      break
+  return source.upper(), target.upper(), band, bool(address_required)
+
+
+class _FieldRule:
+  __slots__ = ("key", "name", "required", "pattern", "allowed", "min_length", "max_length")
+
+  def __init__(self, field: Dict[str, Any]):
+    self.key = field["key"]
+    self.name = field.get("name") or self.key
+    self.required = bool(field.get("required"))
+    self.allowed = {value["key"] for value in field.get("valuesAllowed") or [] if value.get("key") is not None}
+    self.min_length = field.get("minLength")
+    self.max_length = field.get("maxLength")
+    self.pattern = None
+    if field.get("validationRegexp"):
+      try:
+        self.pattern = re.compile(field["validationRegexp"])
+      except re.error:
+        # Wise regexes use Java syntax; the few Python cannot compile are left to Wise
+        logger.debug(f"Skipping uncompilable pattern for {self.key}: {field['validationRegexp']}")
+
+  def error(self, value: Any) -> Optional[str]:
+    if value is None or value == "":
+      return "is required" if self.required else None
+    if isinstance(value, (dict, list)):
+      return None
+
+    text = str(value)
+    if self.allowed and text not in self.allowed:
+      return f"must be one of {', '.join(sorted(self.allowed))}"
+    if self.pattern is not None and not self.pattern.search(text):
+      return f"does not match {self.pattern.pattern}"
+    if self.min_length is not None and len(text) < self.min_length:
+      return f"must be at least {self.min_length} characters"
+    if self.max_length is not None and len(text) > self.max_length:
+      return f"must be at most {self.max_length} characters"
+    return None
+
+
+class CompiledRequirements:
+  """The field rules of an account requirements form, per account type."""
+
+  def __init__(self, requirements: List[Dict[str, Any]]):
+    self.rules: Dict[str, List[_FieldRule]] = {}
+    for requirement in requirements:
+      rules = []
+      for field in requirement.get("fields") or []:
+        for entry in field.get("group") or []:
+          if entry.get("key"):
+            rules.append(_FieldRule(entry))
+      if requirement.get("type"):
+        self.rules[requirement["type"]] = rules
+
+  def errors(self, payload: Dict[str, Any]) -> List[str]:
+    """Return the validation errors of a recipient payload, or an empty list if it is valid."""
+    rules = self.rules.get(payload.get("type"))
+    if rules is None:
+      return []
+
+    errors = []
+    for rule in rules:
+      error = rule.error(_lookup(payload, rule.key))
+      if error is not None:
+        errors.append(f"{rule.key} ({rule.name}): {error}")
+    return errors
+
+
+def _lookup(payload: Dict[str, Any], key: str) -> Any:
+  """Return the value of a requirement key such as ``address.country``; fields live under ``details``."""
+  for root in (payload.get("details"), payload):
+    value = root
+    for part in key.split("."):
+      if not isinstance(value, dict) or part not in value:
+        value = None
+        break
+      value = value[part]
+    if value is not None:
+      return value
+  return None
+
+
+class AccountRequirementsCache:
+  """Account requirements cached per route, with the compiled validators of each target currency."""
+
+  def __init__(self, ttl: float = 3600.0, clock: Callable[[], float] = time.monotonic):
+    self.ttl = ttl
+    self._clock = clock
+    self._lock = threading.Lock()
+    self._quotes: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    self._forms: Dict[Route, Tuple[str, CompiledRequirements, float]] = {}
+
+  def remember_quote(self, quote: Dict[str, Any]) -> None:
+    """Record the route of a quote returned by Wise."""
+    quote_id = quote.get("id")
+    if quote_id is None or quote_route(quote) is None:
+      return
+    # Only the fields that make up the route are kept
+    quote = {key: quote.get(key) for key in ("sourceCurrency", "targetCurrency", "sourceAmount", "targetAmount")}
+    with self._lock:
+      self._quotes[str(quote_id)] = quote
+      self._quotes.move_to_end(str(quote_id))
+      while len(self._quotes) > MAX_QUOTES:
+        self._quotes.popitem(last=False)
+
+  def route(self, quote_id: Any, address_required: Optional[bool] = None) -> Optional[Route]:
+    """Return the route of a quote seen before, or None."""
+    with self._lock:
+      quote = self._quotes.get(str(quote_id))
+    return quote_route(quote, address_required) if quote is not None else None
+
+  def get(self, route: Route) -> Optional[str]:
+    """Return the cached requirements of a route, or None if they are missing or expired."""
+    with self._lock:
+      form = self._forms.get(route)
+    if form is None or self._clock() - form[2] >= self.ttl:
+      return None
+    return form[0]
+
+  def put(self, route: Route, text: str) -> None:
+    """Cache and compile the requirements (serialized JSON) of a route."""
+    compiled = CompiledRequirements(json.loads(text))
+    with self._lock:
+      self._forms[route] = (text, compiled, self._clock())
+
+  def validate(self, payload: Dict[str, Any]) -> None:
+    """Check a recipient payload against the cached requirements of its currency.
+
+    A payload is rejected only if every cached form for its currency and
+    account type rejects it. Payloads that no cached form covers are not
+    checked; Wise validates them.
+    """
+    currency = (payload.get("currency") or "").upper()
+    with self._lock:
+      forms = sorted(
+        (form for route, form in self._forms.items() if route[1] == currency and self._clock() - form[2] < self.ttl),
+        key=lambda form: form[2],
+        reverse=True,
+      )
+
+    errors = None
+    for _, compiled, _ in forms:
+      if payload.get("type") in compiled.rules:
+        form_errors = compiled.errors(payload)
+        if not form_errors:
+          return
+        # Report the errors of the most recent form
+        errors = errors or form_errors
+    if errors:
+      raise InvalidArgumentsError("Invalid recipient account: " + "; ".join(errors))
@@ -0,0 +1,118 @@
+"""
+Lexical retrieval of the tools relevant to a user message.
+
+Sending every tool on every turn costs tokens and invites wrong tool choices.
+``ToolIndex`` is a small in-process BM25 index over the entries of
+``tools.py``: the method name and title (weighted up), the full prompt and
+the resource actions the tool needs. ``select`` returns the top-k tools for
+a message, or every tool when nothing in the message matches, so a vague
+message never leaves the model without tools.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Tuple
+
+DEFAULT_TOP_K = 5
+
+# Name and title terms count this many times as often as description terms
+NAME_WEIGHT = 3
+
+_STOPWORDS = frozenset(
+  "a about all an and any are as at be by can could do does for from get give have how i in is it its me my "
+  "need of on or our please tell that the their them these this those to us want was we what when where "
+  "which who why will with would you your".split()
+)
+
+# Words users say for what the Wise API calls something else
+_SYNONYMS = {
+  "send": ("create", "transfer"),
+  "pay": ("create", "transfer"),
+  "sent": ("transfer",),
+  "payment": ("transfer",),
+  "paid": ("transfer",),
+  "payout": ("transfer",),
+  "show": ("list",),
+  "recent": ("list",),
+  "payee": ("recipient",),
+  "beneficiary": ("recipient",),
+  "rate": ("quote",),
+  "exchange": ("quote",),
+  "convert": ("quote",),
+  "conversion": ("quote",),
+  "fee": ("quote",),
+  "statement": ("activity",),
+  "history": ("activity",),
+  "spending": ("activity",),
+}
+
+
+def _stem(word: str) -> str:
+  if len(word) > 4 and word.endswith("ies"):
+    return word[:-3] + "y"
+  if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+    return word[:-1]
+  return word
+
+
+def tokenize(text: str) -> List[str]:
+  """Split text into lowercase, singular index terms without stopwords."""
+  terms = []
+  for word in re.findall(r"[a-z0-9]+", re.sub(r"['\u2019]s\b", "", text.lower())):
+    if word in _STOPWORDS:
+      continue
+    word = _stem(word)
+    terms.extend(_SYNONYMS.get(word, (word,)))
+  return terms
+
+
+class ToolIndex:
+  """BM25 index over tool entries (dictionaries shaped like those in ``tools.py``)."""
+
+  def __init__(self, tools: Iterable[Dict[str, Any]], k1: float = 1.2, b: float = 0.75):
+    self.tools = list(tools)
+    self.k1 = k1
+    self.b = b
+    self._documents = [Counter(self._terms(tool)) for tool in self.tools]
+    self._lengths = [sum(document.values()) for document in self._documents]
+    self._average_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 1.0
+    count = len(self._documents)
+    frequencies = Counter(term for document in self._documents for term in document)
+    self._idf = {
+      term: math.log(1 + (count - frequency + 0.5) / (frequency + 0.5)) for term, frequency in frequencies.items()
+    }
+
+  @staticmethod
+  def _terms(tool: Dict[str, Any]) -> List[str]:
+    name = tokenize(f"{tool['method'].replace('_', ' ')} {tool.get('name', '')}")
+    actions = " ".join(
+      f"{resource} {permission}" for resource, permissions in tool.get("actions", {}).items() for permission in permissions
+    )
+    return name * NAME_WEIGHT + tokenize(tool.get("description", "")) + tokenize(actions)
+
+  def scores(self, query: str) -> List[float]:
+    """Return the BM25 score of every tool for ``query``."""
+    terms = [term for term in tokenize(query) if term in self._idf]
+    scores = []
+    for document, length in zip(self._documents, self._lengths):
+      score = 0.0
+      norm = self.k1 * (1 - self.b + self.b * length / self._average_length)
+      for term in terms:
+        frequency = document.get(term, 0)
+        if frequency:
+          score += self._idf[term] * frequency * (self.k1 + 1) / (frequency + norm)
+      scores.append(score)
+    return scores
+
+  def search(self, query: str, k: int = DEFAULT_TOP_K) -> List[Tuple[Dict[str, Any], float]]:
+    """Return up to ``k`` matching tools with their scores, best first."""
+    ranked = sorted(zip(self.tools, self.scores(query)), key=lambda match: match[1], reverse=True)
+    return [(tool, score) for tool, score in ranked[:k] if score > 0]
+
+  def select(self, query: str, k: int = DEFAULT_TOP_K) -> List[Dict[str, Any]]:
+    """Return the top-``k`` tools for ``query`` in index order, or every tool if none matches."""
+    matches = {id(tool) for tool, _ in self.search(query, k)}
+    if not matches:
+      return list(self.tools)
+    return [tool for tool in self.tools if id(tool) in matches]
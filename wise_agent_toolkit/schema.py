@@ -1,5 +1,5 @@
-from typing import Optional, Dict, Any
-from datetime import datetime
+from typing import Optional, Dict, Any, List, Literal, Union
+from datetime import date, datetime
 from pydantic import BaseModel, Field
 
 
@@ -168,6 +168,45 @@ class ListRecipientAccounts(BaseModel):
     description="Position to start seeking from for pagination.",
   )
 
+  fetch_all: Optional[bool] = Field(
+    None,
+    description="Fetch every page instead of a single page. Can take a long time for large histories.",
+  )
+
+
+class SearchRecipients(BaseModel):
+  """Schema for the ``search_recipients`` operation."""
+
+  profile_id: Optional[int] = Field(
+    None,
+    description="The profile ID to search recipients of. If not provided, will be taken from context.",
+  )
+
+  query: Optional[str] = Field(
+    None,
+    description="Recipient name to search for; matched fuzzily (e.g., 'anna' finds 'Anna Schmidt').",
+  )
+
+  currency: Optional[str] = Field(
+    None,
+    description="Only recipients receiving this currency (3-letter ISO currency code).",
+  )
+
+  iban: Optional[str] = Field(
+    None,
+    description="Only the recipient with this IBAN or account number (spaces are ignored).",
+  )
+
+  account_ending: Optional[str] = Field(
+    None,
+    description="Only recipients whose account number ends with these digits.",
+  )
+
+  limit: Optional[int] = Field(
+    None,
+    description="Maximum number of matches to return (default 5).",
+  )
+
 
 class CreateRecipientAccount(BaseModel):
   """Schema for the ``create_recipient_account`` operation."""
@@ -213,9 +252,12 @@ class DeactivateRecipientAccount(BaseModel):
 class ListTransfers(BaseModel):
   """Schema for the ``list_transfers`` operation."""
 
-  profile: Optional[int] = Field(
+  profile: Optional[Union[int, List[int], Literal["all"]]] = Field(
     None,
-    description="The profile ID to list transfers for. If not provided, will be taken from context.",
+    description=(
+      "The profile ID to list transfers for, a list of profile IDs, or 'all' for every profile of the user. "
+      "If not provided, will be taken from context."
+    ),
   )
 
   status: Optional[str] = Field(
@@ -253,6 +295,72 @@ class ListTransfers(BaseModel):
     description="Offset for pagination (default 0).",
   )
 
+  fetch_all: Optional[bool] = Field(
+    None,
+    description="Fetch every page instead of a single page. Can take a long time for large histories.",
+  )
+
+
+class SyncTransfers(BaseModel):
+  """Schema for the ``sync_transfers`` operation."""
+
+  profile: Optional[int] = Field(
+    None,
+    description="The profile ID to sync transfers of. If not provided, will be taken from context.",
+  )
+
+  limit: Optional[int] = Field(
+    None,
+    description="Maximum number of changed transfers to list (default 100).",
+  )
+
+
+class AnalyzeTransfers(BaseModel):
+  """Schema for the ``analyze_transfers`` operation."""
+
+  group_by: Optional[List[str]] = Field(
+    None,
+    description=(
+      "Dimensions to group by: status, source_currency, target_currency, recipient, day, week, month, year. "
+      "The currency of the summed amounts is always included."
+    ),
+  )
+
+  value: Optional[str] = Field(
+    None,
+    description="Which amounts to add up: 'source' (sent, default) or 'target' (received).",
+  )
+
+  profile: Optional[int] = Field(
+    None,
+    description="The profile ID to analyze transfers of. If not provided, will be taken from context.",
+  )
+
+  status: Optional[str] = Field(
+    None,
+    description="Only transfers with this status (e.g., outgoing_payment_sent).",
+  )
+
+  source_currency: Optional[str] = Field(
+    None,
+    description="Only transfers with this source currency (3-letter ISO currency code).",
+  )
+
+  target_currency: Optional[str] = Field(
+    None,
+    description="Only transfers with this target currency (3-letter ISO currency code).",
+  )
+
+  created_date_start: Optional[date] = Field(
+    None,
+    description="Only transfers created on or after this date (YYYY-MM-DD).",
+  )
+
+  created_date_end: Optional[date] = Field(
+    None,
+    description="Only transfers created before this date (YYYY-MM-DD).",
+  )
+
 
 class CancelTransfer(BaseModel):
   """Schema for the ``cancel_transfer`` operation."""
@@ -272,6 +380,25 @@ class GetTransferById(BaseModel):
   )
 
 
+class WaitForTransferStatus(BaseModel):
+  """Schema for the ``wait_for_transfer_status`` operation."""
+
+  transfer_id: int = Field(
+    ...,
+    description="The ID of the transfer to wait for.",
+  )
+
+  statuses: Optional[List[str]] = Field(
+    None,
+    description="Statuses to wait for. Defaults to any final status.",
+  )
+
+  timeout: Optional[float] = Field(
+    None,
+    description="Maximum number of seconds to wait (default and max 30).",
+  )
+
+
 class ListProfiles(BaseModel):
   """Schema for the ``list_profiles`` operation."""
 
@@ -328,9 +455,12 @@ class GetAccountRequirements(BaseModel):
 class ListActivities(BaseModel):
   """Schema for the ``list_activities`` operation."""
 
-  profile_id: Optional[int] = Field(
+  profile_id: Optional[Union[int, List[int], Literal["all"]]] = Field(
     None,
-    description="The profile ID to list activities for. If not provided, will be taken from context.",
+    description=(
+      "The profile ID to list activities for, a list of profile IDs, or 'all' for every profile of the user. "
+      "If not provided, will be taken from context."
+    ),
   )
 
   monetary_resource_type: Optional[str] = Field(
@@ -362,3 +492,121 @@ class ListActivities(BaseModel):
     None,
     description="Number of results per page (default 10).",
   )
+
+  fetch_all: Optional[bool] = Field(
+    None,
+    description="Fetch every page instead of a single page. Can take a long time for large histories.",
+  )
+
+
+class QueryActivityLedger(BaseModel):
+  """Schema for the ``query_activity_ledger`` operation."""
+
+  profile_id: Optional[int] = Field(
+    None,
+    description="The profile ID to query activities for. If not provided, will be taken from context.",
+  )
+
+  since: Optional[datetime] = Field(
+    None,
+    description="Only activities created at or after this timestamp.",
+  )
+
+  until: Optional[datetime] = Field(
+    None,
+    description="Only activities created before this timestamp.",
+  )
+
+  currency: Optional[str] = Field(
+    None,
+    description="Only activities whose primary amount is in this currency (e.g., EUR).",
+  )
+
+  min_amount: Optional[float] = Field(
+    None,
+    description="Only activities whose primary amount is at least this value.",
+  )
+
+  max_amount: Optional[float] = Field(
+    None,
+    description="Only activities whose primary amount is at most this value.",
+  )
+
+  type: Optional[str] = Field(
+    None,
+    description="Only activities of this type (e.g., TRANSFER, CARD_PAYMENT).",
+  )
+
+  status: Optional[str] = Field(
+    None,
+    description="Only activities with this status (e.g., COMPLETED).",
+  )
+
+  text: Optional[str] = Field(
+    None,
+    description="Only activities whose title or description contains this text.",
+  )
+
+  limit: Optional[int] = Field(
+    None,
+    description="Maximum number of activities to return, newest first (default 100).",
+  )
+
+  sync: Optional[bool] = Field(
+    None,
+    description="Fetch new activity from Wise before querying (default true).",
+  )
+
+
+class ExportRecords(BaseModel):
+  """Schema for the ``export_records`` operation."""
+
+  kind: str = Field(
+    ...,
+    description="What to export: 'transfers', 'activities' or 'recipients'.",
+  )
+
+  format: Optional[str] = Field(
+    None,
+    description="File format: 'csv' (default), 'ndjson' or 'parquet'.",
+  )
+
+  filename: Optional[str] = Field(
+    None,
+    description="Name of the file to write in the export directory. A name is generated if not provided.",
+  )
+
+  profile_id: Optional[int] = Field(
+    None,
+    description="The profile ID to export records of. If not provided, will be taken from context.",
+  )
+
+  status: Optional[str] = Field(
+    None,
+    description="Only transfers or activities with this status.",
+  )
+
+  currency: Optional[str] = Field(
+    None,
+    description="Only recipients with this currency (3-letter ISO currency code).",
+  )
+
+  source_currency: Optional[str] = Field(
+    None,
+    description="Only transfers with this source currency (3-letter ISO currency code).",
+  )
+
+  target_currency: Optional[str] = Field(
+    None,
+    description="Only transfers with this target currency (3-letter ISO currency code).",
+  )
+
+  since: Optional[datetime] = Field(
+    None,
+    description="Only transfers or activities created at or after this timestamp.",
+  )
+
+  until: Optional[datetime] = Field(
+    None,
+    description="Only transfers or activities created before this timestamp.",
+  )
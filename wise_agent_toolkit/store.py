@@ -0,0 +1,224 @@
+"""
+Persistent on-disk store for Wise objects that can no longer change.
+
+Transfers in a terminal state, expired quotes and the account requirements of
+a quote never change, so once fetched they can be served from disk instead of
+the network, across process restarts.
+
+The store is a single SQLite database that many threads and worker processes
+can share: it runs in WAL mode, waits for locks with a busy timeout and writes
+in short ``BEGIN IMMEDIATE`` transactions. The total size of the objects is
+kept in an ``objects_meta`` row, updated in the transaction of every write;
+when it grows beyond ``max_bytes`` the least recently used objects are evicted.
+
+Entries are namespaced (``WiseAPI`` uses a hash of the host and API key), so
+one API key can never read objects fetched with another.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Transfer statuses after which a transfer never changes again
+TERMINAL_TRANSFER_STATUSES = frozenset({
+  "outgoing_payment_sent",
+  "cancelled",
+  "funds_refunded",
+  "bounced_back",
+  "charged_back",
+})
+
+# Objects are evicted down to this fraction of max_bytes, so eviction does not
+# run again on every following write
+_EVICTION_TARGET = 0.9
+
+# last_used is refreshed at most this often per object, keeping reads cheap
+_TOUCH_INTERVAL = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+  namespace TEXT NOT NULL,
+  kind TEXT NOT NULL,
+  key TEXT NOT NULL,
+  body TEXT NOT NULL,
+  size INTEGER NOT NULL,
+  last_used REAL NOT NULL,
+  PRIMARY KEY (namespace, kind, key)
+);
+CREATE INDEX IF NOT EXISTS objects_last_used ON objects (last_used);
+CREATE TABLE IF NOT EXISTS objects_meta (
+  name TEXT PRIMARY KEY,
+  value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO objects_meta (name, value) SELECT 'size', coalesce(sum(size), 0) FROM objects;
+"""
+
+
+def is_immutable_transfer(transfer: Dict[str, Any]) -> bool:
+  """Return True if the transfer is in a terminal state."""
+  return transfer.get("status") in TERMINAL_TRANSFER_STATUSES
+
+
+def quote_expiration(quote: Dict[str, Any]) -> Optional[datetime]:
+  """Return the expiration time of a quote as an aware datetime, or None if it is unknown."""
+  expiration_time = quote.get("expirationTime")
+  if isinstance(expiration_time, str):
+    try:
+      expiration_time = datetime.fromisoformat(expiration_time.replace("Z", "+00:00"))
+    except ValueError:
+      return None
+  if not isinstance(expiration_time, datetime):
+    return None
+  if expiration_time.tzinfo is None:
+    expiration_time = expiration_time.replace(tzinfo=timezone.utc)
+  return expiration_time
+
+
+def is_immutable_quote(quote: Dict[str, Any], now: Optional[datetime] = None) -> bool:
+  """Return True if the quote has expired."""
+  if quote.get("status") == "EXPIRED":
+    return True
+
+  expiration_time = quote_expiration(quote)
+  if expiration_time is None:
+    return False
+  return expiration_time <= (now or datetime.now(timezone.utc))
+
+
+class SQLiteDatabase:
+  """SQLite database shared by threads and processes: WAL mode, busy timeout, one connection per thread."""
+
+  schema = ""
+
+  def __init__(self, path: str, busy_timeout: float = 5.0):
+    self.path = path
+    self.busy_timeout = busy_timeout
+    # sqlite3 connections must not be used by two threads at once; each thread
+    # gets its own, and every one is tracked so that close() reaches them all
+    self._local = threading.local()
+    self._lock = threading.Lock()
+    self._connections = []
+    self._generation = 0
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    self._connection().executescript(self.schema)
+
+  def close(self) -> None:
+    """Close the connections of every thread; threads that use the database again reopen it."""
+    with self._lock:
+      connections, self._connections = self._connections, []
+      self._generation += 1
+    for connection in connections:
+      try:
+        connection.close()
+      except sqlite3.Error as e:
+        logger.debug(f"Could not close a connection to {self.path}: {e}")
+
+  def _connection(self) -> sqlite3.Connection:
+    connection = getattr(self._local, "connection", None)
+    if connection is None or self._local.generation != self._generation:
+      # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE.
+      # check_same_thread is off only so that close() may run on another thread.
+      connection = sqlite3.connect(
+        self.path, timeout=self.busy_timeout, isolation_level=None, check_same_thread=False
+      )
+      connection.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout * 1000)}")
+      connection.execute("PRAGMA journal_mode = WAL")
+      connection.execute("PRAGMA synchronous = NORMAL")
+      with self._lock:
+        self._connections.append(connection)
+        self._local.generation = self._generation
+      self._local.connection = connection
+    return connection
+
+
+class ObjectStore(SQLiteDatabase):
+  """SQLite-backed store of serialized immutable objects, keyed by kind and ID."""
+
+  schema = _SCHEMA
+
+  def __init__(self, path: str, max_bytes: int = 64 * 1024 * 1024, busy_timeout: float = 5.0):
+    if max_bytes < 1:
+      raise ValueError("max_bytes must be at least 1")
+
+    self.max_bytes = max_bytes
+    super().__init__(path, busy_timeout=busy_timeout)
+
+  def get(self, namespace: str, kind: str, key: str) -> Optional[str]:
+    """Return the stored object, or None if it is not stored or the store is unavailable."""
+    try:
+      connection = self._connection()
+      row = connection.execute(
+        "SELECT body, last_used FROM objects WHERE namespace = ? AND kind = ? AND key = ?",
+        (namespace, kind, key),
+      ).fetchone()
+      if row is None:
+        return None
+
+      now = time.time()
+      if now - row[1] > _TOUCH_INTERVAL:
+        with connection:
+          connection.execute(
+            "UPDATE objects SET last_used = ? WHERE namespace = ? AND kind = ? AND key = ?",
+            (now, namespace, kind, key),
+          )
+      return row[0]
+    except sqlite3.Error as e:
+      # The store is only an optimization; fall back to the network
+      logger.warning(f"Object store read failed: {e}")
+      return None
+
+  def put(self, namespace: str, kind: str, key: str, body: str) -> None:
+    """Store an object, evicting the least recently used ones if the store is full."""
+    size = len(body.encode())
+    if size > self.max_bytes:
+      return
+
+    try:
+      connection = self._connection()
+      with connection:
+        connection.execute("BEGIN IMMEDIATE")
+        replaced = connection.execute(
+          "SELECT size FROM objects WHERE namespace = ? AND kind = ? AND key = ?", (namespace, kind, key)
+        ).fetchone()
+        connection.execute(
+          "INSERT OR REPLACE INTO objects (namespace, kind, key, body, size, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+          (namespace, kind, key, body, size, time.time()),
+        )
+        total = self._add_size(connection, size - (replaced[0] if replaced else 0))
+        if total > self.max_bytes:
+          self._evict(connection, total)
+    except sqlite3.Error as e:
+      logger.warning(f"Object store write failed: {e}")
+
+  def size(self) -> int:
+    """Return the total size in bytes of the stored objects."""
+    return self._connection().execute("SELECT value FROM objects_meta WHERE name = 'size'").fetchone()[0]
+
+  def __len__(self) -> int:
+    return self._connection().execute("SELECT count(*) FROM objects").fetchone()[0]
+
+  @staticmethod
+  def _add_size(connection: sqlite3.Connection, delta: int) -> int:
+    # Called inside the write transaction; returns the new total
+    connection.execute("UPDATE objects_meta SET value = value + ? WHERE name = 'size'", (delta,))
+    return connection.execute("SELECT value FROM objects_meta WHERE name = 'size'").fetchone()[0]
+
+  def _evict(self, connection: sqlite3.Connection, total: int) -> None:
+    target = self.max_bytes * _EVICTION_TARGET
+    rows = connection.execute("SELECT rowid, size FROM objects ORDER BY last_used")
+    evicted, freed = [], 0
+    for rowid, size in rows:
+      if total - freed <= target:
+        break
+      evicted.append((rowid,))
+      freed += size
+    connection.executemany("DELETE FROM objects WHERE rowid = ?", evicted)
+    self._add_size(connection, -freed)
@@ -1,17 +1,22 @@
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional
 
 from .prompts import (
   CREATE_TRANSFER_PROMPT, CREATE_QUOTE_PROMPT, LIST_RECIPIENT_ACCOUNTS_PROMPT, CREATE_RECIPIENT_ACCOUNT_PROMPT,
   LIST_TRANSFERS_PROMPT, CANCEL_TRANSFER_PROMPT, GET_TRANSFER_BY_ID_PROMPT, LIST_PROFILES_PROMPT,
   GET_PROFILE_BY_ID_PROMPT, GET_QUOTE_BY_ID_PROMPT, DEACTIVATE_RECIPIENT_ACCOUNT_PROMPT,
   GET_RECIPIENT_ACCOUNT_BY_ID_PROMPT, UPDATE_QUOTE_PROMPT, GET_ACCOUNT_REQUIREMENTS_PROMPT,
-  LIST_ACTIVITIES_PROMPT,
+  LIST_ACTIVITIES_PROMPT, WAIT_FOR_TRANSFER_STATUS_PROMPT, QUERY_ACTIVITY_LEDGER_PROMPT,
+  SEARCH_RECIPIENTS_PROMPT, ANALYZE_TRANSFERS_PROMPT, EXPORT_RECORDS_PROMPT,
+  SYNC_TRANSFERS_PROMPT, describe_tool,
 )
 
+from .retrieval import DEFAULT_TOP_K, ToolIndex
 from .schema import (
   CreateTransfer, CreateQuote, ListRecipientAccounts, CreateRecipientAccount, ListTransfers, CancelTransfer,
   GetTransferById, ListProfiles, GetProfileById, GetQuoteById, DeactivateRecipientAccount,
-  GetRecipientAccountById, UpdateQuote, GetAccountRequirements, ListActivities,
+  GetRecipientAccountById, UpdateQuote, GetAccountRequirements, ListActivities, WaitForTransferStatus,
+  QueryActivityLedger, SearchRecipients, AnalyzeTransfers, ExportRecords,
+  SyncTransfers,
 )
 
 tools: List[Dict] = [
@@ -59,6 +64,17 @@ tools: List[Dict] = [
       }
     },
   },
+  {
+    "method": "search_recipients",
+    "name": "Search Recipients",
+    "description": SEARCH_RECIPIENTS_PROMPT,
+    "args_schema": SearchRecipients,
+    "actions": {
+      "recipients": {
+        "read": True,
+      }
+    },
+  },
   {
     "method": "create_recipient_account",
     "name": "Create Recipient Account",
@@ -92,6 +108,29 @@ tools: List[Dict] = [
       }
     },
   },
+  {
+    "method": "sync_transfers",
+    "name": "Sync Transfers",
+    "description": SYNC_TRANSFERS_PROMPT,
+    "args_schema": SyncTransfers,
+    "requires": "transfer_ledger",
+    "actions": {
+      "transfers": {
+        "read": True,
+      }
+    },
+  },
+  {
+    "method": "analyze_transfers",
+    "name": "Analyze Transfers",
+    "description": ANALYZE_TRANSFERS_PROMPT,
+    "args_schema": AnalyzeTransfers,
+    "actions": {
+      "transfers": {
+        "read": True,
+      }
+    },
+  },
   {
     "method": "cancel_transfer",
     "name": "Cancel Transfer",
@@ -114,6 +153,17 @@ tools: List[Dict] = [
       }
     },
   },
+  {
+    "method": "wait_for_transfer_status",
+    "name": "Wait For Transfer Status",
+    "description": WAIT_FOR_TRANSFER_STATUS_PROMPT,
+    "args_schema": WaitForTransferStatus,
+    "actions": {
+      "transfers": {
+        "read": True,
+      }
+    },
+  },
   {
     "method": "list_profiles",
     "name": "List Profiles",
@@ -180,4 +230,56 @@ tools: List[Dict] = [
       }
     },
   },
+  {
+    "method": "query_activity_ledger",
+    "name": "Query Activity Ledger",
+    "description": QUERY_ACTIVITY_LEDGER_PROMPT,
+    "args_schema": QueryActivityLedger,
+    "requires": "ledger",
+    "actions": {
+      "activities": {
+        "read": True,
+      }
+    },
+  },
+  {
+    "method": "export_records",
+    "name": "Export Records",
+    "description": EXPORT_RECORDS_PROMPT,
+    "args_schema": ExportRecords,
+    "requires": "export_dir",
+    "actions": {
+      "transfers": {
+        "read": True,
+      },
+      "activities": {
+        "read": True,
+      },
+      "recipients": {
+        "read": True,
+      },
+    },
+  },
 ]
+
+
+def tool_description(tool: Dict, profile: Optional[str] = None) -> str:
+  """Return the description of a tool in a description profile (``full`` by default, see ``describe_tool``)."""
+  return describe_tool(tool["description"], tool.get("args_schema"), profile or "full")
+
+
+_tool_index: Optional[ToolIndex] = None
+
+
+def select_tools(query: str, k: int = DEFAULT_TOP_K, candidates: Optional[Iterable[Dict]] = None) -> List[Dict]:
+  """Return the ``k`` tools most relevant to ``query`` (e.g. the user's message), in the order of the tool list.
+
+  ``candidates`` defaults to every tool. When nothing in the query matches a
+  tool, every candidate is returned.
+  """
+  global _tool_index
+  if candidates is not None:
+    return ToolIndex(candidates).select(query, k)
+  if _tool_index is None:
+    _tool_index = ToolIndex(tools)
+  return _tool_index.select(query, k)
@@ -0,0 +1,236 @@
+"""
+Local copy of the transfers of each profile, kept current by delta syncs.
+
+Refreshing a dashboard used to mean listing every transfer again.
+``TransferLedger`` keeps the transfers it has seen in a SQLite table together
+with a per-profile watermark (the newest ``created`` seen so far). A sync then
+lists only the transfers created since the watermark (``list_transfers``
+filters by day, so the day before is fetched again), and re-checks the
+transfers it holds that are not in a terminal state yet, since those are the
+only ones whose status can still change. Every transfer that is new or
+differs from its stored copy is reported as a change.
+
+Like the activity ledger, it can share the database file of an ``ObjectStore``
+and its rows are namespaced by API key.
+"""
+
+import json
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .ledger import _parse_timestamp, format_timestamp
+from .store import TERMINAL_TRANSFER_STATUSES, SQLiteDatabase
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transfers (
+  namespace TEXT NOT NULL,
+  profile_id INTEGER NOT NULL,
+  id INTEGER NOT NULL,
+  status TEXT,
+  created TEXT,
+  checked_at REAL NOT NULL,
+  body TEXT NOT NULL,
+  PRIMARY KEY (namespace, profile_id, id)
+);
+CREATE INDEX IF NOT EXISTS transfers_status ON transfers (namespace, profile_id, status, checked_at);
+CREATE TABLE IF NOT EXISTS transfer_sync (
+  namespace TEXT NOT NULL,
+  profile_id INTEGER NOT NULL,
+  high_water_mark TEXT,
+  synced_at REAL NOT NULL,
+  PRIMARY KEY (namespace, profile_id)
+);
+"""
+
+# Transfers are compared and written in transactions of this many
+_BATCH_SIZE = 500
+
+_PENDING = f"status IS NULL OR status NOT IN ({', '.join('?' * len(TERMINAL_TRANSFER_STATUSES))})"
+
+
+def _body(transfer: Dict[str, Any]) -> str:
+  return json.dumps(transfer, default=str, sort_keys=True)  # to_dict() does not serialize datetime objects
+
+
+def _change(kind: str, transfer: Dict[str, Any], previous_status: Optional[str] = None) -> Dict[str, Any]:
+  change = {
+    "change": kind,
+    "id": transfer.get("id"),
+    "status": transfer.get("status"),
+    "previous_status": previous_status,
+    "created": transfer.get("created"),
+    "source_currency": transfer.get("sourceCurrency"),
+    "source_value": transfer.get("sourceValue"),
+    "target_currency": transfer.get("targetCurrency"),
+    "target_value": transfer.get("targetValue"),
+    "target_account": transfer.get("targetAccount"),
+  }
+  return {key: value for key, value in change.items() if value is not None}
+
+
+class TransferLedger(SQLiteDatabase):
+  """SQLite copy of Wise transfers, synced from a per-profile watermark."""
+
+  schema = _SCHEMA
+
+  def __init__(
+    self,
+    path: str,
+    overlap: timedelta = timedelta(days=1),
+    max_rechecks: int = 20,
+    busy_timeout: float = 5.0,
+  ):
+    self.overlap = overlap
+    self.max_rechecks = max_rechecks
+    super().__init__(path, busy_timeout=busy_timeout)
+    # Not SQLiteDatabase._lock, which guards the connection list
+    self._sync_locks: Dict[Tuple[str, int], threading.Lock] = {}
+    self._sync_locks_lock = threading.Lock()
+
+  def high_water_mark(self, namespace: str, profile_id: int) -> Optional[str]:
+    """Return the newest ``created`` synced for the profile, or None if it was never synced."""
+    row = self._connection().execute(
+      "SELECT high_water_mark FROM transfer_sync WHERE namespace = ? AND profile_id = ?",
+      (namespace, profile_id),
+    ).fetchone()
+    return row[0] if row else None
+
+  def sync(
+    self,
+    namespace: str,
+    profile_id: int,
+    fetch: Callable[[Any], Iterable[Dict[str, Any]]],
+    fetch_transfer: Callable[[int], Dict[str, Any]],
+    limit: Optional[int] = 100,
+  ) -> Dict[str, Any]:
+    """Fetch the transfers created since the watermark, re-check pending ones and return what changed.
+
+    ``fetch(since)`` must return an iterable of transfer dictionaries (as
+    returned by ``to_dict()``) created on or after the date ``since``, or
+    every transfer when ``since`` is None. ``fetch_transfer(id)`` returns the
+    current state of one transfer. At most ``max_rechecks`` pending
+    transfers are re-checked per sync, least recently checked first. At most
+    ``limit`` changes are listed; the counts cover all of them.
+    """
+    with self._sync_lock(namespace, profile_id):
+      started = time.monotonic()
+      high_water_mark = self.high_water_mark(namespace, profile_id)
+      since = (_parse_timestamp(high_water_mark) - self.overlap).date() if high_water_mark else None
+
+      changes: List[Dict[str, Any]] = []
+      counts = {"created": 0, "updated": 0}
+      seen = set()
+      fetched = 0
+      batch = []
+      for transfer in fetch(since):
+        batch.append(transfer)
+        seen.add(transfer.get("id"))
+        fetched += 1
+        created = format_timestamp(transfer.get("created"))
+        if created is not None and (high_water_mark is None or created > high_water_mark):
+          high_water_mark = created
+        if len(batch) >= _BATCH_SIZE:
+          self._merge(namespace, profile_id, batch, changes, counts, limit)
+          batch = []
+      self._merge(namespace, profile_id, batch, changes, counts, limit)
+
+      pending = [transfer_id for transfer_id in self._pending(namespace, profile_id) if transfer_id not in seen]
+      rechecked = [fetch_transfer(transfer_id) for transfer_id in pending[:self.max_rechecks]]
+      self._merge(namespace, profile_id, rechecked, changes, counts, limit)
+
+      # Only advanced once every page was stored, so an interrupted sync is retried in full
+      connection = self._connection()
+      with connection:
+        connection.execute("BEGIN IMMEDIATE")
+        connection.execute(
+          "INSERT OR REPLACE INTO transfer_sync (namespace, profile_id, high_water_mark, synced_at) "
+          "VALUES (?, ?, ?, ?)",
+          (namespace, profile_id, high_water_mark, time.time()),
+        )
+
+      return {
+        "profile_id": profile_id,
+        "since": since.isoformat() if since else None,
+        "high_water_mark": high_water_mark,
+        "fetched": fetched,
+        "rechecked": len(rechecked),
+        "created": counts["created"],
+        "updated": counts["updated"],
+        "changes": changes,
+        "truncated": counts["created"] + counts["updated"] > len(changes),
+        "pending": len(self._pending(namespace, profile_id)),
+        "seconds": round(time.monotonic() - started, 3),
+      }
+
+  def get(self, namespace: str, profile_id: int, transfer_id: int) -> Optional[Dict[str, Any]]:
+    """Return the stored copy of a transfer, or None if it was never synced."""
+    row = self._connection().execute(
+      "SELECT body FROM transfers WHERE namespace = ? AND profile_id = ? AND id = ?",
+      (namespace, profile_id, transfer_id),
+    ).fetchone()
+    return json.loads(row[0]) if row else None
+
+  def __len__(self) -> int:
+    return self._connection().execute("SELECT count(*) FROM transfers").fetchone()[0]
+
+  def _sync_lock(self, namespace: str, profile_id: int) -> threading.Lock:
+    with self._sync_locks_lock:
+      return self._sync_locks.setdefault((namespace, profile_id), threading.Lock())
+
+  def _pending(self, namespace: str, profile_id: int) -> List[int]:
+    """Return the IDs of the stored transfers that can still change, least recently checked first."""
+    rows = self._connection().execute(
+      f"SELECT id FROM transfers WHERE namespace = ? AND profile_id = ? AND ({_PENDING}) ORDER BY checked_at",
+      (namespace, profile_id, *sorted(TERMINAL_TRANSFER_STATUSES)),
+    )
+    return [transfer_id for (transfer_id,) in rows]
+
+  def _merge(
+    self,
+    namespace: str,
+    profile_id: int,
+    transfers: List[Dict[str, Any]],
+    changes: List[Dict[str, Any]],
+    counts: Dict[str, int],
+    limit: Optional[int],
+  ) -> None:
+    """Store ``transfers``, recording those that are new or differ from their stored copy."""
+    transfers = [transfer for transfer in transfers if transfer.get("id") is not None]
+    if not transfers:
+      return
+
+    connection = self._connection()
+    ids = [transfer["id"] for transfer in transfers]
+    stored = {
+      transfer_id: (status, body)
+      for transfer_id, status, body in connection.execute(
+        f"SELECT id, status, body FROM transfers WHERE namespace = ? AND profile_id = ? "
+        f"AND id IN ({', '.join('?' * len(ids))})",
+        (namespace, profile_id, *ids),
+      )
+    }
+
+    now = time.time()
+    rows = []
+    for transfer in transfers:
+      body = _body(transfer)
+      previous = stored.get(transfer["id"])
+      if previous is None or previous[1] != body:
+        kind = "created" if previous is None else "updated"
+        counts[kind] += 1
+        if limit is None or len(changes) < limit:
+          changes.append(_change(kind, transfer, None if previous is None else previous[0]))
+      rows.append((
+        namespace, profile_id, transfer["id"], transfer.get("status"),
+        format_timestamp(transfer.get("created")), now, body,
+      ))
+
+    with connection:
+      connection.execute("BEGIN IMMEDIATE")
+      connection.executemany(
+        "INSERT OR REPLACE INTO transfers (namespace, profile_id, id, status, created, checked_at, body) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        rows,
+      )
@@ -0,0 +1,52 @@
+"""
+Local validation and coercion of tool arguments.
+
+Each tool's ``args_schema`` is compiled once into a pydantic ``TypeAdapter``
+and cached, so arguments are checked in-process before any network round trip.
+Validation runs in lax mode: MCP clients that send ``"123"`` for an integer
+field or an ISO string for a date get the value coerced to the proper type,
+while invalid or unknown arguments are rejected immediately.
+"""
+
+import functools
+from typing import Any, Dict, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+
+class InvalidArgumentsError(ValueError):
+  """Raised when tool arguments do not match the tool's schema."""
+
+
+@functools.lru_cache(maxsize=None)
+def compiled_validator(args_schema: Type[BaseModel]) -> TypeAdapter:
+  """Return the compiled validator for ``args_schema``, building it on first use."""
+  if args_schema.model_config.get("extra") != "allow":
+    # Reject unknown arguments instead of silently dropping them
+    args_schema = type(
+      args_schema.__name__,
+      (args_schema,),
+      {"model_config": {**args_schema.model_config, "extra": "forbid"}, "__module__": args_schema.__module__},
+    )
+  return TypeAdapter(args_schema)
+
+
+def validate_arguments(args_schema: Type[BaseModel], arguments: Dict[str, Any]) -> Dict[str, Any]:
+  """Validate ``arguments`` against ``args_schema`` and return them coerced.
+
+  Only arguments the caller supplied are returned, so the defaults of the
+  underlying Wise API function still apply to the others.
+  """
+  try:
+    model = compiled_validator(args_schema).validate_python(arguments or {})
+  except ValidationError as e:
+    raise InvalidArgumentsError(_format_errors(e)) from None
+  return model.model_dump(exclude_unset=True)
+
+
+def _format_errors(error: ValidationError) -> str:
+  messages = []
+  for detail in error.errors(include_url=False):
+    location = ".".join(str(part) for part in detail["loc"]) or "arguments"
+    messages.append(f"{location}: {detail['msg']}")
+  return "Invalid arguments: " + "; ".join(messages)
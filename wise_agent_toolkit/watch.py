@@ -0,0 +1,227 @@
+"""
+Waiting for transfers to reach a status.
+
+``TransferWatcher`` runs at most one poller thread per transfer ID, however
+many callers (sessions, tools, library users) wait on that transfer. The
+poller starts fast and backs off while the status stays the same, polls fast
+again after a change, and stops once nobody is waiting or the transfer has
+reached a final status. Updates learnt elsewhere (e.g. from webhooks) can be
+pushed to the waiters with ``publish``. ``close`` stops every poller and ends
+the waits in progress.
+
+A failed fetch is retried with the same backoff: only a rejected request
+(a 4xx response) or ``max_errors`` failures in a row end the waits on that
+transfer with the error.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from .cancellation import current_token
+from .progress import report_progress
+from .store import TERMINAL_TRANSFER_STATUSES
+
+# Upper bound for a single wait, so a call cannot hold a worker forever
+MAX_WAIT_SECONDS = 600.0
+
+# Upper bound for a wait made through the wait_for_transfer_status tool, which
+# holds a worker thread and an MCP read slot for as long as it waits
+MAX_TOOL_WAIT_SECONDS = 30.0
+
+# How often waiters check whether their call was cancelled
+_CANCEL_CHECK_INTERVAL = 0.5
+
+
+def _is_rejected(error: Exception) -> bool:
+  """Return True for an HTTP 4xx response that a retry would get again."""
+  status = getattr(error, "status", None)
+  return isinstance(status, int) and 400 <= status < 500 and status not in (408, 429)
+
+
+class _Watch:
+  """Shared state of the poller of one transfer."""
+
+  def __init__(self):
+    self.transfer: Optional[Dict[str, Any]] = None
+    self.error: Optional[Exception] = None
+    self.version = 0
+    self.waiters = 0
+    self.polling = False
+
+
+class TransferWatcher:
+  """Lets any number of callers wait on transfers with one adaptive poller per transfer."""
+
+  def __init__(
+    self,
+    fetch: Callable[[int], Dict[str, Any]],
+    initial_interval: float = 1.0,
+    max_interval: float = 30.0,
+    backoff: float = 1.5,
+    max_errors: int = 3,
+  ):
+    self._fetch = fetch
+    self.initial_interval = initial_interval
+    self.max_interval = max_interval
+    self.backoff = backoff
+    self.max_errors = max_errors
+    self._condition = threading.Condition()
+    self._watches: Dict[int, _Watch] = {}
+    self._closed = False
+
+  def pollers(self) -> int:
+    """Return the number of transfers currently being polled."""
+    with self._condition:
+      return sum(1 for watch in self._watches.values() if watch.polling)
+
+  def wait(
+    self,
+    transfer_id: int,
+    statuses: Optional[Iterable[str]] = None,
+    timeout: float = 60.0,
+  ) -> Dict[str, Any]:
+    """Block until the transfer reaches one of ``statuses`` or ``timeout`` seconds pass.
+
+    Without ``statuses`` any final status will do. The wait also ends early
+    when the transfer reaches a final status that is not one of ``statuses``,
+    as it will never change again.
+    """
+    targets = set(statuses) if statuses else set(TERMINAL_TRANSFER_STATUSES)
+    timeout = min(max(timeout, 0.0), MAX_WAIT_SECONDS)
+    started = time.monotonic()
+    deadline = started + timeout
+    token = current_token()
+    seen_version = 0
+
+    with self._condition:
+      if self._closed:
+        raise RuntimeError("The transfer watcher is closed.")
+      watch = self._watches.setdefault(transfer_id, _Watch())
+      watch.waiters += 1
+      self._ensure_polling(transfer_id, watch)
+
+    try:
+      while True:
+        with self._condition:
+          while watch.version == seen_version and watch.error is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (token is not None and token.cancelled):
+              break
+            wait = min(remaining, _CANCEL_CHECK_INTERVAL) if token is not None else remaining
+            self._condition.wait(wait)
+          transfer, error, seen_version = watch.transfer, watch.error, watch.version
+
+        if error is not None:
+          raise error
+        if token is not None:
+          token.raise_if_cancelled()
+
+        status = transfer.get("status") if transfer is not None else None
+        elapsed = time.monotonic() - started
+        if status is not None:
+          report_progress(round(elapsed, 1), timeout, f"Transfer {transfer_id} is {status}")
+
+        if status in targets or status in TERMINAL_TRANSFER_STATUSES:
+          return self._result(transfer_id, transfer, status in targets, False, elapsed)
+        if time.monotonic() >= deadline:
+          return self._result(transfer_id, transfer, False, True, elapsed)
+    finally:
+      with self._condition:
+        watch.waiters -= 1
+        if watch.waiters == 0 and not watch.polling:
+          self._watches.pop(transfer_id, None)
+
+  def close(self) -> None:
+    """Stop every poller and end the waits in progress with an error."""
+    with self._condition:
+      self._closed = True
+      for watch in self._watches.values():
+        watch.error = watch.error or RuntimeError("The transfer watcher was closed.")
+      self._condition.notify_all()
+
+  def publish(self, transfer: Dict[str, Any]) -> bool:
+    """Push an update of a transfer to its waiters; return whether anyone was waiting."""
+    with self._condition:
+      watch = self._watches.get(transfer.get("id"))
+      if watch is None:
+        return False
+      self._update(watch, transfer)
+      return True
+
+  def publish_status(self, transfer_id: int, status: str) -> bool:
+    """Push a status change learnt without the full transfer; return whether anyone was waiting."""
+    with self._condition:
+      watch = self._watches.get(transfer_id)
+      if watch is None:
+        return False
+      self._update(watch, dict(watch.transfer or {"id": transfer_id}, status=status))
+      return True
+
+  def _ensure_polling(self, transfer_id: int, watch: _Watch) -> None:
+    # Called with the condition held
+    if watch.polling:
+      return
+    if watch.transfer is not None and watch.transfer.get("status") in TERMINAL_TRANSFER_STATUSES:
+      return
+    watch.error = None
+    watch.polling = True
+    threading.Thread(
+      target=self._poll, args=(transfer_id, watch), name=f"wise-transfer-{transfer_id}", daemon=True
+    ).start()
+
+  def _poll(self, transfer_id: int, watch: _Watch) -> None:
+    interval = self.initial_interval
+    failures = 0
+    while True:
+      try:
+        transfer, error = self._fetch(transfer_id), None
+        failures = 0
+      except Exception as e:
+        transfer, error = None, e
+        failures += 1
+
+      with self._condition:
+        changed = False
+        if error is None:
+          changed = self._update(watch, transfer)
+        elif _is_rejected(error) or failures >= self.max_errors:
+          watch.error = error
+          self._condition.notify_all()
+
+        final = watch.transfer is not None and watch.transfer.get("status") in TERMINAL_TRANSFER_STATUSES
+        if watch.error is not None or final or watch.waiters == 0:
+          watch.polling = False
+          if watch.waiters == 0:
+            self._watches.pop(transfer_id, None)
+          return
+
+      # Poll fast right after a change and back off while nothing happens
+      interval = self.initial_interval if changed else min(interval * self.backoff, self.max_interval)
+      with self._condition:
+        self._condition.wait_for(lambda: self._closed, interval)
+        if watch.waiters == 0 or self._closed:
+          watch.polling = False
+          self._watches.pop(transfer_id, None)
+          return
+
+  def _update(self, watch: _Watch, transfer: Dict[str, Any]) -> bool:
+    # Called with the condition held
+    changed = watch.transfer is None or watch.transfer.get("status") != transfer.get("status")
+    watch.transfer = transfer
+    watch.version += 1
+    self._condition.notify_all()
+    return changed
+
+  @staticmethod
+  def _result(
+    transfer_id: int, transfer: Optional[Dict[str, Any]], reached: bool, timed_out: bool, elapsed: float
+  ) -> Dict[str, Any]:
+    return {
+      "transfer_id": transfer_id,
+      "status": transfer.get("status") if transfer is not None else None,
+      "reached": reached,
+      "timed_out": timed_out,
+      "waited_seconds": round(elapsed, 1),
+      "transfer": transfer,
+    }
@@ -0,0 +1,308 @@
+"""
+Local receiver for Wise webhook events.
+
+Instead of being polled with ``get_transfer_by_id``, Wise can push a
+``transfers#state-change`` event for every transfer status change and a
+``balances#update`` or ``balances#credit`` event for every balance change.
+``WebhookReceiver`` is a small HTTP endpoint (standard library only) that
+accepts these events, checks their ``X-Signature-SHA256`` signature against
+the Wise public key and hands them to a handler, usually
+``WiseAPI.handle_webhook_event``.
+
+``LiveState`` is what the handler updates: the transfers a client has
+fetched, with their statuses kept current by the events, and the latest
+balances. While a transfer's state is fresh, reads and status waiters are
+answered from it without calling Wise.
+
+Checking signatures needs ``cryptography``
+(``pip install wise-agent-toolkit[webhooks]``).
+"""
+
+import base64
+import http.server
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+  from cryptography.exceptions import InvalidSignature
+  from cryptography.hazmat.primitives import hashes, serialization
+  from cryptography.hazmat.primitives.asymmetric import padding
+except ImportError:  # cryptography is optional
+  serialization = None
+
+from .ledger import format_timestamp
+from .records import TransferRecord
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "X-Signature-SHA256"
+# Sent with the test notifications triggered from the Wise developer tools
+TEST_NOTIFICATION_HEADER = "X-Test-Notification"
+
+TRANSFER_STATE_CHANGE = "transfers#state-change"
+BALANCE_EVENTS = ("balances#update", "balances#credit")
+
+# Wise events are a few hundred bytes; anything much larger is not one
+MAX_BODY_BYTES = 64 * 1024
+
+
+class InvalidEventError(ValueError):
+  """A webhook event that is valid JSON but lacks the data its type needs.
+
+  Wise would deliver it again unchanged, so it is answered with 400 rather
+  than 500.
+  """
+
+
+def event_data(event: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+  """Return the ``data`` object of an event and the ``resource`` object inside it.
+
+  Raises InvalidEventError if either is not an object or ``occurred_at`` is
+  not a timestamp.
+  """
+  data = event.get("data")
+  if not isinstance(data, dict):
+    raise InvalidEventError(f"{event.get('event_type')} event without a data object")
+  resource = data.get("resource", {})
+  if not isinstance(resource, dict):
+    raise InvalidEventError(f"{event.get('event_type')} event with an invalid resource")
+  occurred_at = data.get("occurred_at")
+  if occurred_at is not None and (not isinstance(occurred_at, str) or format_timestamp(occurred_at) is None):
+    raise InvalidEventError(f"{event.get('event_type')} event with an invalid occurred_at: {occurred_at!r}")
+  return data, resource
+
+
+def event_amount(data: Dict[str, Any], field: str) -> float:
+  """Return a numeric field of an event's data, raising InvalidEventError if it is missing or not a number."""
+  value = data.get(field)
+  if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+    raise InvalidEventError(f"Event without a numeric {field}")
+  try:
+    return float(value)
+  except ValueError:
+    raise InvalidEventError(f"Event with a non-numeric {field}: {value!r}")
+
+
+def _outdated(occurred_at: Optional[str], latest: Optional[str]) -> bool:
+  # Wise does not guarantee delivery order
+  return occurred_at is not None and latest is not None and occurred_at < latest
+
+
+def _transfer_dict(record: TransferRecord) -> Dict[str, Any]:
+  # The status is updated on the record only
+  return dict(record.to_dict(), status=record.status)
+
+
+class SignatureVerifier:
+  """Checks the RSA-SHA256 signature Wise sends with every webhook event."""
+
+  def __init__(self, public_key_pem: bytes):
+    if serialization is None:
+      raise ImportError(
+        "cryptography is required to verify Wise webhook signatures. "
+        "Install it with: pip install wise-agent-toolkit[webhooks]"
+      )
+    self._public_key = serialization.load_pem_public_key(public_key_pem)
+
+  @classmethod
+  def from_file(cls, path: str) -> "SignatureVerifier":
+    with open(path, "rb") as file:
+      return cls(file.read())
+
+  def verify(self, body: bytes, signature: Optional[str]) -> bool:
+    """Return True if ``signature`` (base64) is a valid signature of ``body``."""
+    if not signature:
+      return False
+    try:
+      self._public_key.verify(base64.b64decode(signature), body, padding.PKCS1v15(), hashes.SHA256())
+    except (InvalidSignature, ValueError):
+      return False
+    return True
+
+
+class LiveState:
+  """Transfers and balances kept current by webhook events.
+
+  Only transfers passed to ``remember`` (i.e. fetched by the client itself)
+  are ever served, so a client never learns about a transfer from an event
+  alone. A transfer is served by ``transfer`` for ``max_age`` seconds after it
+  was fetched or its last event arrived; after that it is fetched again, in
+  case an event was missed. Transfers are held as ``TransferRecord``s.
+  """
+
+  def __init__(
+    self,
+    max_transfers: int = 1024,
+    max_age: float = 600.0,
+    clock: Callable[[], float] = time.monotonic,
+  ):
+    self.max_transfers = max_transfers
+    self.max_age = max_age
+    self._clock = clock
+    self._lock = threading.Lock()
+    # Transfer ID -> (transfer, time of the last applied event, refreshed at)
+    self._transfers: "OrderedDict[Any, Tuple[TransferRecord, Optional[str], float]]" = OrderedDict()
+    self._balances: Dict[Any, Dict[str, Dict[str, Any]]] = {}
+
+  def remember(self, transfer: Dict[str, Any]) -> None:
+    """Start keeping a transfer fetched from Wise current."""
+    transfer_id = transfer.get("id")
+    if transfer_id is None:
+      return
+    with self._lock:
+      entry = self._transfers.pop(transfer_id, None)
+      self._transfers[transfer_id] = (TransferRecord(transfer), entry[1] if entry else None, self._clock())
+      while len(self._transfers) > self.max_transfers:
+        self._transfers.popitem(last=False)
+
+  def transfer(self, transfer_id: Any) -> Optional[Dict[str, Any]]:
+    """Return the current state of a transfer, or None if it is unknown or may be stale."""
+    with self._lock:
+      entry = self._transfers.get(transfer_id)
+      if entry is None or self._clock() - entry[2] > self.max_age:
+        return None
+      self._transfers.move_to_end(transfer_id)
+      return _transfer_dict(entry[0])
+
+  def apply_transfer_state(
+    self, transfer_id: Any, status: str, occurred_at: Optional[str] = None
+  ) -> Optional[Dict[str, Any]]:
+    """Apply a status change; return the updated transfer, or None if it is unknown or the event is outdated."""
+    occurred_at = format_timestamp(occurred_at)
+    with self._lock:
+      entry = self._transfers.get(transfer_id)
+      if entry is None:
+        return None
+      if _outdated(occurred_at, entry[1]):
+        return None
+      record = entry[0]
+      record.status = status
+      self._transfers[transfer_id] = (record, occurred_at or entry[1], self._clock())
+      return _transfer_dict(record)
+
+  def apply_balance(
+    self, profile_id: Any, currency: str, amount: Any, balance_id: Any = None, occurred_at: Optional[str] = None
+  ) -> bool:
+    """Record the balance after a transaction; return False if a later one is already known."""
+    occurred_at = format_timestamp(occurred_at)
+    with self._lock:
+      balances = self._balances.setdefault(profile_id, {})
+      current = balances.get(currency)
+      if current is not None and _outdated(occurred_at, current["occurred_at"]):
+        return False
+      balances[currency] = {
+        "currency": currency, "amount": amount, "balance_id": balance_id, "occurred_at": occurred_at,
+      }
+      return True
+
+  def balances(self, profile_id: Any) -> Dict[str, Dict[str, Any]]:
+    """Return the latest balance of each currency of the profile learnt from events."""
+    with self._lock:
+      return {currency: dict(balance) for currency, balance in self._balances.get(profile_id, {}).items()}
+
+
+class WebhookReceiver:
+  """HTTP endpoint accepting Wise webhook events at ``path`` and passing them to ``handler``.
+
+  Events with a missing or invalid signature are rejected with 401, unless
+  ``allow_unsigned`` is set (meant for posting fixture events locally).
+  Events that are not JSON objects, or that the handler rejects with
+  ``InvalidEventError``, are answered with 400. If the handler fails in any
+  other way the event is answered with 500, so Wise delivers it again later.
+  """
+
+  def __init__(
+    self,
+    handler: Callable[[Dict[str, Any]], Any],
+    verifier: Optional[SignatureVerifier] = None,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    path: str = "/wise/webhooks",
+    allow_unsigned: bool = False,
+  ):
+    if verifier is None and not allow_unsigned:
+      raise ValueError("A SignatureVerifier is required unless allow_unsigned is set.")
+
+    self.handler = handler
+    self.verifier = verifier
+    self.path = path
+    self.received = 0
+    self.rejected = 0
+    self._server = http.server.ThreadingHTTPServer((host, port), self._request_handler())
+    self._server.daemon_threads = True
+    self._thread: Optional[threading.Thread] = None
+
+  @property
+  def url(self) -> str:
+    host, port = self._server.server_address[:2]
+    return f"http://{host}:{port}{self.path}"
+
+  def start(self) -> None:
+    """Serve events from a background thread."""
+    if self._thread is None:
+      self._thread = threading.Thread(target=self._server.serve_forever, name="wise-webhooks", daemon=True)
+      self._thread.start()
+      logger.info(f"Receiving Wise webhook events at {self.url}")
+
+  def close(self) -> None:
+    if self._thread is not None:
+      self._server.shutdown()
+      self._thread = None
+    self._server.server_close()
+
+  def receive(self, body: bytes, signature: Optional[str], test: bool = False) -> int:
+    """Verify and handle one event; return the HTTP status to answer with."""
+    if self.verifier is not None and not self.verifier.verify(body, signature):
+      self.rejected += 1
+      logger.warning("Rejected a webhook event with an invalid signature")
+      return 401
+    try:
+      event = json.loads(body)
+    except ValueError:
+      return 400
+    if not isinstance(event, dict):
+      return 400
+    if test:
+      logger.info(f"Received a test {event.get('event_type')} webhook event")
+      return 200
+
+    self.received += 1
+    try:
+      self.handler(event)
+    except InvalidEventError as e:
+      logger.warning(f"Rejected an invalid webhook event: {e}")
+      return 400
+    except Exception:
+      logger.exception(f"Failed to handle a {event.get('event_type')} webhook event")
+      return 500
+    return 200
+
+  def _request_handler(self):
+    receiver = self
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+
+      def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if self.path.split("?")[0] != receiver.path:
+          status = 404
+        elif length > MAX_BODY_BYTES:
+          status = 413
+        else:
+          status = receiver.receive(
+            self.rfile.read(length),
+            self.headers.get(SIGNATURE_HEADER),
+            (self.headers.get(TEST_NOTIFICATION_HEADER) or "").lower() == "true",
+          )
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+      def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+    return Handler